@@ -10,36 +10,432 @@ import random
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Union, Iterable, Iterator, Callable
 from dataclasses import dataclass
-from faker import Faker
+from faker import Faker, VERSION as faker_version
 from faker.providers import automotive, company, internet, person, address, phone_number
 import argparse
+import cProfile
+import hashlib
+import os
+import re
+import shutil
+import string
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from collections.abc import Sequence
+from itertools import accumulate
+from workflow_utils.dataset_io import (COMPRESSION_SUFFIXES, JsonlWriter, compression_available, get_serializer,
+                                       manifest_part_paths, partition_jsonl)
+from workflow_utils.dataset_cache import DEFAULT_MAX_BYTES, DatasetCache, dataset_cache_key
+from workflow_utils.dedup import dedup_jsonl
+from workflow_utils.s3_transfer import DEFAULT_MAX_CONCURRENCY, DEFAULT_PART_SIZE, S3MultipartWriter, parse_s3_uri
 
-# Initialize Faker with multiple locales for diversity
-fake = Faker(['en_US', 'en_GB', 'es_ES', 'fr_FR', 'de_DE', 'ja_JP', 'zh_CN', 'hi_IN'])
+try:
+    import boto3
+except ImportError:  # boto3 is only needed for --stream-to-s3
+    boto3 = None
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is only needed for --columnar entity generation
+    np = None
+
+# Bump whenever a change alters the datasets produced for a given config and seed,
+# so cached datasets from older generators are not reused
+GENERATOR_VERSION = '2.2'
+
+# Faker locales used for diversity; every generator builds its own seeded instance
+FAKER_LOCALES = ['en_US', 'en_GB', 'es_ES', 'fr_FR', 'de_DE', 'ja_JP', 'zh_CN', 'hi_IN']
+
+_BOOLEAN_VALUES = [True, False]
+
+# ID strategies selectable per 'id' attribute with `id_strategy`; 'random' is the original
+# behaviour (random UUIDs, de-duplicated against every ID issued so far)
+ID_STRATEGIES = ('random', 'counter', 'feistel', 'uuid7')
+
+_FEISTEL_ROUNDS = 4
+_FEISTEL_MULTIPLIER = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+# Date ranges up to this many days are pre-formatted when an attribute plan is compiled
+_MAX_PRECOMPUTED_DAYS = 36600
+
+# The example-stage RNGs restart from a derived seed every EXAMPLE_SEED_BLOCK examples, and
+# shards start on block boundaries, so the dataset does not depend on the worker count
+EXAMPLE_SEED_BLOCK = 1000
+
+# Columnar list generation: rows per NumPy chunk
+_LIST_COLUMN_CHUNK = 65536
+
+
+def derive_seed(seed: int, *components: Any) -> int:
+    """Derive a stable 64-bit child seed from a run seed and extra components."""
+    key = ':'.join(str(part) for part in (seed,) + components)
+    return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big')
+
+def checkpoint_path_for(output_path: str) -> str:
+    """Checkpoint file kept next to a JSONL output (or shard) while it is being written."""
+    return f"{output_path}.checkpoint.json"
+
+def shard_files(output_path: str) -> List[str]:
+    """Shard outputs and shard checkpoints a sharded run keeps next to output_path until it merges."""
+    directory, prefix = os.path.dirname(output_path) or '.', f"{os.path.basename(output_path)}.part"
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix))
+
+def load_checkpoint(checkpoint_path: str) -> Optional[Dict[str, Any]]:
+    """Load a checkpoint, or return None if there is none."""
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_checkpoint(checkpoint_path: str, checkpoint: Dict[str, Any]):
+    """Atomically replace a checkpoint, so a crash mid-write leaves the previous one intact."""
+    temp_path = f"{checkpoint_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, checkpoint_path)
+
+def set_local_input_data_path(dataset_path: str):
+    """Point the workflow's config.yaml at a dataset for the upload step."""
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+
+    config['local_input_data_path'] = dataset_path
+
+    with open("config.yaml", "w") as file:
+        yaml.dump(config, file)
+
+def set_uploaded_s3_input_data(bucket: str, key: str):
+    """Point the workflow's config.yaml at a dataset already in S3, as the upload step would."""
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+
+    config['s3_jsonl_file'] = key
+    config['uri_for_uploaded_s3_input_data'] = f"s3://{bucket}/{key}"
+    config.pop('uri_for_uploaded_s3_validation_data', None)
+
+    with open("config.yaml", "w") as file:
+        yaml.dump(config, file)
 
 @dataclass
 class GenerationStats:
-    """Track generation statistics."""
+    """Track generation statistics.
+
+    The timing fields are only filled in when the generator runs with profile=True.
+    """
     total_records: int = 0
     entities_generated: Dict[str, int] = None
     generation_time: float = 0.0
     validation_errors: List[str] = None
+    attribute_type_seconds: Dict[str, float] = None
+    attribute_type_calls: Dict[str, int] = None
+    entity_seconds: Dict[str, float] = None
+    entity_records: Dict[str, int] = None
+    example_seconds: float = 0.0
+    examples_timed: int = 0
+    serialization_seconds: float = 0.0
     
     def __post_init__(self):
         if self.entities_generated is None:
             self.entities_generated = {}
         if self.validation_errors is None:
             self.validation_errors = []
+        if self.attribute_type_seconds is None:
+            self.attribute_type_seconds = {}
+        if self.attribute_type_calls is None:
+            self.attribute_type_calls = {}
+        if self.entity_seconds is None:
+            self.entity_seconds = {}
+        if self.entity_records is None:
+            self.entity_records = {}
+    
+    def add_attribute_time(self, attribute_type: str, seconds: float, calls: int = 1):
+        """Accumulate time spent generating values of one attribute type."""
+        self.attribute_type_seconds[attribute_type] = self.attribute_type_seconds.get(attribute_type, 0.0) + seconds
+        self.attribute_type_calls[attribute_type] = self.attribute_type_calls.get(attribute_type, 0) + calls
+    
+    def add_entity_time(self, entity_name: str, seconds: float, records: int = 1):
+        """Accumulate time spent generating records of one entity."""
+        self.entity_seconds[entity_name] = self.entity_seconds.get(entity_name, 0.0) + seconds
+        self.entity_records[entity_name] = self.entity_records.get(entity_name, 0) + records
+    
+    def timing_totals(self) -> Dict[str, Any]:
+        """Raw timing counters, in the form merge_timings() accepts (used to combine shards)."""
+        return {
+            'attribute_type_seconds': self.attribute_type_seconds,
+            'attribute_type_calls': self.attribute_type_calls,
+            'entity_seconds': self.entity_seconds,
+            'entity_records': self.entity_records,
+            'example_seconds': self.example_seconds,
+            'examples_timed': self.examples_timed,
+            'serialization_seconds': self.serialization_seconds,
+        }
+    
+    def merge_timings(self, totals: Dict[str, Any]):
+        """Add the timing counters of another run (e.g. a shard) to these."""
+        for attribute_type, seconds in totals['attribute_type_seconds'].items():
+            self.add_attribute_time(attribute_type, seconds, totals['attribute_type_calls'][attribute_type])
+        for entity_name, seconds in totals['entity_seconds'].items():
+            self.add_entity_time(entity_name, seconds, totals['entity_records'][entity_name])
+        self.example_seconds += totals['example_seconds']
+        self.examples_timed += totals['examples_timed']
+        self.serialization_seconds += totals['serialization_seconds']
+    
+    def profile_breakdown(self) -> Dict[str, Any]:
+        """Timing breakdown for _metadata.json, with the most expensive entries first."""
+        def per_call(seconds, calls):
+            return round(seconds / calls * 1e6, 2) if calls else 0.0
+        
+        return {
+            'attribute_types': {
+                attribute_type: {
+                    'seconds': round(seconds, 4),
+                    'calls': self.attribute_type_calls[attribute_type],
+                    'microseconds_per_call': per_call(seconds, self.attribute_type_calls[attribute_type]),
+                }
+                for attribute_type, seconds in sorted(self.attribute_type_seconds.items(), key=lambda item: -item[1])
+            },
+            'entities': {
+                entity_name: {
+                    'seconds': round(seconds, 4),
+                    'records': self.entity_records[entity_name],
+                    'microseconds_per_record': per_call(seconds, self.entity_records[entity_name]),
+                }
+                for entity_name, seconds in sorted(self.entity_seconds.items(), key=lambda item: -item[1])
+            },
+            'example_assembly': {
+                'seconds': round(self.example_seconds, 4),
+                'examples': self.examples_timed,
+                'microseconds_per_example': per_call(self.example_seconds, self.examples_timed),
+            },
+            'serialization': {
+                'seconds': round(self.serialization_seconds, 4),
+            },
+        }
+
+class IdSequence:
+    """Collision-free ID sequence for one 'id' attribute: the n-th draw yields the n-th ID.
+
+    Only the sequence position is kept, so memory stays O(1) however many IDs are issued.
+    IDs are unique within the attribute; give attributes distinct prefixes to make them
+    unique across entities. The Feistel round keys come from `key`, which is derived from
+    the run seed, so every generator of a run (eager, lazy, or any shard worker) maps a
+    position to the same ID.
+
+    Strategies:
+        counter: zero-padded decimal counter (`id_width` digits, default 8), starting at 1.
+        feistel: the counter pushed through a keyed Feistel permutation of `id_bits` bits
+            (even, default 32) and written as hex, so IDs look random but never repeat.
+        uuid7: UUIDv7-style IDs; the counter fills the millisecond timestamp (counted from
+            the reference time) and the 12-bit sequence field, the rest is random.
+        random: IDs shaped like the 'random' strategy's (prefix and 8 hex digits, or a
+            version-4 UUID without a prefix) from a Feistel permutation of the counter.
+            Lazy pools use it for 'random' attributes: their records are regenerated out of
+            order, so uniqueness cannot come from a set of the IDs issued so far.
+    """
+    
+    def __init__(self, strategy: str, rng: random.Random, reference_time: datetime,
+                 prefix: str = '', bits: int = 32, width: int = 8, key: int = 0):
+        if strategy not in ID_STRATEGIES:
+            raise ValueError(f"Unknown ID sequence strategy '{strategy}' (expected one of {', '.join(ID_STRATEGIES)})")
+        self.strategy = strategy
+        self.prefix = prefix
+        self.rng = rng
+        self.position = 0
+        self.width = width
+        if strategy == 'random':
+            # The random strategy's shapes: 32 bits as hex after a prefix, 122 free bits of a UUIDv4
+            bits = 32 if prefix else 122
+        if strategy in ('feistel', 'random'):
+            if bits % 2 or not 8 <= bits <= 128:
+                raise ValueError(f"id_bits must be an even number between 8 and 128, got {bits}")
+            self.bits = bits
+            self.half_bits = bits // 2
+            self.half_mask = (1 << self.half_bits) - 1
+            key_rng = random.Random(key)
+            self.round_keys = [key_rng.getrandbits(64) for _ in range(_FEISTEL_ROUNDS)]
+        elif strategy == 'uuid7':
+            self.base_ms = int(reference_time.timestamp() * 1000)
+    
+    def seek(self, position: int):
+        """Move to a position, so the next ID is the position-th of the sequence."""
+        self.position = position
+    
+    def permute(self, value: int) -> int:
+        """Apply the keyed Feistel permutation (a bijection on `bits`-bit integers)."""
+        half_bits, half_mask = self.half_bits, self.half_mask
+        left, right = value >> half_bits, value & half_mask
+        for key in self.round_keys:
+            mixed = ((right ^ key) * _FEISTEL_MULTIPLIER) & _MASK_64
+            left, right = right, left ^ ((mixed ^ (mixed >> 29)) & half_mask)
+        return (left << half_bits) | right
+    
+    def next_id(self) -> str:
+        """Return the next ID of the sequence."""
+        position = self.position
+        self.position += 1
+        if self.strategy == 'counter':
+            return f"{self.prefix}{position + 1:0{self.width}d}"
+        if self.strategy == 'feistel':
+            if position >> self.bits:
+                raise ValueError(f"Feistel ID space of 2**{self.bits} exhausted; raise id_bits")
+            return f"{self.prefix}{self.permute(position):0{self.bits // 4}x}"
+        if self.strategy == 'random':
+            if position >> self.bits:
+                raise ValueError(f"Random ID space of 2**{self.bits} exhausted for prefix '{self.prefix}'")
+            value = self.permute(position)
+            if self.prefix:
+                return f"{self.prefix}{value:08x}"
+            # 48 bits | version 4 | 12 bits | variant | 62 bits, as uuid.UUID(version=4) lays them out
+            value = ((value >> 74) << 80) | (0x4 << 76) | (((value >> 62) & 0xFFF) << 64) \
+                | (0b10 << 62) | (value & ((1 << 62) - 1))
+            return str(uuid.UUID(int=value))
+        # uuid7: 48-bit ms timestamp | version 7 | 12-bit sequence | variant | 62 random bits
+        value = ((self.base_ms + (position >> 12)) << 80) | (0x7 << 76) | ((position & 0xFFF) << 64) \
+            | (0b10 << 62) | self.rng.getrandbits(62)
+        return f"{self.prefix}{uuid.UUID(int=value)}"
+
+class FakerValuePool:
+    """Pre-generated pools of Faker values, sampled with a controllable reuse ratio.
+
+    Each pool holds `size` values generated in bulk from a dedicated Faker seeded from
+    (locales, seed, value type) and is cached on disk under that key, so repeat runs load
+    it instantly. A draw reuses a pooled value with probability `reuse_ratio`; otherwise a
+    fresh value is generated and replaces the least recently used pool entry. Frozen
+    samplers draw from the pool as it was loaded and never replace entries, so their
+    values depend only on their own RNG.
+    """
+    
+    def __init__(self, size: int, reuse_ratio: float = 1.0, seed: int = 0,
+                 locales: List[str] = None, cache_dir: Optional[str] = '.faker_pool_cache'):
+        self.size = max(1, size)
+        self.reuse_ratio = min(max(reuse_ratio, 0.0), 1.0)
+        self.seed = seed
+        self.locales = list(locales or FAKER_LOCALES)
+        self.cache_dir = cache_dir
+        self.pools = {}
+        self.loaded = {}
+        self.recency = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._pool_fake = None
+        self._pool_rng = None
+    
+    def cache_path(self, key: str) -> Optional[str]:
+        """Return the on-disk cache file for one value type, keyed by locales, seed and size."""
+        if not self.cache_dir:
+            return None
+        cache_key = json.dumps({
+            'locales': self.locales,
+            'seed': self.seed,
+            'size': self.size,
+            'key': key,
+            'faker_version': faker_version,
+        }, sort_keys=True)
+        digest = hashlib.sha256(cache_key.encode('utf-8')).hexdigest()[:16]
+        safe_key = ''.join(c if c.isalnum() else '_' for c in key)
+        return os.path.join(self.cache_dir, f"{safe_key}_{digest}.json")
+    
+    def get_pool(self, key: str, make_value: Callable[[Faker], Any]) -> List[Any]:
+        """Load the pool for a value type from the disk cache, or generate and cache it."""
+        if key in self.pools:
+            return self.pools[key]
+        
+        cache_path = self.cache_path(key)
+        values = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    values = json.load(f)['values']
+                self.cache_hits += 1
+            except (OSError, ValueError, KeyError):
+                values = None
+        
+        if values is None:
+            self.cache_misses += 1
+            if self._pool_fake is None:
+                self._pool_rng = random.Random()
+                self._pool_fake = Faker(self.locales)
+                for factory in self._pool_fake.factories:
+                    factory.random = self._pool_rng
+            self._pool_rng.seed(derive_seed(self.seed, 'faker_pool', key))
+            values = [make_value(self._pool_fake) for _ in range(self.size)]
+            
+            if cache_path:
+                Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+                temp_path = f"{cache_path}.{os.getpid()}.tmp"
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    json.dump({'key': key, 'locales': self.locales, 'seed': self.seed, 'values': values}, f, ensure_ascii=False)
+                os.replace(temp_path, cache_path)
+        
+        self.pools[key] = values
+        self.loaded[key] = tuple(values)
+        self.recency[key] = OrderedDict.fromkeys(range(len(values)))
+        return values
+    
+    def sampler(self, key: str, make_value: Callable[[Faker], Any], fake: Faker,
+                rng: random.Random, frozen: bool = False) -> Callable[[Dict[str, Any]], Any]:
+        """Return a plan closure drawing values of one type from its pool (as loaded, if frozen)."""
+        values = self.get_pool(key, make_value)
+        if frozen:
+            values = self.loaded[key]
+        recency = self.recency[key]
+        reuse_ratio = self.reuse_ratio
+        randbelow = rng.randrange
+        draw = rng.random
+        pool_size = len(values)
+        
+        if reuse_ratio >= 1.0:
+            return lambda context: values[randbelow(pool_size)]
+        
+        if frozen:
+            return lambda context: values[randbelow(pool_size)] if draw() < reuse_ratio else make_value(fake)
+        
+        def sample_value(context):
+            if draw() < reuse_ratio:
+                index = randbelow(pool_size)
+                recency.move_to_end(index)
+                return values[index]
+            # Fresh value: evict the least recently used entry so the pool keeps renewing
+            value = make_value(fake)
+            index, _ = recency.popitem(last=False)
+            values[index] = value
+            recency[index] = None
+            return value
+        
+        return sample_value
 
 class AdvancedFieldGenerator:
     """Advanced field generator that handles complex, high-cardinality fields."""
     
-    def __init__(self):
+    def __init__(self, seed: Optional[int] = None, value_pool: Optional[FakerValuePool] = None,
+                 reference_time: Optional[datetime] = None, id_seed: Optional[int] = None,
+                 indexed_ids: bool = False, frozen_pool: bool = False):
         self.generated_ids = set()
+        # Lazy pools position IDs by record index, so 'random' IDs come from a sequence too
+        self.indexed_ids = indexed_ids
+        # ...and draw Faker values without changing the pool, which other records read too
+        self.frozen_pool = frozen_pool
+        self.id_sequences = {}
         self.context_cache = {}
+        self.value_pool = value_pool
+        
+        # 'now' in date bounds resolves to one fixed instant, so a run can be replayed later
+        self.reference_time = reference_time or datetime.now().replace(microsecond=0)
+        
+        # One RNG drives both our own draws and every Faker locale, so a seed reproduces everything
+        self.rng = random.Random(seed)
+        # ID sequences are keyed from the run seed rather than this generator's RNG state
+        self.id_seed = id_seed if id_seed is not None else (seed if seed is not None else self.rng.getrandbits(64))
+        self.np_rng = np.random.default_rng(None if seed is None else derive_seed(seed, 'numpy')) if np is not None else None
+        self.fake = Faker(FAKER_LOCALES)
+        for factory in self.fake.factories:
+            factory.random = self.rng
         
         # Enhanced automotive data
         self.automotive_data = {
@@ -66,11 +462,36 @@ class AdvancedFieldGenerator:
     def generate_unique_id(self, prefix: str = "") -> str:
         """Generate unique ID with optional prefix."""
         while True:
-            new_id = f"{prefix}{uuid.uuid4().hex[:8]}" if prefix else str(uuid.uuid4())
+            new_uuid = uuid.UUID(int=self.rng.getrandbits(128), version=4)
+            new_id = f"{prefix}{new_uuid.hex[:8]}" if prefix else str(new_uuid)
             if new_id not in self.generated_ids:
                 self.generated_ids.add(new_id)
                 return new_id
     
+    def id_generator(self, attribute: Dict[str, Any]) -> Callable[[], str]:
+        """Return the ID source for an 'id' attribute, as selected by its `id_strategy`.
+
+        Sequences are created once per attribute and shared by its row and column plans.
+        """
+        strategy = attribute.get('id_strategy', 'random')
+        prefix = attribute.get('prefix', '')
+        if strategy == 'random' and not self.indexed_ids:
+            generate_unique_id = self.generate_unique_id
+            return lambda: generate_unique_id(prefix)
+        
+        sequence = self.id_sequences.get(id(attribute))
+        if sequence is None:
+            sequence = IdSequence(strategy, self.rng, self.reference_time, prefix,
+                                  attribute.get('id_bits', 32), attribute.get('id_width', 8),
+                                  derive_seed(self.id_seed, 'id_sequence', attribute['name'], prefix))
+            self.id_sequences[id(attribute)] = sequence
+        return sequence.next_id
+    
+    def seek_id_sequences(self, position: int):
+        """Position every ID sequence at `position`, so IDs follow a record's index rather than call order."""
+        for sequence in self.id_sequences.values():
+            sequence.seek(position)
+    
     def generate_field_value(self, attribute: Dict[str, Any], context: Dict[str, Any] = None) -> Any:
         """Generate field value based on attribute configuration and context."""
         field_type = attribute['type']
@@ -81,25 +502,25 @@ class AdvancedFieldGenerator:
             context = {}
         
         if field_type == 'id':
-            return self.generate_unique_id()
+            return self.id_generator(attribute)()
         
         elif field_type == 'first_name':
-            return fake.first_name()
+            return self.fake.first_name()
         
         elif field_type == 'last_name':
-            return fake.last_name()
+            return self.fake.last_name()
         
         elif field_type == 'full_name':
-            return fake.name()
+            return self.fake.name()
         
         elif field_type == 'email':
-            return fake.email()
+            return self.fake.email()
         
         elif field_type == 'phone':
-            return fake.phone_number()
+            return self.fake.phone_number()
         
         elif field_type == 'address':
-            return fake.address().replace('\n', ', ')
+            return self.fake.address().replace('\n', ', ')
         
         elif field_type == 'integer':
             min_val = attribute.get('min', 0)
@@ -107,21 +528,21 @@ class AdvancedFieldGenerator:
             
             # Context-aware integer generation
             if 'mileage' in field_name:
-                return random.randint(0, 200000)
+                return self.rng.randint(0, 200000)
             elif 'year' in field_name:
-                return random.randint(2015, 2025)
+                return self.rng.randint(2015, 2025)
             elif 'price' in field_name or 'revenue' in field_name:
-                return random.randint(min_val, max_val)
+                return self.rng.randint(min_val, max_val)
             else:
-                return random.randint(min_val, max_val)
+                return self.rng.randint(min_val, max_val)
         
         elif field_type == 'float':
             min_val = attribute.get('min', 0.0)
             max_val = attribute.get('max', 1.0)
-            return round(random.uniform(min_val, max_val), 2)
+            return round(self.rng.uniform(min_val, max_val), 2)
         
         elif field_type == 'boolean':
-            return random.choice([True, False])
+            return self.rng.choice(_BOOLEAN_VALUES)
         
         elif field_type == 'categorical':
             categories = attribute.get('categories', [])
@@ -130,64 +551,26 @@ class AdvancedFieldGenerator:
             
             # Weighted selection for more realistic distributions
             if 'status' in field_name:
-                # Generate weights that match the number of categories
-                num_categories = len(categories)
-                if num_categories == 1:
-                    weights = [1.0]
-                elif num_categories == 2:
-                    weights = [0.7, 0.3]
-                elif num_categories == 3:
-                    weights = [0.5, 0.3, 0.2]
-                elif num_categories == 4:
-                    weights = [0.4, 0.3, 0.2, 0.1]
-                elif num_categories == 5:
-                    weights = [0.4, 0.3, 0.15, 0.1, 0.05]
-                else:
-                    # For more than 5 categories, create a decreasing weight distribution
-                    weights = []
-                    remaining_weight = 1.0
-                    for i in range(num_categories):
-                        if i == num_categories - 1:
-                            # Last category gets remaining weight
-                            weights.append(remaining_weight)
-                        else:
-                            # Each category gets progressively less weight
-                            weight = remaining_weight * (0.5 ** i) * 0.6
-                            weights.append(weight)
-                            remaining_weight -= weight
-                    
-                    # Normalize weights to sum to 1.0
-                    total_weight = sum(weights)
-                    weights = [w / total_weight for w in weights]
-                
-                return random.choices(categories, weights=weights)[0]
+                weights = self.status_weights(len(categories))
+                return self.rng.choices(categories, weights=weights)[0]
             else:
-                return random.choice(categories)
+                return self.rng.choice(categories)
         
         elif field_type == 'list':
             min_length = attribute.get('min_length', 0)
             max_length = attribute.get('max_length', 5)
-            length = random.randint(min_length, max_length)
+            length = self.rng.randint(min_length, max_length)
             
             if length == 0:
                 return []
             
             # Generate context-appropriate list items
-            if 'skill' in field_name:
-                available_items = self.business_data['skills']
-            elif 'language' in field_name:
-                available_items = ['English', 'Spanish', 'French', 'German', 'Chinese', 'Japanese', 'Arabic', 'Portuguese', 'Russian', 'Hindi', 'Italian', 'Korean']
-            elif 'certification' in field_name:
-                available_items = ['AWS Certified', 'Google Cloud Certified', 'Microsoft Certified', 'Salesforce Certified', 'PMP', 'Six Sigma', 'CISSP', 'CPA', 'MBA', 'PhD']
-            elif 'condition' in field_name or 'medical' in field_name:
-                available_items = ['Hypertension', 'Diabetes', 'Asthma', 'Arthritis', 'Depression', 'Anxiety', 'Migraine', 'Back Pain', 'High Cholesterol', 'Sleep Apnea']
-            elif 'allerg' in field_name:
-                available_items = ['Peanuts', 'Shellfish', 'Dairy', 'Eggs', 'Soy', 'Wheat', 'Tree Nuts', 'Fish', 'Sesame', 'Latex', 'Penicillin', 'Sulfa', 'Ibuprofen', 'Aspirin', 'Dust Mites', 'Pollen', 'Pet Dander', 'Mold']
-            else:
-                available_items = [fake.word() for _ in range(20)]
+            available_items = self.list_item_pool(field_name)
+            if available_items is None:
+                available_items = [self.fake.word() for _ in range(20)]
             
             # Ensure no duplicates
-            selected_items = random.sample(available_items, min(length, len(available_items)))
+            selected_items = self.rng.sample(available_items, min(length, len(available_items)))
             return selected_items
         
         elif field_type in ['datetime', 'date']:
@@ -196,12 +579,12 @@ class AdvancedFieldGenerator:
             
             try:
                 if min_date == 'now':
-                    start_date = datetime.now()
+                    start_date = self.reference_time
                 else:
                     start_date = datetime.strptime(min_date, '%Y-%m-%d')
                 
                 if max_date == 'now':
-                    end_date = datetime.now()
+                    end_date = self.reference_time
                 else:
                     end_date = datetime.strptime(max_date, '%Y-%m-%d')
                 
@@ -211,7 +594,7 @@ class AdvancedFieldGenerator:
                 # Generate random datetime between start and end
                 time_between = end_date - start_date
                 days_between = time_between.days
-                random_days = random.randint(0, days_between)
+                random_days = self.rng.randint(0, days_between)
                 random_date = start_date + timedelta(days=random_days)
                 
                 if field_type == 'date':
@@ -219,16 +602,16 @@ class AdvancedFieldGenerator:
                 else:
                     # Add random time
                     random_time = timedelta(
-                        hours=random.randint(0, 23),
-                        minutes=random.randint(0, 59),
-                        seconds=random.randint(0, 59)
+                        hours=self.rng.randint(0, 23),
+                        minutes=self.rng.randint(0, 59),
+                        seconds=self.rng.randint(0, 59)
                     )
                     random_datetime = random_date + random_time
                     return random_datetime.strftime('%Y-%m-%d %H:%M:%S')
             
             except Exception:
-                # Fallback to current date/time
-                now = datetime.now()
+                # Fallback to the reference date/time
+                now = self.reference_time
                 if field_type == 'date':
                     return now.strftime('%Y-%m-%d')
                 else:
@@ -239,24 +622,390 @@ class AdvancedFieldGenerator:
             
             # Generate context-aware text
             if 'description' in field_name or 'summary' in field_name:
-                return fake.text(max_nb_chars=max_length)
+                return self.fake.text(max_nb_chars=max_length)
             elif 'note' in field_name or 'comment' in field_name:
-                return fake.sentence(nb_words=random.randint(5, 20))
+                return self.fake.sentence(nb_words=self.rng.randint(5, 20))
             elif 'rationale' in field_name or 'reason' in field_name:
                 return self.generate_business_rationale(context, max_length)
             else:
-                return fake.text(max_nb_chars=max_length)
+                return self.fake.text(max_nb_chars=max_length)
         
         # Automotive-specific fields
         elif field_type == 'vin':
-            return fake.vin()
+            return self.fake.vin()
         
         elif field_type == 'license_plate':
-            return fake.license_plate()
+            return self.fake.license_plate()
         
         # Fallback
         else:
-            return fake.word()
+            return self.fake.word()
+    
+    def status_weights(self, num_categories: int) -> List[float]:
+        """Decreasing weights used for 'status' categoricals, matched to the number of categories."""
+        if num_categories == 1:
+            return [1.0]
+        elif num_categories == 2:
+            return [0.7, 0.3]
+        elif num_categories == 3:
+            return [0.5, 0.3, 0.2]
+        elif num_categories == 4:
+            return [0.4, 0.3, 0.2, 0.1]
+        elif num_categories == 5:
+            return [0.4, 0.3, 0.15, 0.1, 0.05]
+        
+        # For more than 5 categories, create a decreasing weight distribution
+        weights = []
+        remaining_weight = 1.0
+        for i in range(num_categories):
+            if i == num_categories - 1:
+                # Last category gets remaining weight
+                weights.append(remaining_weight)
+            else:
+                # Each category gets progressively less weight
+                weight = remaining_weight * (0.5 ** i) * 0.6
+                weights.append(weight)
+                remaining_weight -= weight
+        
+        # Normalize weights to sum to 1.0
+        total_weight = sum(weights)
+        return [w / total_weight for w in weights]
+    
+    def list_item_pool(self, field_name: str) -> Optional[List[str]]:
+        """Return the fixed item pool for a list field, or None when items should be random words."""
+        if 'skill' in field_name:
+            return self.business_data['skills']
+        elif 'language' in field_name:
+            return ['English', 'Spanish', 'French', 'German', 'Chinese', 'Japanese', 'Arabic', 'Portuguese', 'Russian', 'Hindi', 'Italian', 'Korean']
+        elif 'certification' in field_name:
+            return ['AWS Certified', 'Google Cloud Certified', 'Microsoft Certified', 'Salesforce Certified', 'PMP', 'Six Sigma', 'CISSP', 'CPA', 'MBA', 'PhD']
+        elif 'condition' in field_name or 'medical' in field_name:
+            return ['Hypertension', 'Diabetes', 'Asthma', 'Arthritis', 'Depression', 'Anxiety', 'Migraine', 'Back Pain', 'High Cholesterol', 'Sleep Apnea']
+        elif 'allerg' in field_name:
+            return ['Peanuts', 'Shellfish', 'Dairy', 'Eggs', 'Soy', 'Wheat', 'Tree Nuts', 'Fish', 'Sesame', 'Latex', 'Penicillin', 'Sulfa', 'Ibuprofen', 'Aspirin', 'Dust Mites', 'Pollen', 'Pet Dander', 'Mold']
+        return None
+    
+    def compile_attributes(self, attributes: List[Dict[str, Any]]) -> tuple:
+        """Compile an entity's attribute list into a plan of (field_name, generator) pairs.
+
+        Each generator is a closure taking the generation context. Type dispatch, field-name
+        heuristics, categorical weights, date bounds and list pools are all resolved here once,
+        and the closures draw from the RNG in the same order as generate_field_value().
+        """
+        return tuple((attribute['name'], self.compile_attribute(attribute)) for attribute in attributes)
+    
+    def faker_value_source(self, attribute: Dict[str, Any]) -> tuple:
+        """Return (pool_key, make_value) for Faker-backed attributes, or (None, None) otherwise.
+
+        make_value takes a Faker instance, so the same recipe fills a value pool in bulk
+        and produces fresh values from the generator's own Faker.
+        """
+        field_type = attribute['type']
+        field_name = attribute.get('name', '').lower()
+        
+        if field_type == 'first_name':
+            return 'first_name', lambda fake: fake.first_name()
+        elif field_type == 'last_name':
+            return 'last_name', lambda fake: fake.last_name()
+        elif field_type == 'full_name':
+            return 'full_name', lambda fake: fake.name()
+        elif field_type == 'email':
+            return 'email', lambda fake: fake.email()
+        elif field_type == 'phone':
+            return 'phone', lambda fake: fake.phone_number()
+        elif field_type == 'address':
+            return 'address', lambda fake: fake.address().replace('\n', ', ')
+        elif field_type == 'vin':
+            return 'vin', lambda fake: fake.vin()
+        elif field_type == 'license_plate':
+            return 'license_plate', lambda fake: fake.license_plate()
+        elif field_type == 'text':
+            max_length = attribute.get('max_length', 500)
+            text_source = (f"text_{max_length}", lambda fake: fake.text(max_nb_chars=max_length))
+            if 'description' in field_name or 'summary' in field_name:
+                return text_source
+            elif 'note' in field_name or 'comment' in field_name:
+                return 'sentence', lambda fake: fake.sentence(nb_words=fake.random_int(5, 20))
+            elif 'rationale' in field_name or 'reason' in field_name:
+                # Rationales come from our own templates, not Faker
+                return None, None
+            return text_source
+        return None, None
+    
+    def compile_attribute(self, attribute: Dict[str, Any]) -> Callable[[Dict[str, Any]], Any]:
+        """Resolve a single attribute configuration into a ready-to-call generator closure."""
+        field_type = attribute['type']
+        field_name = attribute.get('name', '').lower()
+        fake = self.fake
+        rng = self.rng
+        randint = rng.randint
+        
+        # Faker-backed types draw from the value pool when one is configured
+        if self.value_pool is not None:
+            pool_key, make_value = self.faker_value_source(attribute)
+            if pool_key is not None:
+                return self.value_pool.sampler(pool_key, make_value, fake, rng, frozen=self.frozen_pool)
+        
+        if field_type == 'id':
+            next_id = self.id_generator(attribute)
+            return lambda context: next_id()
+        
+        elif field_type == 'first_name':
+            return lambda context: fake.first_name()
+        
+        elif field_type == 'last_name':
+            return lambda context: fake.last_name()
+        
+        elif field_type == 'full_name':
+            return lambda context: fake.name()
+        
+        elif field_type == 'email':
+            return lambda context: fake.email()
+        
+        elif field_type == 'phone':
+            return lambda context: fake.phone_number()
+        
+        elif field_type == 'address':
+            return lambda context: fake.address().replace('\n', ', ')
+        
+        elif field_type == 'integer':
+            if 'mileage' in field_name:
+                min_val, max_val = 0, 200000
+            elif 'year' in field_name:
+                min_val, max_val = 2015, 2025
+            else:
+                min_val, max_val = attribute.get('min', 0), attribute.get('max', 100)
+            return lambda context: randint(min_val, max_val)
+        
+        elif field_type == 'float':
+            min_val = attribute.get('min', 0.0)
+            max_val = attribute.get('max', 1.0)
+            uniform = rng.uniform
+            return lambda context: round(uniform(min_val, max_val), 2)
+        
+        elif field_type == 'boolean':
+            choice = rng.choice
+            return lambda context: choice(_BOOLEAN_VALUES)
+        
+        elif field_type == 'categorical':
+            categories = list(attribute.get('categories', []))
+            if not categories:
+                return lambda context: None
+            
+            if 'status' in field_name:
+                cum_weights = list(accumulate(self.status_weights(len(categories))))
+                choices = rng.choices
+                return lambda context: choices(categories, cum_weights=cum_weights)[0]
+            choice = rng.choice
+            return lambda context: choice(categories)
+        
+        elif field_type == 'list':
+            min_length = attribute.get('min_length', 0)
+            max_length = attribute.get('max_length', 5)
+            pool = self.list_item_pool(field_name)
+            sample = rng.sample
+            
+            def generate_list(context):
+                length = randint(min_length, max_length)
+                if length == 0:
+                    return []
+                available_items = pool if pool is not None else [fake.word() for _ in range(20)]
+                return sample(available_items, min(length, len(available_items)))
+            
+            return generate_list
+        
+        elif field_type in ['datetime', 'date']:
+            return self.compile_date_attribute(attribute, field_type)
+        
+        elif field_type == 'text':
+            max_length = attribute.get('max_length', 500)
+            
+            if 'description' in field_name or 'summary' in field_name:
+                return lambda context: fake.text(max_nb_chars=max_length)
+            elif 'note' in field_name or 'comment' in field_name:
+                return lambda context: fake.sentence(nb_words=randint(5, 20))
+            elif 'rationale' in field_name or 'reason' in field_name:
+                generate_business_rationale = self.generate_business_rationale
+                return lambda context: generate_business_rationale(context, max_length)
+            return lambda context: fake.text(max_nb_chars=max_length)
+        
+        # Automotive-specific fields
+        elif field_type == 'vin':
+            return lambda context: fake.vin()
+        
+        elif field_type == 'license_plate':
+            return lambda context: fake.license_plate()
+        
+        # Fallback
+        return lambda context: fake.word()
+    
+    def resolve_date_bounds(self, attribute: Dict[str, Any]) -> Optional[tuple]:
+        """Return (start_date, days_between) for a date attribute, or None if its bounds cannot be parsed."""
+        min_date = attribute.get('min', '2020-01-01')
+        max_date = attribute.get('max', 'now')
+        try:
+            start_date = self.reference_time if min_date == 'now' else datetime.strptime(min_date, '%Y-%m-%d')
+            end_date = self.reference_time if max_date == 'now' else datetime.strptime(max_date, '%Y-%m-%d')
+        except Exception:
+            return None
+        
+        if start_date > end_date:
+            start_date, end_date = end_date, start_date
+        return start_date, (end_date - start_date).days
+    
+    def compile_date_attribute(self, attribute: Dict[str, Any], field_type: str) -> Callable[[Dict[str, Any]], Any]:
+        """Resolve date bounds once and return a closure drawing a day offset (and time) per value."""
+        date_format = '%Y-%m-%d' if field_type == 'date' else '%Y-%m-%d %H:%M:%S'
+        randint = self.rng.randint
+        
+        bounds = self.resolve_date_bounds(attribute)
+        if bounds is None:
+            # Fallback to the reference date/time, as generate_field_value does
+            formatted_now = self.reference_time.strftime(date_format)
+            return lambda context: formatted_now
+        start_date, days_between = bounds
+        
+        if field_type == 'date':
+            # Day granularity: every possible value can be formatted up front
+            if days_between <= _MAX_PRECOMPUTED_DAYS:
+                dates = [(start_date + timedelta(days=day)).strftime(date_format) for day in range(days_between + 1)]
+                return lambda context: dates[randint(0, days_between)]
+            return lambda context: (start_date + timedelta(days=randint(0, days_between))).strftime(date_format)
+        
+        def generate_datetime(context):
+            random_days = randint(0, days_between)
+            random_time = timedelta(days=random_days, hours=randint(0, 23), minutes=randint(0, 59), seconds=randint(0, 59))
+            return (start_date + random_time).strftime(date_format)
+        
+        return generate_datetime
+    
+    def compile_columns(self, attributes: List[Dict[str, Any]]) -> tuple:
+        """Compile an attribute list into (field_name, column_generator) pairs for columnar batches.
+
+        A column generator takes (num_records, contexts) and returns one value per record.
+        Numeric, boolean, categorical, list and date attributes draw the whole column at once
+        from the NumPy generator; every other type runs its per-value plan closure per record.
+        """
+        return tuple((attribute['name'], self.compile_column(attribute)) for attribute in attributes)
+    
+    def compile_column(self, attribute: Dict[str, Any]) -> Callable[[int, List[Dict[str, Any]]], List[Any]]:
+        """Return a column generator for one attribute, vectorized when the type allows it."""
+        column = self.compile_vectorized_column(attribute) if np is not None else None
+        if column is not None:
+            return column
+        
+        generate_value = self.compile_attribute(attribute)
+        return lambda num_records, contexts: [generate_value(context) for context in contexts]
+    
+    def compile_vectorized_column(self, attribute: Dict[str, Any]) -> Optional[Callable[[int, List[Dict[str, Any]]], List[Any]]]:
+        """Build a NumPy column generator with the same ranges and weighting as the scalar path.
+
+        Returns None for attribute types that have no vectorized form.
+        """
+        field_type = attribute['type']
+        field_name = attribute.get('name', '').lower()
+        np_rng = self.np_rng
+        
+        # Pure pool reuse needs no Faker calls, so pooled types can be sampled as index columns
+        if self.value_pool is not None and self.value_pool.reuse_ratio >= 1.0:
+            pool_key, make_value = self.faker_value_source(attribute)
+            if pool_key is not None:
+                values = np.empty(self.value_pool.size, dtype=object)
+                values[:] = self.value_pool.get_pool(pool_key, make_value)
+                return lambda num_records, contexts: values[np_rng.integers(0, len(values), size=num_records)].tolist()
+        
+        if field_type == 'integer':
+            if 'mileage' in field_name:
+                min_val, max_val = 0, 200000
+            elif 'year' in field_name:
+                min_val, max_val = 2015, 2025
+            else:
+                min_val, max_val = int(attribute.get('min', 0)), int(attribute.get('max', 100))
+            return lambda num_records, contexts: np_rng.integers(min_val, max_val, size=num_records, endpoint=True).tolist()
+        
+        elif field_type == 'float':
+            min_val = attribute.get('min', 0.0)
+            max_val = attribute.get('max', 1.0)
+            return lambda num_records, contexts: np.round(np_rng.uniform(min_val, max_val, size=num_records), 2).tolist()
+        
+        elif field_type == 'boolean':
+            return lambda num_records, contexts: (np_rng.integers(0, 2, size=num_records) == 0).tolist()
+        
+        elif field_type == 'categorical':
+            categories = list(attribute.get('categories', []))
+            if not categories:
+                return lambda num_records, contexts: [None] * num_records
+            
+            pool = np.empty(len(categories), dtype=object)
+            pool[:] = categories
+            if 'status' in field_name:
+                weights = np.asarray(self.status_weights(len(categories)), dtype=float)
+                probabilities = weights / weights.sum()
+                return lambda num_records, contexts: pool[np_rng.choice(len(categories), size=num_records, p=probabilities)].tolist()
+            return lambda num_records, contexts: pool[np_rng.integers(0, len(categories), size=num_records)].tolist()
+        
+        elif field_type == 'list':
+            return self.compile_list_column(attribute, field_name)
+        
+        elif field_type in ['datetime', 'date']:
+            bounds = self.resolve_date_bounds(attribute)
+            if bounds is None:
+                return None
+            start_date, days_between = bounds
+            
+            if field_type == 'date':
+                epoch = np.datetime64(start_date.date(), 'D')
+                return lambda num_records, contexts: np.datetime_as_string(
+                    epoch + np_rng.integers(0, days_between, size=num_records, endpoint=True), unit='D').tolist()
+            
+            # A uniform second within [start, start + days_between + 1 day) equals a uniform day plus a uniform time of day
+            epoch = np.datetime64(start_date.replace(microsecond=0), 's')
+            span_seconds = (days_between + 1) * 86400
+            
+            def generate_datetime_column(num_records, contexts):
+                offsets = np_rng.integers(0, span_seconds, size=num_records)
+                return [value.replace('T', ' ') for value in np.datetime_as_string(epoch + offsets, unit='s').tolist()]
+            
+            return generate_datetime_column
+        
+        return None
+    
+    def compile_list_column(self, attribute: Dict[str, Any], field_name: str) -> Callable[[int, List[Dict[str, Any]]], List[Any]]:
+        """Vectorized list column: lengths and without-replacement picks are drawn as NumPy matrices.
+
+        Fields without a fixed pool get fresh Faker words per record, as the scalar path does.
+        Picking k of 20 fresh words is the same as drawing k fresh words, so only those are drawn.
+        """
+        min_length = attribute.get('min_length', 0)
+        max_length = attribute.get('max_length', 5)
+        np_rng = self.np_rng
+        pool = self.list_item_pool(field_name)
+        
+        if pool is None:
+            # Look word up on every call: a multi-locale Faker picks the locale at attribute access
+            fake = self.fake
+            
+            def generate_word_list_column(num_records, contexts):
+                lengths = np_rng.integers(min_length, max_length, size=num_records, endpoint=True)
+                return [[fake.word() for _ in range(min(length, 20))] for length in lengths.tolist()]
+            
+            return generate_word_list_column
+        
+        items = list(pool)
+        width = len(items)
+        pick_width = max(0, min(max_length, width))
+        
+        def generate_list_column(num_records, contexts):
+            values = []
+            for chunk_start in range(0, num_records, _LIST_COLUMN_CHUNK):
+                chunk_size = min(_LIST_COLUMN_CHUNK, num_records - chunk_start)
+                lengths = np_rng.integers(min_length, max_length, size=chunk_size, endpoint=True)
+                # Sorting random keys gives an independent random permutation per row
+                order = np.argsort(np_rng.random((chunk_size, width)), axis=1)[:, :pick_width]
+                values.extend([items[i] for i in row[:length]] for row, length in zip(order.tolist(), lengths.tolist()))
+            return values
+        
+        return generate_list_column
     
     def generate_business_rationale(self, context: Dict[str, Any], max_length: int) -> str:
         """Generate business rationale text based on context."""
@@ -274,24 +1023,141 @@ class AdvancedFieldGenerator:
             "stakeholder feedback", "industry trends", "operational efficiency", "scalability needs"
         ]
         
-        template = random.choice(templates)
-        factor = random.choice(context_factors)
+        template = self.rng.choice(templates)
+        factor = self.rng.choice(context_factors)
         rationale = template.format(context_factor=factor)
         
         return rationale[:max_length]
 
+class LazyEntityPool(Sequence):
+    """Fixed-size pool of entity records, each generated the first time it is sampled.
+
+    Materialized records are kept in a bounded LRU cache. Record i is always generated
+    from the same derived seed, so an evicted record comes back identical and the pool's
+    contents never depend on access order.
+    """
+    
+    def __init__(self, generator: 'EnhancedDataGenerator', entity_config: Dict[str, Any], size: int, cache_size: int):
+        self.generator = generator
+        self.entity_config = entity_config
+        self.size = size
+        self.cache_size = max(1, cache_size)
+        self.materialized = 0
+        self._cache = OrderedDict()
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.size))]
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError("entity pool index out of range")
+        
+        record = self._cache.get(index)
+        if record is not None:
+            self._cache.move_to_end(index)
+            return record
+        
+        record = self.generator.materialize_entity(self.entity_config, index)
+        self.materialized += 1
+        self._cache[index] = record
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return record
+
 class EnhancedDataGenerator:
     """Enhanced data generator that fully utilizes rich YAML configurations."""
     
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, seed: Optional[int] = None, columnar: bool = False,
+                 faker_pool_size: int = 0, faker_reuse_ratio: float = 1.0, faker_pool_seed: Optional[int] = None,
+                 faker_pool_cache: Optional[str] = '.faker_pool_cache', reference_time: Optional[str] = None,
+                 lazy_entities: bool = False, entity_cache_size: int = 10000, profile: bool = False,
+                 serializer: str = 'json'):
         self.config_path = config_path
         self.config = self.load_config()
-        self.field_generator = AdvancedFieldGenerator()
+        self.profile = profile
+        # Resolve now so metadata and checkpoints name the backend that actually wrote the file
+        self.serializer = get_serializer(serializer)[0]
+        
+        if columnar and np is None:
+            print("WARNING: NumPy is not installed; falling back to row-by-row entity generation.")
+            columnar = False
+        self.columnar = columnar
+
+        # Always run with a concrete seed so it can be recorded and the run reproduced
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.reference_time = (datetime.fromisoformat(reference_time) if reference_time
+                               else datetime.now().replace(microsecond=0))
+        
+        # Optional Faker value pools; shard workers share the run seed so they reuse one cached pool
+        self.faker_pool_size = faker_pool_size
+        self.faker_reuse_ratio = faker_reuse_ratio
+        self.faker_pool_seed = faker_pool_seed if faker_pool_seed is not None else self.seed
+        self.faker_pool_cache = faker_pool_cache
+        value_pool = None
+        if faker_pool_size > 0:
+            value_pool = FakerValuePool(faker_pool_size, faker_reuse_ratio, self.faker_pool_seed,
+                                        FAKER_LOCALES, faker_pool_cache)
+        
+        self.field_generator = AdvancedFieldGenerator(self.seed, value_pool, self.reference_time, id_seed=self.seed)
+        self.rng = self.field_generator.rng
+        self.workers = 1
+        self.write_chunk_size = 1000
+        self.checkpoint_every = 1000
+        
+        # Pool growth history as [first example index, records per entity] pairs, and the
+        # example index the last write stopped at; both are recorded so a dataset can be appended to
+        self.pool_sizes = []
+        self.next_example = 0
+        
+        # Lazy entity pools materialize records on first use (see build_entity_pools)
+        self.lazy_entities = lazy_entities
+        self.entity_cache_size = entity_cache_size
+        self.lazy_field_generator = None
+        self.lazy_pools = {}
+        
+        # Optional dedup stage run over the finished JSONL (None disables it)
+        self.dedup_threshold = None
+        self.dedup_store = None
+        self.dedup_report = None
+        
+        # Optional packaging of the finished JSONL into compressed / fixed-row parts with a manifest
+        self.compression = 'none'
+        self.partition_rows = 0
+        self.manifest_path = None
+        self.s3_uri = None
         self.entity_data_cache = {}
         self.stats = GenerationStats()
         
         # Validate configuration
         self.validate_config()
+        self.entity_plans = self.compile_entity_plans()
+        self.entity_column_plans = {}
+        self.relationship_index = self.build_relationship_index()
+        self.compile_example_template()
+    
+    def generator_options(self) -> Dict[str, Any]:
+        """Constructor options a shard worker needs to rebuild an equivalent generator."""
+        return {
+            'columnar': self.columnar,
+            'faker_pool_size': self.faker_pool_size,
+            'faker_reuse_ratio': self.faker_reuse_ratio,
+            'faker_pool_seed': self.faker_pool_seed,
+            'faker_pool_cache': self.faker_pool_cache,
+            'reference_time': self.reference_time.isoformat(),
+            'lazy_entities': self.lazy_entities,
+            'entity_cache_size': self.entity_cache_size,
+            'profile': self.profile,
+            'serializer': self.serializer,
+        }
+    
+    def config_digest(self) -> str:
+        """SHA-256 of the configuration file, used to refuse resuming against an edited config."""
+        with open(self.config_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
     
     def load_config(self) -> Dict[str, Any]:
         """Load and parse YAML configuration."""
@@ -314,149 +1180,434 @@ class EnhancedDataGenerator:
         if not self.config.get('entities'):
             raise ValueError("No entities defined in configuration")
         
+        for entity in self.config['entities']:
+            for attribute in entity.get('attributes', []):
+                if attribute.get('type') == 'id' and attribute.get('id_strategy', 'random') not in ID_STRATEGIES:
+                    raise ValueError(f"Unknown id_strategy '{attribute['id_strategy']}' for {entity['name']}.{attribute['name']} "
+                                     f"(expected one of {', '.join(ID_STRATEGIES)})")
+        
         # Count total attributes for validation
         total_attrs = sum(len(entity.get('attributes', [])) for entity in self.config['entities'])
         if total_attrs < 20:  # Minimum threshold
             print(f"WARNING: Only {total_attrs} total attributes found. Consider adding more for richer data.")
     
+    def compile_entity_plans(self) -> Dict[str, tuple]:
+        """Compile every entity's attributes into a generator plan once per run."""
+        return {entity['name']: self.compile_plan(entity) for entity in self.config['entities']}
+    
+    def compile_plan(self, entity_config: Dict[str, Any], columnar: bool = False,
+                     field_generator: Optional[AdvancedFieldGenerator] = None) -> tuple:
+        """Compile an entity's row (or column) plan, instrumenting every step when profiling."""
+        field_generator = field_generator or self.field_generator
+        attributes = entity_config.get('attributes', [])
+        if columnar:
+            plan = field_generator.compile_columns(attributes)
+        else:
+            plan = field_generator.compile_attributes(attributes)
+        if not self.profile:
+            return plan
+        
+        stats = self.stats
+        perf_counter = time.perf_counter
+        
+        def timed(generate, attribute_type):
+            if columnar:
+                def timed_column(num_records, contexts):
+                    start = perf_counter()
+                    values = generate(num_records, contexts)
+                    stats.add_attribute_time(attribute_type, perf_counter() - start, num_records)
+                    return values
+                return timed_column
+            
+            def timed_value(context):
+                start = perf_counter()
+                value = generate(context)
+                stats.add_attribute_time(attribute_type, perf_counter() - start)
+                return value
+            return timed_value
+        
+        return tuple((field_name, timed(generate, attribute['type']))
+                     for (field_name, generate), attribute in zip(plan, attributes))
+    
     def generate_entity_data(self, entity_config: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Generate data for a single entity with full attribute utilization."""
         entity_name = entity_config['name']
-        attributes = entity_config.get('attributes', [])
+        plan = self.entity_plans.get(entity_name)
+        if plan is None:
+            plan = self.compile_plan(entity_config)
+            self.entity_plans[entity_name] = plan
         
-        if not attributes:
+        return self.run_entity_plan(plan, entity_name, context)
+    
+    def run_entity_plan(self, plan: tuple, entity_name: str, context: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Run a compiled attribute plan; each step sees the values generated before it."""
+        if not plan:
             return {}
         
         entity_data = {}
-        generation_context = context or {}
+        generation_context = dict(context or {}, entity_name=entity_name)
         
-        # Generate all attributes
-        for attribute in attributes:
-            field_name = attribute['name']
+        for field_name, generate_value in plan:
             try:
-                # Pass entity context to field generator
-                field_context = {**generation_context, 'entity_name': entity_name}
-                value = self.field_generator.generate_field_value(attribute, field_context)
-                entity_data[field_name] = value
-                
-                # Update context with generated values for dependent fields
-                generation_context[field_name] = value
-                
+                value = generate_value(generation_context)
             except Exception as e:
                 print(f"ERROR generating field '{field_name}': {e}")
-                entity_data[field_name] = None
+                value = None
+            entity_data[field_name] = value
+            generation_context[field_name] = value
         
         return entity_data
     
-    def generate_related_entities(self, num_records: int) -> Dict[str, List[Dict[str, Any]]]:
-        """Generate related entities maintaining referential integrity."""
-        all_entity_data = {}
+    def generate_entity_batch(self, entity_config: Dict[str, Any], contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Generate one record per context column by column, then assemble the records."""
+        entity_name = entity_config['name']
+        plan = self.entity_column_plans.get(entity_name)
+        if plan is None:
+            plan = self.compile_plan(entity_config, columnar=True)
+            self.entity_column_plans[entity_name] = plan
+        
+        num_records = len(contexts)
+        if not plan:
+            return [{} for _ in range(num_records)]
+        
+        contexts = [dict(context, entity_name=entity_name) for context in contexts]
+        field_names = [field_name for field_name, _ in plan]
+        columns = []
+        for field_name, generate_column in plan:
+            try:
+                columns.append(generate_column(num_records, contexts))
+            except Exception as e:
+                print(f"ERROR generating field '{field_name}': {e}")
+                columns.append([None] * num_records)
         
-        # Generate entities in dependency order
+        return [dict(zip(field_names, values)) for values in zip(*columns)]
+    
+    def entity_generation_order(self) -> List[Dict[str, Any]]:
+        """Topologically sort entities so every parent is generated before its children.
+
+        Ties keep YAML order. Entities caught in a relationship cycle also fall back to YAML
+        order; the relationship that closes the cycle then gets no foreign key.
+        """
+        entities = self.config['entities']
+        parents = {entity['name']: set() for entity in entities}
+        for rel in self.config.get('relationships', []):
+            if rel['from'] in parents and rel['to'] in parents and rel['from'] != rel['to']:
+                parents[rel['to']].add(rel['from'])
+        
+        ordered_names = []
+        generated = set()
+        remaining = [entity['name'] for entity in entities]
+        while remaining:
+            ready = next((name for name in remaining if parents[name] <= generated), remaining[0])
+            ordered_names.append(ready)
+            generated.add(ready)
+            remaining.remove(ready)
+        
+        entities_by_name = {entity['name']: entity for entity in entities}
+        return [entities_by_name[name] for name in ordered_names]
+    
+    def build_relationship_index(self) -> Dict[str, List[tuple]]:
+        """Map each child entity to its (parent_entity, foreign_key_field) relationships."""
+        index = {}
+        for rel in self.config.get('relationships', []):
+            index.setdefault(rel['to'], []).append((rel['from'], f"{rel['from'].lower()}_id"))
+        return index
+    
+    def primary_id_field(self, entity_config: Dict[str, Any]) -> Optional[str]:
+        """Return the entity's identifier attribute: the first attribute of type 'id'."""
+        for attribute in entity_config.get('attributes', []):
+            if attribute['type'] == 'id':
+                return attribute['name']
+        return None
+    
+    def draw_indices(self, upper: int, count: int) -> List[int]:
+        """Draw count uniform indices in [0, upper) in one bulk call."""
+        if self.columnar:
+            return self.field_generator.np_rng.integers(0, upper, size=count).tolist()
+        randbelow = self.rng.randrange
+        return [randbelow(upper) for _ in range(count)]
+    
+    def assign_foreign_keys(self, entity_name: str, num_records: int,
+                            parent_ids: Dict[str, List[Any]]) -> tuple:
+        """Pick a random parent for every record of an entity, one bulk draw per relationship.
+
+        Returns (contexts, foreign_keys): one context dict per record, plus the
+        {foreign_key_field: parent ID column} mapping the contexts were built from.
+        """
+        foreign_keys = {}
+        for parent_name, foreign_key_field in self.relationship_index.get(entity_name, []):
+            ids = parent_ids.get(parent_name)
+            if ids:
+                foreign_keys[foreign_key_field] = [ids[i] for i in self.draw_indices(len(ids), num_records)]
+        
+        if not foreign_keys:
+            return [{} for _ in range(num_records)], foreign_keys
+        fields = list(foreign_keys)
+        contexts = [dict(zip(fields, values)) for values in zip(*foreign_keys.values())]
+        return contexts, foreign_keys
+    
+    def generate_related_entities(self, num_records: int,
+                                  existing: Optional[Dict[str, List[Dict[str, Any]]]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Generate related entities maintaining referential integrity.
+
+        With `existing` pools, num_records more records are generated per entity and appended
+        to them; new records may reference existing parents as well as new ones.
+        """
+        all_entity_data = {}
+        existing = existing or {}
         entities_by_name = {entity['name']: entity for entity in self.config['entities']}
-        relationships = self.config.get('relationships', [])
-        
-        # Build dependency graph
-        dependencies = {}
-        for rel in relationships:
-            from_entity = rel['from']
-            to_entity = rel['to']
-            if to_entity not in dependencies:
-                dependencies[to_entity] = []
-            dependencies[to_entity].append(from_entity)
-        
-        # Generate entities in order
-        for entity_config in self.config['entities']:
+        parent_ids = {}
+        for entity_name, records in existing.items():
+            id_field = self.primary_id_field(entities_by_name[entity_name])
+            if id_field:
+                parent_ids[entity_name] = [record.get(id_field) for record in records]
+        
+        # Parents first, so every relationship can resolve against a finished ID array
+        for entity_config in self.entity_generation_order():
             entity_name = entity_config['name']
-            entity_records = []
             
             print(f"  Generating {entity_name} entities...")
+            entity_start = time.perf_counter()
             
-            for i in range(num_records):
-                # Create context from related entities
-                context = {}
-                
-                # Add references to parent entities
-                for rel in relationships:
-                    if rel['to'] == entity_name and rel['from'] in all_entity_data:
-                        parent_records = all_entity_data[rel['from']]
-                        if parent_records:
-                            # Reference a random parent record
-                            parent_record = random.choice(parent_records)
-                            # Add parent ID to context
-                            parent_id_field = f"{rel['from'].lower()}_id"
-                            if 'id' in parent_record:
-                                context[parent_id_field] = parent_record['id']
-                
-                entity_data = self.generate_entity_data(entity_config, context)
-                entity_records.append(entity_data)
+            contexts, foreign_keys = self.assign_foreign_keys(entity_name, num_records, parent_ids)
+            if self.columnar:
+                entity_records = self.generate_entity_batch(entity_config, contexts)
+            else:
+                entity_records = [self.generate_entity_data(entity_config, context) for context in contexts]
+            
+            # Entities that declare the foreign key field as an attribute store the parent's ID
+            declared = {attribute['name'] for attribute in entity_config.get('attributes', [])}
+            for foreign_key_field, ids in foreign_keys.items():
+                if foreign_key_field in declared:
+                    for record, parent_id in zip(entity_records, ids):
+                        record[foreign_key_field] = parent_id
+            
+            id_field = self.primary_id_field(entity_config)
+            if id_field:
+                parent_ids[entity_name] = parent_ids.get(entity_name, []) + [record.get(id_field) for record in entity_records]
+                if len(set(parent_ids[entity_name])) != len(parent_ids[entity_name]):
+                    raise ValueError(f"Duplicate {entity_name}.{id_field} values in the entity pool; "
+                                     f"check the attribute's id_strategy and prefix")
+            
+            all_entity_data[entity_name] = existing.get(entity_name, []) + entity_records
+            self.stats.entities_generated[entity_name] = len(all_entity_data[entity_name])
+            if self.profile:
+                self.stats.add_entity_time(entity_name, time.perf_counter() - entity_start, len(entity_records))
+        
+        # Keep YAML order: later entities win template fields that share a name
+        return {entity['name']: all_entity_data[entity['name']] for entity in self.config['entities']}
+    
+    def build_entity_pools(self, num_records: int) -> Dict[str, Sequence]:
+        """Entity pools for the example stage: lazy pools in lazy mode, otherwise fully generated."""
+        self.pool_sizes = [[0, num_records]]
+        if self.lazy_entities:
+            return self.generate_lazy_entities(num_records)
+        return self.generate_related_entities(num_records)
+    
+    def extend_entity_pools(self, entity_data: Dict[str, List[Dict[str, Any]]], at_example: int,
+                            num_records: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Grow eager entity pools by num_records per entity before example `at_example`.
+
+        The extension is drawn from a seed derived from at_example, so it can be replayed
+        without the example-stage RNG state. IDs already in the pools are never reissued.
+        """
+        self.pool_sizes.append([at_example, num_records])
+        self.reseed(derive_seed(self.seed, 'append', at_example))
+        return self.generate_related_entities(num_records, existing=entity_data)
+    
+    def reseed(self, seed: int):
+        """Reseed the generator's RNGs (Python and NumPy) from one seed."""
+        self.rng.seed(seed)
+        if self.field_generator.np_rng is not None:
+            self.field_generator.np_rng.bit_generator.state = \
+                np.random.default_rng(derive_seed(seed, 'numpy')).bit_generator.state
+    
+    def entity_ids_digest(self, entity_data: Dict[str, Sequence]) -> Optional[str]:
+        """SHA-256 of every entity's ID column, so shard workers can confirm they share one ID space.
+
+        Returns None for lazy pools: their IDs are positioned at the record index and keyed
+        from the run seed, so they agree across workers by construction.
+        """
+        if self.lazy_entities:
+            return None
+        digest = hashlib.sha256()
+        for entity_config in self.config['entities']:
+            id_field = self.primary_id_field(entity_config)
+            if id_field:
+                ids = [record.get(id_field) for record in entity_data.get(entity_config['name'], [])]
+                digest.update(json.dumps([entity_config['name'], ids], default=str).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def rebuild_entity_pools(self, pool_sizes: List[List[int]]) -> Dict[str, Sequence]:
+        """Rebuild the entity pools of an earlier run from its recorded pool_sizes history."""
+        (_, base_size), *extensions = pool_sizes
+        entity_data = self.build_entity_pools(base_size)
+        for at_example, num_records in extensions:
+            entity_data = self.extend_entity_pools(entity_data, at_example, num_records)
+        return entity_data
+    
+    def generate_lazy_entities(self, num_records: int) -> Dict[str, LazyEntityPool]:
+        """Create one LazyEntityPool of num_records per entity without generating any record yet.
+
+        Lazy records are generated row by row with their own field generator, reseeded per
+        record, so materializing one never disturbs the example-stage RNG. That generator
+        samples the Faker value pool frozen: a record's fresh values never replace pooled
+        ones another record would read, so records do not depend on access order.
+        """
+        if self.lazy_field_generator is None:
+            self.lazy_field_generator = AdvancedFieldGenerator(derive_seed(self.seed, 'lazy'),
+                                                               self.field_generator.value_pool, self.reference_time,
+                                                               id_seed=self.seed, indexed_ids=True, frozen_pool=True)
+            self.lazy_entity_plans = {
+                entity['name']: self.compile_plan(entity, field_generator=self.lazy_field_generator)
+                for entity in self.config['entities']
+            }
             
-            all_entity_data[entity_name] = entity_records
-            self.stats.entities_generated[entity_name] = len(entity_records)
+            # Only parents that come earlier in generation order get foreign keys, as in eager mode
+            self.lazy_parents = {}
+            generated = set()
+            entities_by_name = {entity['name']: entity for entity in self.config['entities']}
+            for entity_config in self.entity_generation_order():
+                entity_name = entity_config['name']
+                self.lazy_parents[entity_name] = [
+                    (parent_name, foreign_key_field, self.primary_id_field(entities_by_name[parent_name]))
+                    for parent_name, foreign_key_field in self.relationship_index.get(entity_name, [])
+                    if parent_name in generated and self.primary_id_field(entities_by_name[parent_name])
+                ]
+                generated.add(entity_name)
+        
+        self.lazy_pools = {
+            entity['name']: LazyEntityPool(self, entity, num_records, self.entity_cache_size)
+            for entity in self.config['entities']
+        }
+        for entity_name in self.lazy_pools:
+            self.stats.entities_generated[entity_name] = 0
+        return self.lazy_pools
+    
+    def materialize_entity(self, entity_config: Dict[str, Any], index: int) -> Dict[str, Any]:
+        """Generate record `index` of a lazy entity pool from its own derived seed."""
+        entity_name = entity_config['name']
         
-        return all_entity_data
+        # Pick the parent records from the index alone, then generate (and cache) them first
+        context = {}
+        for parent_name, foreign_key_field, id_field in self.lazy_parents[entity_name]:
+            parent_pool = self.lazy_pools[parent_name]
+            parent_index = derive_seed(self.seed, 'lazy', entity_name, index, parent_name) % len(parent_pool)
+            context[foreign_key_field] = parent_pool[parent_index].get(id_field)
+        
+        # Every ID (including 'random' ones) comes from a sequence positioned at the record index,
+        # so a regenerated record gets its ID back and distinct records never share one
+        self.lazy_field_generator.seek_id_sequences(index)
+        entity_start = time.perf_counter()
+        self.lazy_field_generator.rng.seed(derive_seed(self.seed, 'lazy', entity_name, index))
+        record = self.run_entity_plan(self.lazy_entity_plans[entity_name], entity_name, context)
+        if self.profile:
+            self.stats.add_entity_time(entity_name, time.perf_counter() - entity_start)
+        
+        for foreign_key_field, parent_id in context.items():
+            if foreign_key_field in record:
+                record[foreign_key_field] = parent_id
+        
+        self.stats.entities_generated[entity_name] += 1
+        return record
+    
+    def compile_example_template(self):
+        """Parse the user template once and resolve where every referenced value comes from.
+
+        Each example samples one record per entity and exposes its fields both bare and
+        entity-prefixed, with later entities overriding earlier ones. That resolution is
+        static, so it is done here: placeholders, metadata fields and response candidates
+        are mapped to an (entity, field) source, and only those values are read and
+        stringified per example. Placeholders no entity provides are reported once here.
+        """
+        ft_config = self.config.get('fine_tuning_task', {})
+        self.system_prompt = ft_config.get('system_prompt', 'You are a helpful assistant.')
+        self.user_template = ft_config.get('user_template', 'Generate content based on: {data}')
+        
+        # Replay the variable layout of a flattened example: first insertion fixes order, last write wins
+        sources = {}
+        for entity in self.config['entities']:
+            entity_name = entity['name']
+            for attribute in entity.get('attributes', []):
+                field_name = attribute['name']
+                sources[field_name] = (entity_name, field_name)
+                sources[f"{entity_name.lower()}_{field_name}"] = (entity_name, field_name)
+        
+        # Split the template into literal text and placeholders
+        self.template_parts = []
+        self.template_is_simple = True
+        placeholders = []
+        for literal, field_name, format_spec, conversion in string.Formatter().parse(self.user_template):
+            if field_name is None:
+                self.template_parts.append((literal, None))
+                continue
+            base_name = re.split(r'[.\[]', field_name, 1)[0]
+            if format_spec or conversion or base_name != field_name or not base_name or base_name.isdigit():
+                self.template_is_simple = False
+            placeholders.append(base_name)
+            self.template_parts.append((literal, base_name))
+        
+        self.missing_template_fields = sorted({name for name in placeholders if name not in sources})
+        for name in self.missing_template_fields:
+            print(f"⚠️  Missing template variable '{name}', it will render as 'Not specified'")
+            self.stats.validation_errors.append(f"Template variable '{name}' is not provided by any entity")
+        
+        self.template_sources = {name: sources[name] for name in dict.fromkeys(placeholders) if name in sources}
+        self.metadata_sources = {name: sources[name] for name in self.config.get('metadata_fields', []) if name in sources}
+        self.response_sources = {
+            name: source for name, source in sources.items()
+            if 'rationale' in name.lower() or 'content' in name.lower()
+        }
+    
+    def format_template_value(self, value: Any) -> str:
+        """Stringify a value the way the user template presents it."""
+        if isinstance(value, list):
+            return ', '.join(map(str, value)) if value else 'None'
+        elif value is None:
+            return 'Not specified'
+        return str(value)
     
     def create_training_example(self, entity_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
         """Create a training example using the fine-tuning configuration."""
         ft_config = self.config.get('fine_tuning_task', {})
-        system_prompt = ft_config.get('system_prompt', 'You are a helpful assistant.')
-        user_template = ft_config.get('user_template', 'Generate content based on: {data}')
-        
-        # Flatten all entity data for template variables
-        template_vars = {}
         
         # Select one record from each entity for this training example
-        for entity_name, records in entity_data.items():
-            if records:
-                selected_record = random.choice(records)
-                
-                # Add all fields from selected record
-                for key, value in selected_record.items():
-                    template_vars[key] = value
-                    # Also add with entity prefix
-                    template_vars[f"{entity_name.lower()}_{key}"] = value
-        
-        # Format values for template
-        formatted_vars = {}
-        for key, value in template_vars.items():
-            if isinstance(value, list):
-                formatted_vars[key] = ', '.join(map(str, value)) if value else 'None'
-            elif value is None:
-                formatted_vars[key] = 'Not specified'
-            else:
-                formatted_vars[key] = str(value)
-        
-        # Generate user message
-        try:
-            user_message = user_template.format(**formatted_vars)
-        except KeyError as e:
-            # Handle missing template variables gracefully
-            print(f"⚠️  Missing template variable {e}, using available data")
-            # Use only available variables
-            available_vars = {k: v for k, v in formatted_vars.items() if k in user_template}
-            user_message = user_template.format(**available_vars) if available_vars else user_template
+        choice = self.rng.choice
+        selected = {entity_name: choice(records) for entity_name, records in entity_data.items() if records}
+        
+        def lookup(source):
+            record = selected.get(source[0])
+            return record.get(source[1]) if record is not None else None
+        
+        # Stringify only the referenced fields and render the user message
+        formatted_vars = {name: self.format_template_value(lookup(source)) for name, source in self.template_sources.items()}
+        if self.template_is_simple:
+            user_message = ''.join([
+                literal + (formatted_vars.get(name, 'Not specified') if name is not None else '')
+                for literal, name in self.template_parts
+            ])
+        else:
+            for name in self.missing_template_fields:
+                formatted_vars[name] = 'Not specified'
+            user_message = self.user_template.format_map(formatted_vars)
         
         # Generate assistant response
-        assistant_response = self.generate_assistant_response(template_vars, ft_config)
+        response_context = {name: lookup(source) for name, source in self.response_sources.items()}
+        assistant_response = self.generate_assistant_response(response_context, ft_config)
         
         # Create training example
         training_example = {
             "dialog": [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": user_message},
                 {"role": "assistant", "content": assistant_response}
             ]
         }
         
         # Add metadata if specified
-        metadata_fields = self.config.get('metadata_fields', [])
-        if metadata_fields:
-            metadata = {}
-            for field in metadata_fields:
-                if field in template_vars:
-                    metadata[field] = template_vars[field]
-            if metadata:
-                training_example['metadata'] = metadata
+        metadata = {name: lookup(source) for name, source in self.metadata_sources.items() if source[0] in selected}
+        if metadata:
+            training_example['metadata'] = metadata
         
         return training_example
     
@@ -495,12 +1646,12 @@ class EnhancedDataGenerator:
         priorities = ['relationship building', 'technical validation', 'financial justification', 'stakeholder alignment']
         strategies = ['consultative selling', 'solution customization', 'phased implementation', 'pilot program initiation']
         
-        template = random.choice(templates)
+        template = self.rng.choice(templates)
         response = template.format(
-            key_factor=random.choice(factors),
-            outcome=random.choice(outcomes),
-            priority_area=random.choice(priorities),
-            strategy_focus=random.choice(strategies)
+            key_factor=self.rng.choice(factors),
+            outcome=self.rng.choice(outcomes),
+            priority_area=self.rng.choice(priorities),
+            strategy_focus=self.rng.choice(strategies)
         )
         
         return response
@@ -519,62 +1670,493 @@ class EnhancedDataGenerator:
     
     def generate_dataset(self, num_examples: int) -> List[Dict[str, Any]]:
         """Generate complete dataset with specified number of examples."""
+        return list(self.iter_dataset(num_examples))
+    
+    def iter_dataset(self, num_examples: int) -> Iterator[Dict[str, Any]]:
+        """Stream the dataset one training example at a time, updating stats as it goes."""
         print(f"Generating {num_examples} training examples for {self.config['domain_name']}")
         
         start_time = time.time()
-        dataset = []
+        self.stats.total_records = 0
         
         # Generate entity data once and reuse for multiple training examples
         print("Generating entity data...")
-        entity_data = self.generate_related_entities(max(num_examples // 2, 10))  # Generate reasonable number of entities
+        entity_data = self.build_entity_pools(max(num_examples // 2, 10))  # Generate reasonable number of entities
         
         print("Creating training examples...")
-        for i in range(num_examples):
-            if (i + 1) % 50 == 0:
-                print(f"  Generated {i + 1}/{num_examples} examples")
-            
-            try:
+        yield from self.iter_training_examples(entity_data, num_examples)
+        
+        self.stats.generation_time = time.time() - start_time
+    
+    def iter_training_examples(self, entity_data: Dict[str, List[Dict[str, Any]]], num_examples: int,
+                               start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Yield training examples for example indices [start, start + num_examples)."""
+        for i in range(start, start + num_examples):
+            training_example = self.try_training_example(entity_data, i, start + num_examples)
+            if training_example is not None:
+                yield training_example
+    
+    def try_training_example(self, entity_data: Dict[str, List[Dict[str, Any]]], index: int,
+                             stop: int) -> Optional[Dict[str, Any]]:
+        """Create example number `index`, recording a validation error and returning None if it fails."""
+        if index % EXAMPLE_SEED_BLOCK == 0:
+            self.reseed(derive_seed(self.seed, 'examples', index // EXAMPLE_SEED_BLOCK))
+        if (index + 1) % 50 == 0:
+            print(f"  Generated {index + 1}/{stop} examples")
+        
+        try:
+            if self.profile:
+                example_start = time.perf_counter()
                 training_example = self.create_training_example(entity_data)
-                dataset.append(training_example)
-            except Exception as e:
-                print(f"WARNING: Error generating example {i + 1}: {e}")
-                self.stats.validation_errors.append(f"Example {i + 1}: {str(e)}")
-                continue
+                self.stats.example_seconds += time.perf_counter() - example_start
+                self.stats.examples_timed += 1
+            else:
+                training_example = self.create_training_example(entity_data)
+        except Exception as e:
+            print(f"WARNING: Error generating example {index + 1}: {e}")
+            self.stats.validation_errors.append(f"Example {index + 1}: {str(e)}")
+            return None
+        
+        self.stats.total_records += 1
+        return training_example
+    
+    def rng_state(self) -> Dict[str, Any]:
+        """JSON-serializable snapshot of every RNG the example stage draws from."""
+        version, internal_state, gauss_next = self.rng.getstate()
+        state = {'random': [version, list(internal_state), gauss_next]}
+        if self.field_generator.np_rng is not None:
+            state['numpy'] = self.field_generator.np_rng.bit_generator.state
+        return state
+    
+    def restore_rng_state(self, state: Dict[str, Any]):
+        """Restore a snapshot taken by rng_state()."""
+        version, internal_state, gauss_next = state['random']
+        self.rng.setstate((version, tuple(internal_state), gauss_next))
+        if 'numpy' in state and self.field_generator.np_rng is not None:
+            self.field_generator.np_rng.bit_generator.state = state['numpy']
+    
+    def write_examples(self, output_path: str, entity_data: Dict[str, List[Dict[str, Any]]], start: int,
+                       count: int, checkpoint_path: Optional[str] = None, resume: bool = False) -> int:
+        """Write examples [start, start + count) to output_path, checkpointing every checkpoint_every examples.
+
+        A checkpoint records the next example index, the RNG state and the byte offset of
+        everything written so far. Resuming truncates the file to that offset and restores
+        the RNG, so the finished file is byte-identical to an uninterrupted run. Returns the
+        number of records in the file.
+        """
+        stop = start + count
+        recorded = load_checkpoint(checkpoint_path) if checkpoint_path else None
+        run = recorded.get('run') if recorded else None
+        progress = recorded if resume and recorded and 'next_example' in recorded else None
+        if progress and progress['complete']:
+            print(f"  {output_path} already complete ({progress['total_records']} examples)")
+            self.stats.total_records = progress['total_records']
+            self.stats.validation_errors = progress['validation_errors']
+            return progress['total_records']
+        
+        next_index, byte_offset, mode = start, 0, 'w'
+        if progress:
+            next_index, byte_offset = progress['next_example'], progress['byte_offset']
+            if not os.path.exists(output_path) or os.path.getsize(output_path) < byte_offset:
+                raise ValueError(f"{output_path} is shorter than its checkpoint; cannot resume")
+            os.truncate(output_path, byte_offset)
+            self.restore_rng_state(progress['rng_state'])
+            self.stats.total_records = progress['total_records']
+            self.stats.validation_errors = progress['validation_errors']
+            mode = 'a'
+            print(f"  Resuming {output_path} at example {next_index + 1}/{stop}")
+        
+        def save_progress(index, writer, complete=False):
+            save_checkpoint(checkpoint_path, {
+                **({'run': run} if run else {}),
+                'next_example': index,
+                'byte_offset': byte_offset + writer.bytes_written,
+                'rng_state': self.rng_state(),
+                'total_records': self.stats.total_records,
+                'validation_errors': self.stats.validation_errors,
+                'complete': complete,
+            })
+        
+        with JsonlWriter(output_path, chunk_size=self.write_chunk_size, mode=mode, serializer=self.serializer) as writer:
+            write = writer.write
+            for i in range(next_index, stop):
+                training_example = self.try_training_example(entity_data, i, stop)
+                if training_example is not None:
+                    write(training_example)
+                if checkpoint_path and self.checkpoint_every > 0 and (i + 1 - start) % self.checkpoint_every == 0:
+                    writer.sync()
+                    save_progress(i + 1, writer)
+            writer.sync()
+            if checkpoint_path:
+                save_progress(stop, writer, complete=True)
+        self.record_serialization_time(writer)
+        
+        self.next_example = stop
+        return self.stats.total_records
+    
+    def record_serialization_time(self, writer: JsonlWriter):
+        """Add the writer's encode-and-write time to stats.serialization_seconds when profiling."""
+        if self.profile:
+            self.stats.serialization_seconds += writer.flush_seconds
+    
+    def generate_to_file(self, num_examples: int, output_path: str = None, resume: bool = False) -> str:
+        """Generate the dataset into output_path in this process, with periodic resumable checkpoints."""
+        output_path = output_path or self.default_output_path()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        checkpoint_path = self.begin_checkpointed_run(output_path, num_examples, resume)
+        
+        print(f"Generating {num_examples} training examples for {self.config['domain_name']} (seed {self.seed})")
+        start_time = time.time()
+        self.stats.total_records = 0
+        
+        # Entity pools are rebuilt from the seed on resume; only the example stage is checkpointed
+        print("Generating entity data...")
+        entity_data = self.build_entity_pools(max(num_examples // 2, 10))
+        
+        print("Creating training examples...")
+        self.write_examples(output_path, entity_data, 0, num_examples, checkpoint_path, resume)
+        self.post_process_output(output_path)
+        self.stats.generation_time = time.time() - start_time
+        
+        self.finalize_output(output_path)
+        if checkpoint_path:
+            os.remove(checkpoint_path)
+        return output_path
+    
+    def generate_to_s3(self, num_examples: int, sink: S3MultipartWriter) -> str:
+        """Generate the dataset straight into an S3 multipart upload, without a local JSONL.
+
+        Parts are uploaded in the background while examples are still being generated. The
+        upload is completed only when every example has been written and is aborted if
+        generation fails, so a partial dataset never appears in S3. The metadata is kept
+        locally and uploaded next to the dataset, and config.yaml is pointed at the S3 copy.
+        Returns the local path the metadata is named after (no JSONL is written there).
+        """
+        print(f"Generating {num_examples} training examples for {self.config['domain_name']} (seed {self.seed})")
+        start_time = time.time()
+        self.stats.total_records = 0
+        
+        print("Generating entity data...")
+        entity_data = self.build_entity_pools(max(num_examples // 2, 10))
+        
+        print(f"Streaming training examples to {sink.uri}...")
+        with sink:
+            with JsonlWriter(sink.key, chunk_size=self.write_chunk_size, serializer=self.serializer, fileobj=sink) as writer:
+                write = writer.write
+                for i in range(num_examples):
+                    training_example = self.try_training_example(entity_data, i, num_examples)
+                    if training_example is not None:
+                        write(training_example)
+            self.record_serialization_time(writer)
+        self.next_example = num_examples
+        self.s3_uri = sink.uri
+        self.stats.generation_time = time.time() - start_time
+        print(f"  Uploaded {sink.bytes_written / 1024 ** 2:.1f} MiB to {sink.uri}")
+        
+        # The metadata stays local (as for file output) and also goes beside the S3 object
+        output_path = self.default_output_path()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        metadata_path = output_path.replace('.jsonl', '_metadata.json')
+        metadata = self.generation_metadata(output_path)
+        metadata['s3_uri'] = sink.uri
+        metadata['sha256'] = sink.sha256()
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        metadata_key = f"{sink.key[:-len('.jsonl')] if sink.key.endswith('.jsonl') else sink.key}_metadata.json"
+        sink.client.put_object(Bucket=sink.bucket, Key=metadata_key,
+                               Body=json.dumps(metadata, indent=2, ensure_ascii=False).encode('utf-8'))
+        
+        set_uploaded_s3_input_data(sink.bucket, sink.key)
+        return output_path
+    
+    def append_to_file(self, num_examples: int, output_path: str) -> str:
+        """Grow an existing dataset to num_examples, generating only the missing examples.
+
+        The entity pools are rebuilt from the seed and the recorded pool history, then grown
+        to the size a fresh num_examples run would use (eager pools only; lazy pools keep their
+        size so the records already emitted stay consistent). The example RNG continues from
+        the state recorded when the dataset was finished. An interrupted append is recovered
+        by running it again: the file is first truncated back to the recorded size.
+        """
+        metadata_path = output_path.replace('.jsonl', '_metadata.json')
+        with open(metadata_path, 'r', encoding='utf-8') as f:
+            metadata = json.load(f)
+        state = metadata.get('append_state')
+        if state is None:
+            raise ValueError(f"{output_path} cannot be appended to: only single-process runs without "
+                             f"dedup, compression or partitioning record the state needed")
+        if state['config_sha256'] != self.config_digest():
+            raise ValueError(f"{self.config_path} changed since {output_path} was generated; cannot append")
+        if num_examples <= state['next_example']:
+            print(f"{output_path} already holds {state['next_example']} examples; nothing to append")
+            self.stats.total_records = metadata['total_examples']
+            return output_path
+        
+        start_time = time.time()
+        print(f"Appending {num_examples - state['next_example']} training examples to {output_path} (seed {self.seed})")
+        print("Rebuilding entity data...")
+        entity_data = self.rebuild_entity_pools(state['pool_sizes'])
+        pool_size = sum(size for _, size in self.pool_sizes)
+        target_size = max(num_examples // 2, 10)
+        if not self.lazy_entities and target_size > pool_size:
+            print(f"Growing entity pools from {pool_size} to {target_size} records...")
+            entity_data = self.extend_entity_pools(entity_data, state['next_example'], target_size - pool_size)
+        
+        # Continue the example stream through the resume path, from a checkpoint at the recorded end
+        checkpoint_path = checkpoint_path_for(output_path)
+        save_checkpoint(checkpoint_path, {
+            'next_example': state['next_example'],
+            'byte_offset': state['byte_offset'],
+            'rng_state': state['rng_state'],
+            'total_records': metadata['total_examples'],
+            'validation_errors': metadata['validation_errors'],
+            'complete': False,
+        })
+        print("Creating training examples...")
+        self.write_examples(output_path, entity_data, 0, num_examples, checkpoint_path, resume=True)
+        self.stats.generation_time = time.time() - start_time
+        
+        self.finalize_output(output_path)
+        os.remove(checkpoint_path)
+        return output_path
+    
+    def append_state(self, output_path: str) -> Optional[Dict[str, Any]]:
+        """State --append needs to continue this dataset, or None when it cannot be continued.
+
+        Sharded runs draw examples from per-shard RNGs, dedup or packaging rewrite the file
+        and streamed output has no local file, so only plain single-process output can be
+        extended.
+        """
+        if self.workers != 1 or self.dedup_threshold is not None or self.manifest_path or self.s3_uri:
+            return None
+        return {
+            'config_sha256': self.config_digest(),
+            'next_example': self.next_example,
+            'byte_offset': os.path.getsize(output_path),
+            'pool_sizes': self.pool_sizes,
+            'rng_state': self.rng_state(),
+        }
+    
+    def begin_checkpointed_run(self, output_path: str, num_examples: int, resume: bool) -> Optional[str]:
+        """Record (or, on resume, check) the run parameters and return the run's checkpoint path.
+
+        A fresh run first removes shard files an earlier, interrupted sharded run left at
+        output_path. A single-process resume refuses to run over such files: their progress
+        lives in the shard checkpoints, which only a sharded run reads. Returns None when
+        checkpointing is disabled.
+        """
+        leftover_shards = shard_files(output_path)
+        if resume and self.workers == 1 and leftover_shards:
+            raise ValueError(f"{output_path} was being written by a sharded run ({leftover_shards[0]}); "
+                             f"it cannot be resumed in one process, so rerun it without --resume")
+        if not resume:
+            for path in leftover_shards:
+                os.remove(path)
+        
+        if self.checkpoint_every <= 0:
+            if resume:
+                raise ValueError("--resume needs checkpoints; --checkpoint-every must be positive")
+            return None
+        
+        checkpoint_path = checkpoint_path_for(output_path)
+        run = {
+            'config_sha256': self.config_digest(),
+            'num_examples': num_examples,
+            'seed': self.seed,
+            'workers': self.workers,
+            'generator_options': self.generator_options(),
+        }
+        if resume:
+            recorded = load_checkpoint(checkpoint_path)
+            if recorded is None:
+                raise ValueError(f"No checkpoint found at {checkpoint_path}; nothing to resume")
+            if recorded.get('run') is None:
+                raise ValueError(f"Checkpoint {checkpoint_path} is from an append run; rerun the same --append command to finish it")
+            mismatched = [key for key, value in run.items() if recorded['run'].get(key) != value]
+            if mismatched:
+                raise ValueError(f"Checkpoint {checkpoint_path} was written for a different run ({', '.join(mismatched)})")
+            # Keep the recorded progress; write_examples picks it up (shards keep their own files)
+            return checkpoint_path
+        
+        save_checkpoint(checkpoint_path, {'run': run})
+        return checkpoint_path
+    
+    def generate_dataset_sharded(self, num_examples: int, workers: int, output_path: str = None,
+                                 resume: bool = False) -> str:
+        """Generate the dataset across a process pool, one JSONL shard per worker, then merge.
+
+        Each shard checkpoints independently; on resume, finished shards are kept and the
+        others continue from their last checkpoint. A dataset of one seed block is generated
+        in this process, as --resume will continue it (the run records a single worker).
+        """
+        output_path = output_path or self.default_output_path()
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        num_blocks = -(-num_examples // EXAMPLE_SEED_BLOCK)
+        workers = max(1, min(workers, num_blocks))
+        self.workers = workers
+        if workers == 1:
+            return self.generate_to_file(num_examples, output_path, resume)
+        checkpoint_path = self.begin_checkpointed_run(output_path, num_examples, resume)
+        print(f"Generating {num_examples} training examples for {self.config['domain_name']} with {workers} workers (seed {self.seed})")
+        
+        start_time = time.time()
         
-        self.stats.total_records = len(dataset)
+        # Split the example range into contiguous shards of whole seed blocks, so every example
+        # draws from the same RNG stream whatever the worker count. Every shard samples the
+        # run's entity universe (the pools a single worker would build)
+        pool_size = max(num_examples // 2, 10)
+        base, remainder = divmod(num_blocks, workers)
+        shards = []
+        start = 0
+        for shard_index in range(workers):
+            blocks = base + (1 if shard_index < remainder else 0)
+            count = min(blocks * EXAMPLE_SEED_BLOCK, num_examples - start)
+            shard_path = f"{output_path}.part{shard_index:04d}"
+            shards.append((shard_index, start, count, shard_path))
+            start += count
+        
+        shard_results = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_generate_shard, self.config_path, shard_index, start, count, self.seed,
+                                pool_size, shard_path, self.generator_options(),
+                                self.checkpoint_every if checkpoint_path else 0, resume)
+                for shard_index, start, count, shard_path in shards
+            ]
+            for future in as_completed(futures):
+                shard_index, shard_stats = future.result()
+                shard_results[shard_index] = shard_stats
+                print(f"  Shard {shard_index + 1}/{workers} complete ({shard_stats['total_records']} examples)")
+        
+        # An ID may only ever name one entity: every shard must have drawn the same ID columns
+        if len({shard_stats['entity_ids_sha256'] for shard_stats in shard_results.values()}) > 1:
+            raise RuntimeError("Shard workers built different entity IDs; IDs would not be unique across shards")
+        
+        # Merge shards in order so the output only depends on the seed and worker count
+        print("Merging shards...")
+        with open(output_path, 'wb') as merged:
+            for shard_index, _, _, shard_path in shards:
+                with open(shard_path, 'rb') as shard_file:
+                    shutil.copyfileobj(shard_file, merged)
+        for _, _, _, shard_path in shards:
+            os.remove(shard_path)
+            if checkpoint_path:
+                os.remove(checkpoint_path_for(shard_path))
+        
+        for shard_index in sorted(shard_results):
+            shard_stats = shard_results[shard_index]
+            self.stats.total_records += shard_stats['total_records']
+            self.stats.validation_errors.extend(shard_stats['validation_errors'])
+            self.stats.merge_timings(shard_stats['timings'])
+            # Shards share one entity universe, so their entity counts overlap rather than add up
+            for entity_name, count in shard_stats['entities_generated'].items():
+                self.stats.entities_generated[entity_name] = max(self.stats.entities_generated.get(entity_name, 0), count)
+        self.post_process_output(output_path)
         self.stats.generation_time = time.time() - start_time
         
-        return dataset
+        self.finalize_output(output_path)
+        if checkpoint_path:
+            os.remove(checkpoint_path)
+        return output_path
+    
+    def default_output_path(self) -> str:
+        """Build the default timestamped output path for this domain."""
+        output_config = self.config.get('output', {})
+        directory = output_config.get('directory', 'usecase_data')
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        
+        domain_name = self.config['domain_name']
+        timestamp = int(time.time())
+        return f"{directory}/{domain_name}/{domain_name}_{timestamp}.jsonl"
     
-    def save_dataset(self, dataset: List[Dict[str, Any]], output_path: str = None) -> str:
-        """Save dataset to JSONL file with metadata."""
+    def save_dataset(self, dataset: Iterable[Dict[str, Any]], output_path: str = None) -> str:
+        """Save dataset to JSONL file with metadata.
+
+        The dataset may be a list or a generator such as iter_dataset(); records are
+        streamed through a buffered writer, so a generator is never fully materialized.
+        """
         if output_path is None:
-            output_config = self.config.get('output', {})
-            directory = output_config.get('directory', 'usecase_data')
-            Path(directory).mkdir(parents=True, exist_ok=True)
-            
-            domain_name = self.config['domain_name']
-            timestamp = int(time.time())
-            output_path = f"{directory}/{domain_name}/{domain_name}_{timestamp}.jsonl"
+            output_path = self.default_output_path()
         
         # Ensure output directory exists
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         
         # Save dataset
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for example in dataset:
-                f.write(json.dumps(example, ensure_ascii=False) + '\n')
-        
-        # Save generation metadata
+        with JsonlWriter(output_path, chunk_size=self.write_chunk_size, serializer=self.serializer) as writer:
+            write = writer.write
+            for record in dataset:
+                write(record)
+        self.record_serialization_time(writer)
+        self.stats.total_records = writer.records_written
+        self.post_process_output(output_path)
+        
+        self.finalize_output(output_path)
+        return output_path
+    
+    def post_process_output(self, output_path: str):
+        """Run the optional stages over a finished JSONL file: dedup, then packaging."""
+        self.deduplicate_output(output_path)
+        self.package_output(output_path)
+    
+    def package_output(self, output_path: str):
+        """Split the finished JSONL into compressed and/or fixed-row parts plus a manifest, if requested.
+
+        The parts replace the plain JSONL; self.manifest_path then names the dataset.
+        """
+        if self.compression == 'none' and not self.partition_rows:
+            return
+        
+        output_prefix = output_path[:-len('.jsonl')] if output_path.endswith('.jsonl') else output_path
+        print(f"Packaging {output_path} (compression: {self.compression}, rows per part: {self.partition_rows or 'all'})...")
+        self.manifest_path = partition_jsonl(output_path, output_prefix, self.partition_rows, self.compression)
+        os.remove(output_path)
+        print(f"  Manifest written to {self.manifest_path}")
+    
+    def deduplicate_output(self, output_path: str):
+        """Drop exact and near-duplicate dialogs from a finished JSONL file, if dedup is enabled."""
+        if self.dedup_threshold is None:
+            return
+        
+        print(f"Deduplicating {output_path} (near-duplicate threshold {self.dedup_threshold})...")
+        deduped_path = f"{output_path}.dedup.tmp"
+        self.dedup_report = dedup_jsonl(output_path, deduped_path, chunk_size=self.write_chunk_size,
+                                        threshold=self.dedup_threshold, store_path=self.dedup_store)
+        os.replace(deduped_path, output_path)
+        self.stats.total_records = self.dedup_report['kept_records']
+        print(f"  Removed {self.dedup_report['exact_duplicates']} exact and "
+              f"{self.dedup_report['near_duplicates']} near duplicates "
+              f"({self.dedup_report['duplicate_rate']:.1%} of {self.dedup_report['input_records']})")
+    
+    def finalize_output(self, output_path: str):
+        """Write generation metadata next to the dataset and point config.yaml at it."""
         metadata_path = output_path.replace('.jsonl', '_metadata.json')
-        metadata = {
+        metadata = self.generation_metadata(output_path)
+        
+        with open(metadata_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+        # Partitioned or compressed output is addressed through its manifest
+        set_local_input_data_path(self.manifest_path or output_path)
+    
+    def generation_metadata(self, output_path: str) -> Dict[str, Any]:
+        """Metadata describing a finished run, as stored in _metadata.json."""
+        return {
             'domain_name': self.config['domain_name'],
             'config_path': self.config_path,
+            'generator_version': GENERATOR_VERSION,
             'generation_timestamp': datetime.now().isoformat(),
-            'total_examples': len(dataset),
+            'total_examples': self.stats.total_records,
+            'seed': self.seed,
+            'workers': self.workers,
+            'generator_options': self.generator_options(),
             'entities_generated': self.stats.entities_generated,
             'generation_time_seconds': self.stats.generation_time,
             'validation_errors': self.stats.validation_errors,
+            'deduplication': self.dedup_report,
+            'manifest': self.manifest_path,
+            'profile': self.stats.profile_breakdown() if self.profile else None,
+            'append_state': self.append_state(output_path),
             'config_summary': {
                 'total_entities': len(self.config['entities']),
                 'total_attributes': sum(len(entity.get('attributes', [])) for entity in self.config['entities']),
@@ -582,28 +2164,28 @@ class EnhancedDataGenerator:
                 'metadata_fields': self.config.get('metadata_fields', [])
             }
         }
-        
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-
-        with open("config.yaml", "r") as file:
-            config = yaml.safe_load(file)
-
-        config['local_input_data_path'] = output_path
-
-        with open("config.yaml", "w") as file:
-            yaml.dump(config, file)
-        
-        return output_path
+    
+    def dataset_files(self, output_path: str) -> List[str]:
+        """Every file making up a finished dataset: the data (or manifest and parts) and its metadata."""
+        files = [output_path.replace('.jsonl', '_metadata.json')]
+        if self.manifest_path:
+            files += [self.manifest_path] + manifest_part_paths(self.manifest_path)
+        else:
+            files.append(output_path)
+        return files
 
-    def print_generation_summary(self, dataset: List[Dict[str, Any]], output_path: str):
+    def print_generation_summary(self, output_path: str):
         """Print comprehensive generation summary."""
         print(f"\nDATASET GENERATION COMPLETE!")
         print("=" * 60)
-        print(f"Output File: {output_path}")
+        print(f"Output File: {self.s3_uri or self.manifest_path or output_path}")
         print(f"Metadata File: {output_path.replace('.jsonl', '_metadata.json')}")
         print(f"Domain: {self.config['domain_name']}")
-        print(f"Examples Generated: {len(dataset)}")
+        print(f"Examples Generated: {self.stats.total_records}")
+        print(f"Seed: {self.seed}")
+        if self.dedup_report:
+            print(f"Duplicate Rate: {self.dedup_report['duplicate_rate']:.1%} "
+                  f"({self.dedup_report['input_records'] - self.dedup_report['kept_records']} removed)")
         print(f"Generation Time: {self.stats.generation_time:.2f} seconds")
         
         print(f"\nENTITY STATISTICS:")
@@ -616,6 +2198,15 @@ class EnhancedDataGenerator:
             'relationships': len(self.config.get('relationships', [])),
         }
         
+        if self.profile:
+            breakdown = self.stats.profile_breakdown()
+            print(f"\nPROFILE (slowest attribute types):")
+            for attribute_type, timing in list(breakdown['attribute_types'].items())[:5]:
+                print(f"  * {attribute_type}: {timing['seconds']:.3f}s over {timing['calls']} values "
+                      f"({timing['microseconds_per_call']:.1f} us/value)")
+            print(f"  * Example assembly: {breakdown['example_assembly']['seconds']:.3f}s, "
+                  f"serialization: {breakdown['serialization']['seconds']:.3f}s")
+        
         print(f"\nCONFIGURATION UTILIZATION:")
         print(f"  * Entities: {config_summary['total_entities']}")
         print(f"  * Total Attributes: {config_summary['total_attributes']}")
@@ -629,10 +2220,76 @@ class EnhancedDataGenerator:
                 print(f"  * ... and {len(self.stats.validation_errors) - 5} more")
         
         print(f"\nNEXT STEPS:")
-        print(f"1. Review generated data: head -n 3 {output_path}")
-        print(f"2. Validate format: python -c \"import json; [json.loads(line) for line in open('{output_path}')]\"")
+        if self.s3_uri:
+            print(f"1. Review generated data: aws s3 cp {self.s3_uri} - | head -n 3")
+            print(f"2. config.yaml already points at {self.s3_uri}; skip the upload step")
+        elif self.manifest_path:
+            print(f"1. Review the part list: cat {self.manifest_path}")
+            print(f"2. Verify checksums: python -c \"from workflow_utils.dataset_io import verify_manifest; print(verify_manifest('{self.manifest_path}') or 'OK')\"")
+        else:
+            print(f"1. Review generated data: head -n 3 {output_path}")
+            print(f"2. Validate format: python -c \"import json; [json.loads(line) for line in open('{output_path}')]\"")
         print(f"3. Start fine-tuning with your preferred framework")
 
+def _generate_shard(config_path: str, shard_index: int, start: int, count: int, seed: int,
+                    pool_size: int, shard_path: str, options: Dict[str, Any], checkpoint_every: int = 0,
+                    resume: bool = False) -> tuple:
+    """Process-pool worker: generate one contiguous range of examples into its own JSONL shard.
+
+    The entity pools are built from the run seed, exactly as a single worker builds them,
+    so every shard samples the same entities (and IDs). The range starts on a seed block
+    boundary, so its examples come out as they would in a single-worker run.
+    """
+    generator = EnhancedDataGenerator(config_path, seed=seed, **options)
+    generator.checkpoint_every = checkpoint_every
+    entity_data = generator.build_entity_pools(pool_size)
+    entity_ids_sha256 = generator.entity_ids_digest(entity_data)
+    
+    checkpoint_path = checkpoint_path_for(shard_path) if checkpoint_every > 0 else None
+    total_records = generator.write_examples(shard_path, entity_data, start, count, checkpoint_path, resume)
+    
+    return shard_index, {
+        'total_records': total_records,
+        'entities_generated': generator.stats.entities_generated,
+        'entity_ids_sha256': entity_ids_sha256,
+        'validation_errors': generator.stats.validation_errors,
+        'timings': generator.stats.timing_totals(),
+    }
+
+def cache_options(args: argparse.Namespace, generator_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run settings that change the generated dataset, and so belong in its cache key.
+
+    Profiling, the worker count, the serializer (json and orjson write the same bytes),
+    the Faker pool cache directory and the lazy-pool cache size do not change the output.
+    An unpinned reference time is left out as well: a cached dataset keeps the 'now' of
+    the run that produced it.
+    """
+    options = {name: value for name, value in generator_options.items()
+               if name not in ('profile', 'serializer', 'faker_pool_cache', 'entity_cache_size',
+                               'reference_time')}
+    options.update({
+        'reference_time': args.reference_time,
+        'dedup_threshold': args.dedup_threshold if args.dedup else None,
+        'compression': args.compression,
+        'partition_rows': args.partition_rows,
+    })
+    return options
+
+def open_s3_sink(args: argparse.Namespace) -> S3MultipartWriter:
+    """Multipart upload for --stream-to-s3, at --s3-uri or where the upload step would put the dataset."""
+    if boto3 is None:
+        raise ImportError("--stream-to-s3 requires the 'boto3' package")
+    with open("config.yaml", "r") as file:
+        config = yaml.safe_load(file)
+    if args.s3_uri:
+        bucket, key = parse_s3_uri(args.s3_uri)
+    else:
+        bucket = config['input_data_s3_bucket']
+        key = f"{config['input_data_s3_prefix']}/{config['use_case']}/{config['use_case']}.jsonl"
+    client = boto3.client('s3', region_name=config.get('aws_region'))
+    return S3MultipartWriter(client, bucket, key, part_size=max(args.part_size_mb, 5) * 1024 ** 2,
+                             max_concurrency=args.max_concurrency)
+
 def main():
     """Enhanced main function with comprehensive options."""
     parser = argparse.ArgumentParser(description="Advanced Synthetic Data Generator")
@@ -641,12 +2298,99 @@ def main():
     parser.add_argument("--output", help="Output file path (optional)")
     parser.add_argument("--preview", action="store_true", help="Show preview of generated data")
     parser.add_argument("--validate-only", action="store_true", help="Only validate configuration")
+    parser.add_argument("--seed", type=int, help="Random seed; the same seed reproduces the same dataset with any worker count")
+    parser.add_argument("--columnar", action="store_true", help="Generate entity pools column-wise with NumPy (numeric, boolean, categorical and date attributes)")
+    parser.add_argument("--faker-pool-size", type=int, default=0, help="Pre-generate this many values per Faker type (names, emails, addresses, text); 0 disables pooling")
+    parser.add_argument("--faker-reuse-ratio", type=float, default=1.0, help="Fraction of Faker values drawn from the pool; the rest are generated fresh and refresh the pool")
+    parser.add_argument("--faker-pool-cache", default=".faker_pool_cache", help="Directory for cached Faker value pools (keyed by locales and seed)")
+    parser.add_argument("--workers", type=int, default=1, help="Number of worker processes; >1 generates sharded output in parallel (one shard per 1000 examples at most)")
+    parser.add_argument("--reference-time", help="ISO timestamp used for 'now' in date bounds (defaults to the current time)")
+    parser.add_argument("--checkpoint-every", type=int, default=1000, help="Checkpoint every N examples so an interrupted run can be resumed; 0 disables")
+    parser.add_argument("--resume", action="store_true", help="Resume an interrupted run into --output from its last checkpoint")
+    parser.add_argument("--append", action="store_true", help="Grow the dataset at --output to --num-examples, generating only the missing examples")
+    parser.add_argument("--lazy-entities", action="store_true", help="Generate entity records on first use instead of materializing every pool up front")
+    parser.add_argument("--entity-cache-size", type=int, default=10000, help="Materialized records kept per entity in lazy mode")
+    parser.add_argument("--serializer", choices=["json", "orjson", "auto"], default="json", help="JSON backend for the JSONL output; 'orjson' writes the same bytes as 'json', faster; 'auto' uses orjson when installed")
+    parser.add_argument("--profile", action="store_true", help="Record per-attribute-type, per-entity, example and serialization timings in _metadata.json")
+    parser.add_argument("--profile-pstats", help="Also run under cProfile and dump pstats to this file (main process only)")
+    parser.add_argument("--compression", choices=list(COMPRESSION_SUFFIXES), default="none", help="Compress the output JSONL (written as parts listed in a manifest)")
+    parser.add_argument("--partition-rows", type=int, default=0, help="Split the output into parts of this many rows, listed in a manifest with row counts and checksums")
+    parser.add_argument("--dedup", action="store_true", help="Remove exact and near-duplicate dialogs after generation")
+    parser.add_argument("--dedup-threshold", type=float, default=0.9, help="Estimated Jaccard similarity at which two dialogs count as near duplicates")
+    parser.add_argument("--dedup-store", help="SQLite file for the dedup index (defaults to a temporary file)")
+    parser.add_argument("--use-cache", action="store_true", help="Reuse a previously generated dataset with the same config, seed, count and options (needs --seed, ignored with --output)")
+    parser.add_argument("--cache-dir", default="usecase_data", help="Directory holding the dataset cache index")
+    parser.add_argument("--cache-max-gb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 3, help="Size limit of cached datasets; least recently used ones are deleted beyond it")
+    parser.add_argument("--stream-to-s3", action="store_true", help="Stream the JSONL straight into an S3 multipart upload while generating (no local copy; replaces the upload step)")
+    parser.add_argument("--s3-uri", help="Destination for --stream-to-s3 (defaults to s3://<input_data_s3_bucket>/<input_data_s3_prefix>/<use_case>/<use_case>.jsonl from config.yaml)")
+    parser.add_argument("--part-size-mb", type=int, default=DEFAULT_PART_SIZE // 1024 ** 2, help="Multipart part size in MiB for --stream-to-s3 (minimum 5)")
+    parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Parts uploaded in parallel with --stream-to-s3")
     
     args = parser.parse_args()
     
+    # Fail before generating anything rather than when the finished dataset is packaged
+    if not compression_available(args.compression):
+        print(f"ERROR: --compression {args.compression} requires the 'zstandard' package (pip install zstandard)")
+        return 1
+    
+    if args.stream_to_s3:
+        # Streaming writes the file once, front to back; anything that rereads or rewrites it needs a local copy
+        conflicts = [flag for flag, used in (('--output', args.output), ('--workers', args.workers > 1),
+                                             ('--resume', args.resume), ('--append', args.append),
+                                             ('--dedup', args.dedup), ('--compression', args.compression != 'none'),
+                                             ('--partition-rows', args.partition_rows)) if used]
+        if conflicts:
+            print(f"ERROR: --stream-to-s3 cannot be combined with {', '.join(conflicts)}")
+            return 1
+    
     try:
+        generator_options = {
+            'columnar': args.columnar,
+            'faker_pool_size': args.faker_pool_size,
+            'faker_reuse_ratio': args.faker_reuse_ratio,
+            'faker_pool_cache': args.faker_pool_cache,
+            'reference_time': args.reference_time,
+            'lazy_entities': args.lazy_entities,
+            'entity_cache_size': args.entity_cache_size,
+            'profile': args.profile,
+            'serializer': args.serializer,
+        }
+        if args.resume:
+            # The run parameters come from the checkpoint, so the resumed output matches the original run
+            if not args.output:
+                print("ERROR: --resume requires --output pointing at the interrupted dataset")
+                return 1
+            recorded = load_checkpoint(checkpoint_path_for(args.output))
+            if recorded is None:
+                print(f"ERROR: No checkpoint found for {args.output}")
+                return 1
+            run = recorded.get('run')
+            if run is None:
+                # append_to_file checkpoints only the example stream; the append itself is rerun to recover
+                print(f"ERROR: The checkpoint for {args.output} is from an append run; "
+                      f"rerun the same --append command instead of --resume to finish it")
+                return 1
+            args.seed, args.num_examples, args.workers = run['seed'], run['num_examples'], run['workers']
+            generator_options = run['generator_options']
+            print(f"Resuming {args.output} (seed {args.seed}, {args.num_examples} examples, {args.workers} workers)")
+        elif args.append:
+            # Appending continues the original run, so its seed and options come from the metadata
+            metadata_path = args.output.replace('.jsonl', '_metadata.json') if args.output else None
+            if not metadata_path or not os.path.exists(metadata_path):
+                print("ERROR: --append requires --output pointing at an existing dataset and its _metadata.json")
+                return 1
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            args.seed, generator_options = metadata['seed'], metadata['generator_options']
+        
         # Initialize generator
-        generator = EnhancedDataGenerator(args.config)
+        generator = EnhancedDataGenerator(args.config, seed=args.seed, **generator_options)
+        generator.checkpoint_every = args.checkpoint_every
+        if args.dedup:
+            generator.dedup_threshold = args.dedup_threshold
+            generator.dedup_store = args.dedup_store
+        generator.compression = args.compression
+        generator.partition_rows = args.partition_rows
         
         if args.validate_only:
             print("VALIDATION PASSED: Configuration is valid!")
@@ -654,15 +2398,60 @@ def main():
         
         if args.preview:
             print("PREVIEW MODE - Generating sample data...")
-            entity_data = generator.generate_related_entities(2)
+            # Same pools as a real run: lazy only with --lazy-entities
+            entity_data = generator.build_entity_pools(2)
             example = generator.create_training_example(entity_data)
             print(json.dumps(example, indent=2, ensure_ascii=False))
             return 0
         
+        # A cache entry is only meaningful for a seeded run written to the default location
+        cache = cache_key = None
+        if args.use_cache:
+            if args.seed is None or args.output or args.resume or args.stream_to_s3:
+                print("Dataset cache skipped: it needs --seed and does not apply to --output, --resume or --stream-to-s3")
+            else:
+                cache = DatasetCache(args.cache_dir, int(args.cache_max_gb * 1024 ** 3))
+                cache_key = dataset_cache_key(args.config, args.seed, args.num_examples, GENERATOR_VERSION,
+                                              cache_options(args, generator_options))
+                entry = cache.lookup(cache_key)
+                if entry is not None:
+                    set_local_input_data_path(entry['dataset_path'])
+                    print(f"Dataset cache hit: reusing {entry['dataset_path']} "
+                          f"({entry['num_examples']} examples, seed {entry['seed']})")
+                    return 0
+                print("Dataset cache miss: generating")
+        
+        profiler = None
+        if args.profile_pstats:
+            profiler = cProfile.Profile()
+            profiler.enable()
+        
         # Generate full dataset
-        dataset = generator.generate_dataset(args.num_examples)
-        output_path = generator.save_dataset(dataset, args.output)
-        generator.print_generation_summary(dataset, output_path)
+        if args.stream_to_s3:
+            output_path = generator.generate_to_s3(args.num_examples, open_s3_sink(args))
+        elif args.append:
+            # The dataset is about to grow, so a cache entry for its original run no longer describes it
+            if DatasetCache(args.cache_dir).invalidate(args.output):
+                print(f"Dropped the dataset cache entry for {args.output}")
+            output_path = generator.append_to_file(args.num_examples, args.output)
+        elif args.workers > 1:
+            output_path = generator.generate_dataset_sharded(args.num_examples, args.workers, args.output, args.resume)
+        else:
+            output_path = generator.generate_to_file(args.num_examples, args.output, args.resume)
+        
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.profile_pstats)
+            print(f"cProfile stats written to {args.profile_pstats}")
+        generator.print_generation_summary(output_path)
+        
+        if cache is not None:
+            evicted = cache.register(cache_key, generator.manifest_path or output_path,
+                                     generator.dataset_files(output_path),
+                                     {'config_path': args.config, 'seed': args.seed, 'num_examples': args.num_examples})
+            print(f"Registered dataset in cache ({cache.total_bytes() / 1024 ** 2:.1f} MiB cached)")
+            for path in evicted:
+                print(f"  Evicted {path}")
         
         return 0
         
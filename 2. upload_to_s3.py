@@ -1,9 +1,17 @@
-
-
 import os
 import argparse
 import boto3 
 import ruamel.yaml
+from workflow_utils.dataset_io import MANIFEST_SUFFIX, is_manifest
+from workflow_utils.preprocess import TRAIN_SPLIT, VALIDATION_SPLIT
+from workflow_utils.s3_transfer import DEFAULT_MAX_CONCURRENCY, DEFAULT_PART_SIZE, S3Uploader
+
+parser = argparse.ArgumentParser(description="Upload the generated dataset to S3")
+parser.add_argument("--part-size-mb", type=int, default=DEFAULT_PART_SIZE // 1024 ** 2, help="Multipart threshold and part size in MiB (minimum 5)")
+parser.add_argument("--max-concurrency", type=int, default=DEFAULT_MAX_CONCURRENCY, help="Parts uploaded in parallel")
+parser.add_argument("--force", action="store_true", help="Upload even when the S3 object already matches the local checksum")
+parser.add_argument("--keep-compressed", action="store_true", help="Upload gzip/zstd parts as they are (archive only: the training job reads plain JSONL, so parts are decompressed by default)")
+args = parser.parse_args()
 
 yaml = ruamel.yaml.YAML()
 yaml.preserve_quotes = True
@@ -19,16 +27,52 @@ S3_BUCKET_NAME = config['input_data_s3_bucket']
 S3_PREFIX = config['input_data_s3_prefix']
 USE_CASE = config['use_case']
 
-# Create the s3 prefix pattern: s3_prefix/use_case/use_case.jsonl
-s3_object_key = f"{S3_PREFIX}/{USE_CASE}/{USE_CASE}.jsonl"
+uploader = S3Uploader(boto3.client('s3', region_name=AWS_REGION), S3_BUCKET_NAME,
+                      part_size=max(args.part_size_mb, 5) * 1024 ** 2,
+                      max_concurrency=args.max_concurrency, force=args.force)
+
+# Partitioned, compressed or multi-file datasets go under s3_prefix/use_case/data/, so the
+# training channel sees only data files
+data_prefix = f"{S3_PREFIX}/{USE_CASE}/data"
+validation_object_key = None
+
+if is_manifest(LOCAL_INPUT_DATA_PATH):
+    # Every part is checked against the manifest before anything is uploaded;
+    # the manifest sits beside the data prefix. Compressed parts go up as plain JSONL
+    try:
+        part_keys = uploader.upload_manifest(LOCAL_INPUT_DATA_PATH, data_prefix, f"{S3_PREFIX}/{USE_CASE}/{USE_CASE}{MANIFEST_SUFFIX}",
+                                             decompress=not args.keep_compressed)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    # The channel reads the whole prefix: drop parts and splits from earlier uploads
+    uploader.delete_stale_objects(data_prefix, part_keys)
+    s3_object_key = f"{data_prefix}/"
+elif os.path.isdir(LOCAL_INPUT_DATA_PATH):
+    uploaded_keys = uploader.upload_directory(LOCAL_INPUT_DATA_PATH, data_prefix)
+    # As for manifests: files this run did not produce must not stay in the channel
+    uploader.delete_stale_objects(data_prefix, uploaded_keys)
+    s3_object_key = f"{data_prefix}/"
+    # A preprocessed dataset trains on train/ and validates on validation/ (separate channels)
+    if all(os.path.isdir(os.path.join(LOCAL_INPUT_DATA_PATH, split)) for split in (TRAIN_SPLIT, VALIDATION_SPLIT)):
+        s3_object_key = f"{data_prefix}/{TRAIN_SPLIT}/"
+        validation_object_key = f"{data_prefix}/{VALIDATION_SPLIT}/"
+else:
+    # Create the s3 prefix pattern: s3_prefix/use_case/use_case.jsonl
+    s3_object_key = f"{S3_PREFIX}/{USE_CASE}/{USE_CASE}.jsonl"
+    
+    # Upload local file to S3 with the specified key pattern (skipped when unchanged)
+    uploader.upload_file(LOCAL_INPUT_DATA_PATH, s3_object_key)
 
-# Upload local file to S3 with the specified key pattern
-print(f"Uploading {LOCAL_INPUT_DATA_PATH} to s3://{S3_BUCKET_NAME}/{s3_object_key}")
-boto3.client('s3', region_name=AWS_REGION).upload_file(LOCAL_INPUT_DATA_PATH, S3_BUCKET_NAME, s3_object_key)
+print(f"Upload complete: {uploader.summary()}")
 
 # Add or update the config parameters
 config['s3_jsonl_file'] = s3_object_key
 config['uri_for_uploaded_s3_input_data'] = f"s3://{S3_BUCKET_NAME}/{s3_object_key}"
+if validation_object_key:
+    config['uri_for_uploaded_s3_validation_data'] = f"s3://{S3_BUCKET_NAME}/{validation_object_key}"
+else:
+    # Without a preprocessed split the training job splits the data itself
+    config.pop('uri_for_uploaded_s3_validation_data', None)
 
 # Write the updated config back to config.yaml
 with open("config.yaml", "w") as f:
@@ -2,10 +2,16 @@ import os
 import shutil
 import sys
 import time
+import json
+import argparse
 import ruamel.yaml 
 import boto3
 from sagemaker.jumpstart.estimator import JumpStartEstimator
 from sagemaker.inputs import TrainingInput
+from workflow_utils.hyperparameters import (PRESETS, jumpstart_hyperparameters, load_overrides, overrides_path_for,
+                                            preset_settings, print_hyperparameters, resolve_hyperparameters)
+from workflow_utils.preprocess import training_dataset_path
+from workflow_utils.token_stats import token_report_path
 
 # Fix for Unicode encoding errors on Windows console
 if sys.platform == 'win32':
@@ -15,6 +21,12 @@ if sys.platform == 'win32':
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
 
+parser = argparse.ArgumentParser(description="Fine-tune the JumpStart model on the uploaded dataset")
+parser.add_argument("--overrides", help="YAML file of hyperparameter overrides (defaults to finetune_configs/<use_case>.yaml when it exists)")
+parser.add_argument("--dry-run", action="store_true", help="Resolve, validate and print the hyperparameters without starting a training job")
+parser.add_argument("--preset", choices=list(PRESETS) + ["none"], help="Performance preset sizing batch, FSDP, workers, LoRA targets, context length and instance type (defaults to training_preset in config.yaml)")
+parser.add_argument("--token-report", help="Token-length report from analyze_token_lengths.py used to size the preset (defaults to the one beside the dataset)")
+args = parser.parse_args()
 
 yaml = ruamel.yaml.YAML()
 yaml.preserve_quotes = True
@@ -28,6 +40,7 @@ SAGEMAKER_ARN_ROLE = config['sagemaker_role']
 HF_Key = config['huggingface_token']
 USE_CASE = config['use_case']
 input_data_s3_uri = config['uri_for_uploaded_s3_input_data']
+validation_data_s3_uri = config.get('uri_for_uploaded_s3_validation_data')
 output_model_files_s3_bucket = config['output_model_files_s3_bucket']
 model_id = config['jumpstart_model_id']
 instance_type = config['instance_type']
@@ -46,28 +59,51 @@ role = SAGEMAKER_ARN_ROLE
 # Create training file name based on use case
 train_filename = f"{USE_CASE}-data-chat.jsonl"
 
-hyperparameters = {
-    "model_name": model_id,
-    "instruction_tuned": "False",
-    "chat_dataset": "True",            # Critical flag for chat format
-    "use_default_template": "False",   # Not using default template
-    "chat_template": "Llama3.1",       # Use Llama 3.1 specific template
-    "epoch": "3",
-    "enable_fsdp": "False",
-    "learning_rate": "1e-5",
-    "per_device_train_batch_size": "2",
-    "gradient_accumulation_steps": "4",
-    "lora_r": "16",
-    "lora_alpha": "64",
-    "lora_dropout": "0.05",
-    "target_modules": "q_proj,k_proj,v_proj,o_proj",
-    "preprocessing_num_workers": "4",
-    "num_workers_dataloader": "4",
-    "max_input_length": "2048",
-    # The train_file should reference the relative path that will be accessible in the container
-    "train_file": "/opt/ml/input/data/training/patient_care_plan.jsonl",
-    "validation_split_ratio": "0.2"
-}
+# A preset is sized from the dataset's token lengths when analyze_token_lengths.py has been run
+preset_name = args.preset or config.get('training_preset') or None
+preset = preset_source = None
+dataset_rows = int(config.get('count_synthetic_data') or 0) or None
+if preset_name and preset_name != "none":
+    # Same resolution as analyze_token_lengths.py, so a preprocessed dataset finds its train split's report
+    report_path = args.token_report or token_report_path(
+        training_dataset_path(str(config.get('local_input_data_path') or '')))
+    token_lengths = None
+    if os.path.exists(report_path):
+        with open(report_path, 'r', encoding='utf-8') as f:
+            token_report = json.load(f)
+        token_lengths, dataset_rows = token_report['total'], token_report['rows']
+        print(f"Sizing preset '{preset_name}' from {report_path} ({dataset_rows} dialogs)")
+    elif args.token_report:
+        sys.exit(f"ERROR: Token-length report {args.token_report} not found")
+    else:
+        print("=" * 60)
+        print(f"WARNING: No token-length report at {report_path}")
+        print(f"  Preset '{preset_name}' cannot size max_input_length from the data and keeps the configured "
+              f"{int(config.get('max_input_length') or 2048)}.")
+        print("  Run analyze_token_lengths.py first, or pass --token-report.")
+        print("=" * 60)
+    preset, instance_type = preset_settings(preset_name, dataset_rows, token_lengths, int(config.get('max_input_length') or 2048))
+    preset_source = f"preset:{preset_name}"
+
+# Defaults, then config.yaml settings, then the preset, then the use case's override file
+overrides_path = args.overrides or overrides_path_for(USE_CASE)
+if args.overrides and not os.path.exists(args.overrides):
+    sys.exit(f"ERROR: Override file {args.overrides} not found")
+try:
+    values, sources = resolve_hyperparameters(config, load_overrides(overrides_path), overrides_path,
+                                              preset, preset_source)
+except ValueError as e:
+    sys.exit(f"ERROR: {e}")
+hyperparameters = jumpstart_hyperparameters(model_id, values)
+
+# A dataset split by preprocess_dataset.py brings its own validation channel
+if validation_data_s3_uri:
+    del hyperparameters["validation_split_ratio"]
+
+print_hyperparameters(hyperparameters, sources)
+print(f"Instance type: {instance_type}" + (f" ({preset_source})" if preset else ""))
+if args.dry_run:
+    sys.exit(0)
 
 # Environment variables
 environment = {
@@ -119,16 +155,35 @@ if input_data_s3_uri.startswith('s3:///'):
 
 # Print debugging info
 print(f"Training data URI: {input_data_s3_uri}")
+if validation_data_s3_uri:
+    print(f"Validation data URI: {validation_data_s3_uri}")
 print(f"Output path: s3://{output_model_files_s3_bucket}/{job_name}/")
 
 # Simplified input specification to avoid path mapping issues
 estimator.fit(
-    inputs=input_data_s3_uri,  # Using simplified input specification
+    inputs={"training": input_data_s3_uri, "validation": validation_data_s3_uri} if validation_data_s3_uri
+    else input_data_s3_uri,  # Using simplified input specification
     job_name=job_name
 )
 
 print("\nScript completed successfully")
 
+# Record the preset and the job's cost per example, so runs can be compared
+job_description = estimator.latest_training_job.describe()
+billable_seconds = job_description.get('BillableTimeInSeconds')
+config['training_preset'] = preset_name if preset else ""
+config['last_training_run'] = {
+    'job_name': job_name,
+    'preset': preset_name if preset else "",
+    'instance_type': instance_type,
+    'examples': dataset_rows,
+    'epochs': values['epoch'],
+    'billable_seconds': billable_seconds,
+    'billable_seconds_per_example': round(billable_seconds / (dataset_rows * values['epoch']), 4)
+    if billable_seconds and dataset_rows else None,
+}
+print(f"Training run: {dict(config['last_training_run'])}")
+
 
 output_dir = os.environ.get("SM_MODEL_DIR", "./output")
 os.makedirs(f"{output_dir}/code", exist_ok=True)
@@ -0,0 +1,77 @@
+import os
+import json
+import argparse
+import ruamel.yaml
+from workflow_utils.preprocess import load_tokenizer, training_dataset_path
+from workflow_utils.token_stats import analyze_jsonl, token_report_path, write_length_buckets, write_length_sorted
+
+# Width of the printed histogram bars
+BAR_WIDTH = 40
+
+parser = argparse.ArgumentParser(description="Token length distribution, padding waste and batch recommendations for a dataset")
+parser.add_argument("--input", help="Dataset to analyze; a preprocessed directory means its train split (defaults to local_input_data_path in config.yaml)")
+parser.add_argument("--tokenizer", help="Hugging Face tokenizer name, or 'stub' for an offline approximation (defaults to tokenizer_name in config.yaml, else 'stub')")
+parser.add_argument("--max-input-length", type=int, help="Training truncation length (defaults to max_input_length in config.yaml)")
+parser.add_argument("--batch-size", type=int, default=2, help="per_device_train_batch_size to estimate padding waste for")
+parser.add_argument("--gradient-accumulation-steps", type=int, default=4, help="Current gradient accumulation; recommendations keep the effective batch size")
+parser.add_argument("--bucket-width", type=int, default=128, help="Tokens per histogram bucket (and per bucket file)")
+parser.add_argument("--report", help="JSON report path (defaults to <dataset>_token_lengths.json)")
+parser.add_argument("--bucketed-output", help="Also copy the dataset into this directory, one JSONL file per length bucket")
+parser.add_argument("--sorted-output", help="Also write a copy of the dataset sorted by token length to this path")
+args = parser.parse_args()
+
+yaml = ruamel.yaml.YAML()
+with open("config.yaml", "r") as file:
+    config = yaml.load(file)
+
+# A preprocessed dataset is a directory of splits; analyze the train split the job will read
+input_path = training_dataset_path(args.input or config['local_input_data_path'])
+if not os.path.isfile(input_path):
+    raise SystemExit(f"{input_path} not found; point --input at a JSONL file, manifest or preprocessed directory")
+report_path = args.report or token_report_path(input_path)
+tokenizer_name = args.tokenizer or config.get('tokenizer_name') or 'stub'
+max_input_length = args.max_input_length or int(config.get('max_input_length') or 2048)
+
+print(f"Analyzing {input_path} (tokenizer: {tokenizer_name}, max_input_length: {max_input_length})")
+tokenizer = load_tokenizer(tokenizer_name, token=config.get('huggingface_token') or None)
+stats = analyze_jsonl(input_path, tokenizer, max_input_length)
+report = stats.report(args.batch_size, args.gradient_accumulation_steps, args.bucket_width)
+if not report['rows']:
+    raise SystemExit(f"{input_path} contains no examples")
+
+total = report['total']
+print(f"\nTOKENS PER DIALOG ({report['rows']} dialogs):")
+print(f"  min {total['min']}, mean {total['mean']}, p50 {total['p50']}, p90 {total['p90']}, "
+      f"p95 {total['p95']}, p99 {total['p99']}, max {total['max']}")
+for role, summary in report['roles'].items():
+    print(f"  {role}: mean {summary['mean']}, p50 {summary['p50']}, p99 {summary['p99']}, max {summary['max']}")
+
+print(f"\nHISTOGRAM ({args.bucket_width}-token buckets):")
+largest = max(bucket['count'] for bucket in report['histogram'])
+for bucket in report['histogram']:
+    bar = '#' * max(1, round(BAR_WIDTH * bucket['count'] / largest))
+    print(f"  {bucket['from']:>6}-{bucket['to']:<6} {bucket['count']:>8}  {bar}")
+
+padding = report['padding']
+print(f"\nPADDING WASTE (batch size {padding['batch_size']}):")
+print(f"  dataset order: {padding['dataset_order']:.1%}, length-grouped batches: {padding['length_grouped']:.1%}")
+if report['over_max_input_length']:
+    print(f"  WARNING: {report['over_max_input_length']} dialogs exceed max_input_length {max_input_length} and will be truncated")
+
+recommendation = report['recommendation']
+print("\nRECOMMENDED SETTINGS:")
+print(f"  max_input_length: {recommendation['max_input_length']} ({recommendation['truncated_rows']} dialogs truncated)")
+print(f"  per_device_train_batch_size: {recommendation['per_device_train_batch_size']}")
+print(f"  gradient_accumulation_steps: {recommendation['gradient_accumulation_steps']}")
+print(f"  padding waste with these settings: {recommendation['padding_waste']:.1%}")
+
+with open(report_path, 'w', encoding='utf-8') as f:
+    json.dump(report, f, indent=2)
+print(f"\nReport written to {report_path}")
+
+if args.bucketed_output:
+    bucket_paths = write_length_buckets(input_path, stats.lengths, args.bucketed_output, args.bucket_width)
+    print(f"Bucketed copy written to {args.bucketed_output} ({len(bucket_paths)} files)")
+if args.sorted_output:
+    write_length_sorted(input_path, stats.lengths, args.sorted_output, args.bucket_width)
+    print(f"Length-sorted copy written to {args.sorted_output}")
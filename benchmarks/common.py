@@ -0,0 +1,31 @@
+"""
+Shared helpers for the generation benchmarks.
+
+The workflow scripts are numbered ("1. generate_synthetic_data.py") and cannot be
+imported by name, so they are loaded here from their file path.
+"""
+
+import glob
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GENERATOR_SCRIPT = os.path.join(REPO_ROOT, "1. generate_synthetic_data.py")
+DATA_GEN_CONFIGS_DIR = os.path.join(REPO_ROOT, "data_gen_configs")
+
+
+def load_generator_module():
+    """Import the synthetic data generator script as a module."""
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    spec = importlib.util.spec_from_file_location("generate_synthetic_data", GENERATOR_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def data_gen_config_paths(pattern="*.yaml"):
+    """Return the sorted list of data generation configs to benchmark."""
+    return sorted(glob.glob(os.path.join(DATA_GEN_CONFIGS_DIR, pattern)))
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+End-to-end generation throughput benchmark.
+
+Runs EnhancedDataGenerator against every config in data_gen_configs/ at several dataset
+sizes. Each case runs in a fresh worker process, so peak RSS is measured per case. For
+every case it records examples/sec, peak RSS and the time spent in each pipeline phase
+(generator setup, entity generation, example assembly, serialization).
+
+Results are written as JSON. When a baseline results file is given, every case is
+compared with its baseline counterpart and the script exits non-zero if throughput
+drops, or peak RSS grows, by more than the allowed threshold.
+
+Usage:
+    python benchmarks/generation_benchmark.py --sizes 1000 10000 --output bench.json
+    python benchmarks/generation_benchmark.py --baseline bench.json --threshold 0.15
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from common import data_gen_config_paths, load_generator_module
+
+
+def peak_rss_mb():
+    """Peak resident set size of the current process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_case(config_path, num_examples, options):
+    """Generate num_examples into a temporary JSONL file and time each pipeline phase."""
+    module = load_generator_module()
+    phases = {'setup': 0.0, 'entity_generation': 0.0, 'example_assembly': 0.0, 'serialization': 0.0}
+    perf_counter = time.perf_counter
+
+    with contextlib.redirect_stdout(io.StringIO()), tempfile.TemporaryDirectory() as temp_dir:
+        start = perf_counter()
+        generator = module.EnhancedDataGenerator(config_path, seed=options['seed'],
+                                                 columnar=options['columnar'],
+                                                 faker_pool_size=options['faker_pool_size'],
+                                                 lazy_entities=options['lazy_entities'],
+                                                 serializer=options['serializer'])
+        phases['setup'] = perf_counter() - start
+
+        start = perf_counter()
+        entity_data = generator.build_entity_pools(max(num_examples // 2, 10))
+        phases['entity_generation'] = perf_counter() - start
+
+        output_path = os.path.join(temp_dir, 'dataset.jsonl')
+        with module.JsonlWriter(output_path, chunk_size=generator.write_chunk_size,
+                                serializer=generator.serializer) as writer:
+            for i in range(num_examples):
+                start = perf_counter()
+                example = generator.try_training_example(entity_data, i, num_examples)
+                assembled = perf_counter()
+                if example is not None:
+                    writer.write(example)
+                phases['example_assembly'] += assembled - start
+                phases['serialization'] += perf_counter() - assembled
+            start = perf_counter()
+        phases['serialization'] += perf_counter() - start
+
+    total_seconds = sum(phases.values())
+    return {
+        'config': os.path.basename(config_path),
+        'size': num_examples,
+        'examples': writer.records_written,
+        'bytes': writer.bytes_written,
+        'total_seconds': round(total_seconds, 4),
+        'examples_per_sec': round(writer.records_written / total_seconds, 2) if total_seconds else 0.0,
+        'phases': {name: round(seconds, 4) for name, seconds in phases.items()},
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """Return human-readable regressions of results against a baseline results document."""
+    baseline_cases = {(case['config'], case['size']): case for case in baseline['results']}
+    regressions = []
+    for case in results['results']:
+        reference = baseline_cases.get((case['config'], case['size']))
+        if reference is None:
+            continue
+        label = f"{case['config']} @ {case['size']}"
+        if case['examples_per_sec'] < reference['examples_per_sec'] * (1 - threshold):
+            regressions.append(f"{label}: {case['examples_per_sec']:.1f} examples/sec "
+                               f"vs baseline {reference['examples_per_sec']:.1f}")
+        if case['peak_rss_mb'] > reference['peak_rss_mb'] * (1 + threshold):
+            regressions.append(f"{label}: peak RSS {case['peak_rss_mb']:.1f} MiB "
+                               f"vs baseline {reference['peak_rss_mb']:.1f} MiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generation throughput benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Dataset sizes to generate")
+    parser.add_argument("--configs", default="*.yaml", help="Glob of configs inside data_gen_configs/")
+    parser.add_argument("--seed", type=int, default=1234, help="Generator seed shared by every case")
+    parser.add_argument("--columnar", action="store_true", help="Benchmark NumPy columnar entity generation")
+    parser.add_argument("--lazy-entities", action="store_true", help="Benchmark lazily materialized entity pools")
+    parser.add_argument("--faker-pool-size", type=int, default=0, help="Faker value pool size (0 disables pooling)")
+    parser.add_argument("--serializer", choices=["json", "orjson", "auto"], default="json", help="JSONL serializer backend")
+    parser.add_argument("--output", default="generation_benchmark.json", help="Where to write the JSON results")
+    parser.add_argument("--baseline", help="Results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Allowed relative regression before failing (0.15 = 15%%)")
+    args = parser.parse_args()
+
+    options = {
+        'seed': args.seed,
+        'columnar': args.columnar,
+        'lazy_entities': args.lazy_entities,
+        'faker_pool_size': args.faker_pool_size,
+        'serializer': args.serializer,
+    }
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': options,
+        'results': [],
+    }
+
+    print(f"{'config':52} {'size':>7} {'ex/s':>9} {'entities s':>10} {'examples s':>10} {'serialize s':>11} {'RSS MiB':>8}")
+    for config_path in data_gen_config_paths(args.configs):
+        for size in args.sizes:
+            # A fresh process per case keeps peak RSS and warm caches from leaking between cases
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                case = executor.submit(run_case, config_path, size, options).result()
+            results['results'].append(case)
+            phases = case['phases']
+            print(f"{case['config']:52} {size:>7} {case['examples_per_sec']:>9.1f} {phases['entity_generation']:>10.2f} "
+                  f"{phases['example_assembly']:>10.2f} {phases['serialization']:>11.2f} {case['peak_rss_mb']:>8.1f}")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nREGRESSIONS (threshold {args.threshold:.0%}):")
+            for regression in regressions:
+                print(f"  * {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
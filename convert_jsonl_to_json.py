@@ -1,26 +1,27 @@
 import json
 import os
 from pathlib import Path
+from workflow_utils.dataset_io import iter_jsonl_lines
 
 def convert_jsonl_to_json(input_file, output_file):
     """
     Convert a JSONL file to a traditional JSON file.
     
     Args:
-        input_file (str): Path to the input JSONL file
+        input_file (str): Path to the input JSONL file (plain, .gz or .zst), or to a
+            partition manifest (*.manifest.json), whose parts are read in order
         output_file (str): Path to the output JSON file
     """
     print(f"Converting {input_file} to {output_file}")
     
     # Read JSONL file and parse each line as JSON
     data = []
-    with open(input_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                json_obj = json.loads(line.strip())
-                data.append(json_obj)
-            except json.JSONDecodeError as e:
-                print(f"Error parsing line: {e}")
+    for line in iter_jsonl_lines(input_file):
+        try:
+            json_obj = json.loads(line)
+            data.append(json_obj)
+        except json.JSONDecodeError as e:
+            print(f"Error parsing line: {e}")
     
     # Write the combined data as a JSON array to the output file
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -2,10 +2,20 @@
 """
 Enhanced Perplexity API-based YAML Configuration Generator
 Creates rich, diverse synthetic data configurations with 50+ attributes and high cardinality.
+
+Batch mode (--domains / --domains-file) generates configurations for many domains at once
+with asyncio and httpx, under a concurrency limit and a token-bucket request rate limit.
+
+Successful API responses are cached on disk (.perplexity_cache/ by default), keyed by the
+request parameters, so YAML extraction and validation can be re-run without network calls.
 """
 
+import asyncio
+import hashlib
 import os
+import random
 import sys
+import time
 import requests
 import json
 import yaml
@@ -17,6 +27,20 @@ from typing import Dict, List, Any, Optional
 from dotenv import load_dotenv
 import ruamel.yaml
 
+try:
+    import httpx
+except ImportError:  # httpx is only needed for batch mode
+    httpx = None
+
+DEFAULT_API_URL = "https://api.perplexity.ai/chat/completions"
+
+# Statuses worth retrying: rate limiting and server-side failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+DEFAULT_CACHE_DIR = ".perplexity_cache"
+DEFAULT_CACHE_TTL_SECONDS = 7 * 24 * 3600
+DEFAULT_CACHE_MAX_BYTES = 200 * 1024 * 1024
+
 # Handle emoji in all environments safely
 def safe_print(text):
     """Print text safely in any environment, handling emojis properly."""
@@ -68,12 +92,113 @@ def load_config():
         print(f"Error loading config.yaml: {e}")
         return {}
 
+class TokenBucket:
+    """Asyncio token bucket: allows `rate` requests per second with bursts of up to `capacity`."""
+    
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ResponseCache:
+    """On-disk cache of Perplexity responses with a TTL and size-bounded eviction.
+
+    Entries are keyed by the model, a hash of the prompt messages, the temperature and the
+    search filters. Each entry is one JSON file; its modification time is refreshed on every
+    hit, so when the cache outgrows max_bytes the least recently used entries are removed.
+    With refresh=True nothing is read, but new responses are still stored.
+    """
+    
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_CACHE_MAX_BYTES, refresh: bool = False):
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+    
+    @staticmethod
+    def key(request_data: Dict[str, Any]) -> str:
+        """Cache key of a request body."""
+        prompt_hash = hashlib.sha256(json.dumps(request_data["messages"], sort_keys=True).encode("utf-8")).hexdigest()
+        key_fields = {
+            "model": request_data.get("model"),
+            "prompt_sha256": prompt_hash,
+            "temperature": request_data.get("temperature"),
+            "search_domain_filter": request_data.get("search_domain_filter"),
+            "search_recency_filter": request_data.get("search_recency_filter"),
+        }
+        return hashlib.sha256(json.dumps(key_fields, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[tuple[str, List[str]]]:
+        """Return the cached (content, citations) for a key, or None if missing or expired."""
+        if self.refresh:
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("created", 0) > self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return entry["content"], entry.get("citations", [])
+    
+    def put(self, key: str, content: str, citations: List[str]):
+        """Store a response, then evict least recently used entries beyond max_bytes."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / f"{key}.json"
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"created": time.time(), "content": content, "citations": citations}, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+        self.evict()
+    
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Exponential backoff with full jitter: a random delay in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
 class EnhancedUseCaseGenerator:
-    def __init__(self):
-        self.api_url = "https://api.perplexity.ai/chat/completions"
-        
+    def __init__(self, api_url: Optional[str] = None, response_cache: Optional[ResponseCache] = None):
         # Get API key from config.yaml, fallback to environment variable if not in config
         config = load_config()
+        
+        # The endpoint can be pointed elsewhere (a proxy, or a local stub server for testing)
+        self.api_url = api_url or os.getenv("PERPLEXITY_API_URL") or DEFAULT_API_URL
+        
+        # None disables response caching
+        self.response_cache = response_cache
         self.api_key = config.get("perplexity_api_key") or os.getenv("PERPLEXITY_API_KEY", "")
         
         if not self.api_key or self.api_key == "null":
@@ -162,8 +287,8 @@ OUTPUT ONLY THE YAML CONFIGURATION - NO OTHER TEXT OR EXPLANATIONS.
         """Create a comprehensive prompt combining instructions and domain."""
         return self.create_enhanced_prompt(instructions, domain)
     
-    def call_perplexity_api(self, prompt: str, domain: str) -> tuple[str, List[str]]:
-        """Enhanced API call with domain-specific search filters."""
+    def build_api_request(self, prompt: str, domain: str) -> tuple[Dict[str, str], Dict[str, Any]]:
+        """Build the (headers, JSON body) of a Perplexity request with domain-specific search filters."""
         
         # Domain-specific search filters for better research
         domain_filters = {
@@ -201,6 +326,25 @@ OUTPUT ONLY THE YAML CONFIGURATION - NO OTHER TEXT OR EXPLANATIONS.
             "search_domain_filter": search_filter,
             "search_recency_filter": "month"  # Recent information
         }
+        return headers, data
+    
+    def cached_response(self, data: Dict[str, Any], use_cache: bool) -> tuple[Optional[str], Optional[tuple[str, List[str]]]]:
+        """Return (cache_key, cached response) for a request; both are None when caching is off or skipped."""
+        if self.response_cache is None:
+            return None, None
+        key = self.response_cache.key(data)
+        return key, (self.response_cache.get(key) if use_cache else None)
+    
+    def call_perplexity_api(self, prompt: str, domain: str, use_cache: bool = True) -> tuple[str, List[str]]:
+        """Enhanced API call with domain-specific search filters.
+
+        With use_cache=False the cache is not read, but the fresh response still replaces the entry.
+        """
+        headers, data = self.build_api_request(prompt, domain)
+        cache_key, cached = self.cached_response(data, use_cache)
+        if cached is not None:
+            safe_print("💾 Using cached Perplexity response")
+            return cached
         
         try:
             response = requests.post(self.api_url, headers=headers, json=data, timeout=60)
@@ -210,6 +354,8 @@ OUTPUT ONLY THE YAML CONFIGURATION - NO OTHER TEXT OR EXPLANATIONS.
             content = response_data["choices"][0]["message"]["content"]
             citations = response_data.get("citations", [])
             
+            if cache_key is not None:
+                self.response_cache.put(cache_key, content, citations)
             return content, citations
             
         except requests.exceptions.RequestException as e:
@@ -420,7 +566,8 @@ OUTPUT ONLY THE YAML CONFIGURATION - NO OTHER TEXT OR EXPLANATIONS.
                 safe_print(f"🔍 Attempt {attempt + 1}: Calling Perplexity API for deep research...")
                 
                 prompt = self.create_enhanced_prompt(instructions, domain)
-                content, citations = self.call_perplexity_api(prompt, domain)
+                # A retry follows a rejected response, so it must not be served that response again
+                content, citations = self.call_perplexity_api(prompt, domain, use_cache=attempt == 0)
                 
                 safe_print("🧹 Extracting and validating YAML...")
                 yaml_content = self.extract_yaml_content(content)
@@ -469,20 +616,213 @@ OUTPUT ONLY THE YAML CONFIGURATION - NO OTHER TEXT OR EXPLANATIONS.
             "enhanced": True
         }
 
+    async def call_perplexity_api_async(self, client: "httpx.AsyncClient", prompt: str, domain: str,
+                                        rate_limiter: TokenBucket, max_attempts: int = 5,
+                                        backoff_base: float = 1.0, backoff_cap: float = 60.0,
+                                        use_cache: bool = True) -> tuple[str, List[str]]:
+        """Async API call that retries 429/5xx responses and transport errors with jittered exponential backoff.
+
+        Every attempt first takes a token from the shared rate limiter. A Retry-After header,
+        when present, sets the minimum wait before the next attempt. Cached responses are
+        returned without touching the network or the rate limiter.
+        """
+        headers, data = self.build_api_request(prompt, domain)
+        cache_key, cached = self.cached_response(data, use_cache)
+        if cached is not None:
+            safe_print(f"[{domain}] Using cached Perplexity response")
+            return cached
+        
+        for attempt in range(max_attempts):
+            await rate_limiter.acquire()
+            retry_after = 0.0
+            try:
+                response = await client.post(self.api_url, headers=headers, json=data)
+            except httpx.TransportError as e:
+                problem = f"{type(e).__name__}: {e}"
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    if response.status_code == 401:
+                        raise Exception("Perplexity API call failed: 401 Unauthorized. Please provide a valid API key in config.yaml.")
+                    if response.is_error:
+                        raise Exception(f"Perplexity API call failed: {response.status_code} - {response.text}")
+                    try:
+                        response_data = response.json()
+                        content = response_data["choices"][0]["message"]["content"]
+                        citations = response_data.get("citations", [])
+                    except (ValueError, KeyError, IndexError):
+                        raise Exception(f"Unexpected Perplexity API response: {response.text[:200]}")
+                    if cache_key is not None:
+                        self.response_cache.put(cache_key, content, citations)
+                    return content, citations
+                problem = f"HTTP {response.status_code}"
+                try:
+                    retry_after = float(response.headers.get("Retry-After", 0))
+                except ValueError:
+                    retry_after = 0.0
+            
+            if attempt == max_attempts - 1:
+                raise Exception(f"Error calling Perplexity API: {problem} after {max_attempts} attempts")
+            delay = max(retry_after, backoff_delay(attempt, backoff_base, backoff_cap))
+            safe_print(f"[{domain}] {problem}; retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+    
+    async def generate_use_case_async(self, client: "httpx.AsyncClient", domain: str, instructions: str,
+                                      rate_limiter: TokenBucket, max_retries: int = 3,
+                                      output_dir: str = "data_gen_configs") -> Dict[str, Any]:
+        """Async counterpart of generate_enhanced_use_case for one domain of a batch."""
+        prompt = self.create_enhanced_prompt(instructions, domain)
+        
+        for attempt in range(max_retries):
+            safe_print(f"[{domain}] Attempt {attempt + 1}: calling Perplexity API...")
+            # A retry follows a rejected response, so it must not be served that response again
+            content, citations = await self.call_perplexity_api_async(client, prompt, domain, rate_limiter,
+                                                                      use_cache=attempt == 0)
+            yaml_content = self.extract_yaml_content(content)
+            
+            try:
+                yaml.safe_load(yaml_content)
+            except yaml.YAMLError as e:
+                safe_print(f"[{domain}] YAML syntax error on attempt {attempt + 1}: {e}")
+                if attempt < max_retries - 1:
+                    continue
+                raise
+            
+            validation = self.validate_enhanced_requirements(yaml_content)
+            if validation.get("passed", False):
+                break
+            safe_print(f"[{domain}] Requirements not met on attempt {attempt + 1}: {'; '.join(validation.get('issues', []))}")
+        
+        file_path = self.save_enhanced_yaml(yaml_content, domain, validation, output_dir)
+        return {
+            "domain": domain,
+            "file_path": file_path,
+            "citations": citations,
+            "yaml_content": yaml_content,
+            "validation": validation,
+            "enhanced": True
+        }
+    
+    async def generate_batch_async(self, domains: List[str], instructions_file: str, output_dir: str = "data_gen_configs",
+                                   results_path: Optional[str] = None, concurrency: int = 4,
+                                   requests_per_second: float = 1.0, burst: int = 1,
+                                   max_retries: int = 3, timeout: float = 120.0) -> List[Dict[str, Any]]:
+        """Generate configurations for many domains concurrently.
+
+        At most `concurrency` domains are in flight, and API requests are paced by a token
+        bucket of `requests_per_second` with bursts of `burst`. Each domain's YAML is saved
+        as soon as it is ready, and a summary line is appended to `results_path` (JSONL).
+        A failing domain is recorded with its error and does not stop the others.
+        """
+        if httpx is None:
+            raise ImportError("Batch mode requires the 'httpx' package (pip install httpx)")
+        
+        instructions = self.load_instructions(instructions_file)
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        rate_limiter = TokenBucket(requests_per_second, burst)
+        results = []
+        
+        def record(summary: Dict[str, Any]):
+            results.append(summary)
+            if results_path:
+                with open(results_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+        
+        async def run_domain(client: "httpx.AsyncClient", domain: str):
+            async with semaphore:
+                started = time.monotonic()
+                try:
+                    result = await self.generate_use_case_async(client, domain, instructions, rate_limiter,
+                                                                max_retries, output_dir)
+                except Exception as e:
+                    safe_print(f"❌ [{domain}] {e}")
+                    record({"domain": domain, "status": "error", "error": str(e),
+                            "seconds": round(time.monotonic() - started, 2)})
+                    return
+                validation = result["validation"]
+                safe_print(f"✅ [{domain}] {result['file_path']} ({'PASSED' if validation.get('passed') else 'FAILED'} validation)")
+                record({"domain": domain, "status": "ok", "file_path": result["file_path"],
+                        "passed": validation.get("passed", False), "issues": validation.get("issues", []),
+                        "citations": len(result["citations"]), "seconds": round(time.monotonic() - started, 2)})
+        
+        if results_path:
+            Path(results_path).parent.mkdir(parents=True, exist_ok=True)
+        limits = httpx.Limits(max_connections=max(1, concurrency))
+        async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+            await asyncio.gather(*(run_domain(client, domain) for domain in domains))
+        return results
+    
+    def generate_batch(self, domains: List[str], instructions_file: str, **options) -> List[Dict[str, Any]]:
+        """Blocking wrapper around generate_batch_async."""
+        return asyncio.run(self.generate_batch_async(domains, instructions_file, **options))
+
+def load_domains(domains: Optional[List[str]], domains_file: Optional[str]) -> List[str]:
+    """Collect batch domains from the command line and/or a file (one per line, '#' comments allowed)."""
+    collected = list(domains or [])
+    if domains_file:
+        with open(domains_file, 'r', encoding='utf-8') as f:
+            collected += [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
+    # Keep the first occurrence of each domain
+    return list(dict.fromkeys(collected))
+
+def run_batch(args) -> int:
+    """Batch entry point: generate every requested domain and print a summary."""
+    domains = load_domains(args.domains, args.domains_file)
+    if not domains:
+        safe_print("❌ Error: no domains given")
+        return 1
+    
+    results_path = args.results or os.path.join(args.output_dir, "batch_results.jsonl")
+    safe_print(f"🎯 Generating {len(domains)} domains (concurrency {args.concurrency}, {args.rate} requests/s)")
+    generator = EnhancedUseCaseGenerator(api_url=args.api_url, response_cache=args.response_cache)
+    results = generator.generate_batch(
+        domains, args.instructions, output_dir=args.output_dir, results_path=results_path,
+        concurrency=args.concurrency, requests_per_second=args.rate, burst=args.burst
+    )
+    
+    failed = [result for result in results if result["status"] != "ok"]
+    safe_print(f"\n🎉 BATCH COMPLETE: {len(results) - len(failed)}/{len(results)} domains generated")
+    for result in failed:
+        safe_print(f"  ❌ {result['domain']}: {result['error']}")
+    safe_print(f"📁 Results: {results_path}")
+    return 1 if failed else 0
+
 def main():
     """Enhanced main function with comprehensive reporting."""
     import argparse
     
     parser = argparse.ArgumentParser(description="Enhanced YAML Configuration Generator")
-    parser.add_argument("--domain", required=True, help="Domain for use case generation")
+    parser.add_argument("--domain", help="Domain for use case generation")
+    parser.add_argument("--domains", nargs="+", help="Batch mode: generate several domains concurrently")
+    parser.add_argument("--domains-file", help="Batch mode: file with one domain per line")
     parser.add_argument("--instructions", default="data_generator_utils/instructions_for_usecase_data_creation.md", 
                        help="Instructions file path")
     parser.add_argument("--output-dir", default="data_gen_configs", help="Output directory")
+    parser.add_argument("--api-url", help=f"Chat completions endpoint (default: PERPLEXITY_API_URL or {DEFAULT_API_URL})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batch mode: domains generated at the same time")
+    parser.add_argument("--rate", type=float, default=1.0, help="Batch mode: API requests per second")
+    parser.add_argument("--burst", type=int, default=2, help="Batch mode: requests allowed in a burst above the rate")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Directory of the on-disk API response cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=DEFAULT_CACHE_TTL_SECONDS / 3600, help="Age after which cached responses are ignored")
+    parser.add_argument("--cache-max-mb", type=float, default=DEFAULT_CACHE_MAX_BYTES / 1024 ** 2, help="Cache size beyond which least recently used responses are evicted")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API and do not cache responses")
+    parser.add_argument("--refresh-cache", action="store_true", help="Ignore cached responses (fresh responses are still cached)")
+    parser.add_argument("--results", help="Batch mode: JSONL file receiving one summary per domain as it completes (default: <output-dir>/batch_results.jsonl)")
     
     args = parser.parse_args()
+    args.response_cache = None if args.no_cache else ResponseCache(
+        args.cache_dir, args.cache_ttl_hours * 3600, int(args.cache_max_mb * 1024 ** 2), args.refresh_cache)
+    
+    if args.domains or args.domains_file:
+        try:
+            return run_batch(args)
+        except Exception as e:
+            safe_print(f"❌ Error: {e}")
+            return 1
+    if not args.domain:
+        parser.error("--domain is required unless --domains or --domains-file is given")
     
     try:
-        generator = EnhancedUseCaseGenerator()
+        generator = EnhancedUseCaseGenerator(api_url=args.api_url, response_cache=args.response_cache)
         
         result = generator.generate_enhanced_use_case(
             domain=args.domain,
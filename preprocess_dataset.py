@@ -0,0 +1,66 @@
+import os
+import sys
+import argparse
+import ruamel.yaml
+from workflow_utils.dataset_io import MANIFEST_SUFFIX
+from workflow_utils.preprocess import REPORT_NAME, load_tokenizer, preprocess_jsonl
+
+# A validation split whose mean length differs from train by more than this is reported as skewed
+SKEW_TOLERANCE = 0.1
+
+parser = argparse.ArgumentParser(description="Split the generated dataset into train/validation and check token lengths before upload")
+parser.add_argument("--input", help="Dataset to preprocess (defaults to local_input_data_path in config.yaml)")
+parser.add_argument("--output-dir", help="Directory for train/, validation/ and the report (defaults to <dataset>_preprocessed beside the input)")
+parser.add_argument("--tokenizer", help="Hugging Face tokenizer name, or 'stub' for an offline approximation (defaults to tokenizer_name in config.yaml, else 'stub')")
+parser.add_argument("--max-length", type=int, help="Token limit per dialog (defaults to max_input_length in config.yaml)")
+parser.add_argument("--validation-ratio", type=float, help="Fraction of dialogs in the validation split (defaults to validation_split in config.yaml, else 0.2)")
+parser.add_argument("--salt", default="", help="Changes which dialogs land in validation while keeping the split stable")
+parser.add_argument("--keep-over-length", action="store_true", help="Keep dialogs over the token limit (they are still reported)")
+args = parser.parse_args()
+
+yaml = ruamel.yaml.YAML()
+yaml.preserve_quotes = True
+yaml.indent(mapping=2, sequence=4, offset=2)
+
+with open("config.yaml", "r") as file:
+    config = yaml.load(file)
+
+input_path = args.input or config['local_input_data_path']
+if os.path.isdir(input_path):
+    raise SystemExit(f"{input_path} is a directory; point --input at a JSONL file or manifest")
+dataset_stem = input_path[:-len(MANIFEST_SUFFIX)] if input_path.endswith(MANIFEST_SUFFIX) else os.path.splitext(input_path)[0]
+output_dir = args.output_dir or f"{dataset_stem}_preprocessed"
+tokenizer_name = args.tokenizer or config.get('tokenizer_name') or 'stub'
+max_length = args.max_length or int(config.get('max_input_length') or 2048)
+validation_ratio = args.validation_ratio if args.validation_ratio is not None else float(config.get('validation_split') or 0.2)
+
+print(f"Preprocessing {input_path} (tokenizer: {tokenizer_name}, max length: {max_length}, validation ratio: {validation_ratio})")
+if tokenizer_name == 'stub':
+    print("  Using the stub tokenizer: lengths are approximate (slight over-estimates)")
+tokenizer = load_tokenizer(tokenizer_name, token=config.get('huggingface_token') or None)
+report = preprocess_jsonl(input_path, output_dir, tokenizer, max_length, validation_ratio, args.salt,
+                          drop_over_length=not args.keep_over_length)
+
+lengths = report['lengths']['all']
+print(f"  Rows: {report['input_rows']} in, {report['train_rows']} train, {report['validation_rows']} validation "
+      f"({report['actual_validation_ratio']} actual validation ratio)")
+if lengths:
+    print(f"  Tokens per dialog: min {lengths['min']}, mean {lengths['mean']}, p50 {lengths['p50']}, "
+          f"p90 {lengths['p90']}, p99 {lengths['p99']}, max {lengths['max']}")
+if report['over_length_rows']:
+    action = "dropped" if report['over_length_dropped'] else "kept (will be truncated in training)"
+    rows = ', '.join(str(example['row']) for example in report['over_length_examples'])
+    print(f"  WARNING: {report['over_length_rows']} dialogs exceed {max_length} tokens and were {action}; rows: {rows}")
+if report['length_skew'] is not None and abs(report['length_skew'] - 1) > SKEW_TOLERANCE:
+    print(f"  WARNING: validation dialogs average {report['length_skew']:.2f}x the train length; "
+          f"try another --salt or a larger dataset")
+print(f"  Report written to {os.path.join(output_dir, REPORT_NAME)}")
+
+if not report['train_rows'] or not report['validation_rows']:
+    sys.exit("ERROR: train and validation splits must both contain dialogs")
+
+# The upload step sends train/ and validation/ as separate training channels
+config['local_input_data_path'] = output_dir
+
+with open("config.yaml", "w") as f:
+    yaml.dump(config, f)
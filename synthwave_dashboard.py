@@ -310,7 +310,8 @@ def update_config_for_usecase(usecase_path, custom_name=None):
     # Look for data files in all possible locations
     for path in search_paths:
         if os.path.exists(path):
-            data_files = glob.glob(f"{path}/*.jsonl")
+            # Partitioned or compressed datasets are addressed through their manifest
+            data_files = glob.glob(f"{path}/*.jsonl") + glob.glob(f"{path}/*.manifest.json")
             if data_files:
                 latest_file = max(data_files, key=os.path.getctime)
                 config["local_input_data_path"] = latest_file
@@ -517,11 +518,14 @@ with data_tab:
     col1, col2 = st.columns([1, 3])
     with col1:
         data_count = st.number_input("Data Count", min_value=10, max_value=2000, value=int(current_config.get('count_synthetic_data', 500)))
+        data_seed = st.number_input("Seed", min_value=0, value=int(current_config.get('synthetic_data_seed', 42)),
+                                    help="The same config, count and seed reuse the cached dataset instead of regenerating it")
     
     if st.button("🔄 Generate Synthetic Data", key="generate_data_btn"):
-        # Update count in config if needed
-        if data_count != int(current_config.get('count_synthetic_data', 500)):
+        # Update count and seed in config if needed
+        if data_count != int(current_config.get('count_synthetic_data', 500)) or data_seed != int(current_config.get('synthetic_data_seed', 42)):
             current_config['count_synthetic_data'] = data_count
+            current_config['synthetic_data_seed'] = data_seed
             save_config(current_config)
         
         # Use the specific data config file defined in config.yaml, not the main config.yaml
@@ -530,12 +534,27 @@ with data_tab:
         if not data_config_file:
             st.error("No data configuration file specified in config.yaml. Please set the data_config_file setting first.")
         else:
-            output, returncode, log_file = run_script("1. generate_synthetic_data.py", args=["--config", data_config_file])
+            # Seeded runs go through the dataset cache, so an unchanged config, count and seed reuse the last dataset
+            generate_args = ["--config", data_config_file, "--num-examples", str(data_count),
+                             "--seed", str(data_seed), "--use-cache"]
+            output, returncode, log_file = run_script("1. generate_synthetic_data.py", args=generate_args)
             if returncode == 0:
                 st.success("Data generation complete! Check the logs tab for details.")
             else:
                 st.error("Data generation failed. Check the logs for errors.")
 
+    st.divider()
+    st.header("Optional: Split & Check Token Lengths")
+    st.write("Split the data into train/validation files and catch dialogs longer than max_input_length before training.")
+
+    if st.button("✂️ Preprocess Data", key="preprocess_data_btn"):
+        output, returncode, log_file = run_script("preprocess_dataset.py")
+        if returncode == 0:
+            st.success("Preprocessing complete! Upload will send the train and validation splits.")
+            current_config = load_config()
+        else:
+            st.error("Preprocessing failed. Check the logs for errors.")
+
     st.divider()
     st.header("Step 2: Upload Data to S3")
     st.write("Upload the generated data to your S3 bucket for training.")
@@ -727,6 +746,12 @@ with model_tab:
     with col2:
         learning_rate = st.text_input("Learning Rate", value=str(current_config.get('learning_rate', '2e-5')))
     
+    preset_options = ["none", "fast-iterate", "max-throughput", "memory-lean"]
+    saved_preset = current_config.get('training_preset') or "none"
+    training_preset = st.selectbox("Performance Preset", preset_options,
+                                   index=preset_options.index(saved_preset) if saved_preset in preset_options else 0,
+                                   help="Sets batch size, FSDP, workers, LoRA targets, context length and instance type together")
+    
     if st.button("🤖 Start Fine-tuning", key="start_finetuning_btn"):
         # Update parameters in config if changed
         if epochs != int(current_config.get('epochs', 3)) or learning_rate != str(current_config.get('learning_rate', '2e-5')):
@@ -734,11 +759,15 @@ with model_tab:
             current_config['learning_rate'] = learning_rate
             save_config(current_config)
         
-        output, returncode, log_file = run_script("3. finetune_llm.py")
+        output, returncode, log_file = run_script("3. finetune_llm.py", args=["--preset", training_preset])
         if returncode == 0:
             st.success("Fine-tuning job submitted successfully!")
             # Reload config to show updated values
             current_config = load_config()
+            last_run = current_config.get('last_training_run') or {}
+            if last_run.get('billable_seconds_per_example'):
+                st.info(f"{last_run['billable_seconds_per_example']} billable seconds per example "
+                        f"on {last_run['instance_type']} (preset: {last_run['preset'] or 'none'})")
         else:
             st.error("Fine-tuning submission failed. Check the logs for errors.")
     
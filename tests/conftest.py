@@ -0,0 +1,51 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The workflow scripts run from the repository root; make its packages importable the same way
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def generator_module():
+    """The '1. generate_synthetic_data.py' script, loaded as a module."""
+    spec = importlib.util.spec_from_file_location('generate_synthetic_data',
+                                                  os.path.join(ROOT, '1. generate_synthetic_data.py'))
+    module = importlib.util.module_from_spec(spec)
+    # Registered under its name so shard workers can unpickle _generate_shard
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def make_generator(generator_module):
+    """
+    Build a seeded EnhancedDataGenerator with a fixed clock and no on-disk Faker pool cache.
+
+    config is a file under data_gen_configs/ or the path of a config a test wrote.
+    """
+    def make(config='patient_care_plan.yaml', seed=7, **options):
+        return generator_module.EnhancedDataGenerator(os.path.join(ROOT, 'data_gen_configs', config), seed=seed,
+                                                      reference_time='2026-01-01T00:00:00', faker_pool_cache=None,
+                                                      **options)
+    return make
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run from an empty directory holding the config.yaml the scripts read and update."""
+    (tmp_path / 'config.yaml').write_text('{}\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def small_seed_blocks(generator_module, monkeypatch):
+    """Shrink EXAMPLE_SEED_BLOCK so sharded runs split small datasets; forked workers see it too."""
+    monkeypatch.setattr(generator_module, 'EXAMPLE_SEED_BLOCK', 40)
+    return 40
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+
+def interrupted_at(module, monkeypatch, stop_index):
+    """Make example `stop_index` abort the run as a crash would."""
+    original = module.EnhancedDataGenerator.try_training_example
+
+    def crash(self, entity_data, index, stop):
+        if index == stop_index:
+            raise KeyboardInterrupt
+        return original(self, entity_data, index, stop)
+
+    monkeypatch.setattr(module.EnhancedDataGenerator, 'try_training_example', crash)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_resume_after_a_crash_is_byte_identical(generator_module, make_generator, workdir, small_seed_blocks,
+                                                monkeypatch, workers):
+    num_examples = 2 * small_seed_blocks + 15
+
+    def run(path, resume=False):
+        generator = make_generator()
+        generator.checkpoint_every = 10
+        if workers > 1:
+            return generator.generate_dataset_sharded(num_examples, workers, str(path), resume)
+        return generator.generate_to_file(num_examples, str(path), resume)
+
+    expected = open(run(workdir / 'uninterrupted.jsonl'), 'rb').read()
+    with monkeypatch.context() as patch:
+        # In a sharded run the crash hits the second shard; the first one finishes
+        interrupted_at(generator_module, patch, small_seed_blocks + 17 if workers > 1 else 57)
+        with pytest.raises(BaseException):
+            run(workdir / 'resumed.jsonl')
+    assert os.path.exists(workdir / 'resumed.jsonl.checkpoint.json')
+
+    resumed = run(workdir / 'resumed.jsonl', resume=True)
+    assert open(resumed, 'rb').read() == expected
+    assert not os.path.exists(workdir / 'resumed.jsonl.checkpoint.json')
+
+
+def test_resume_refuses_a_different_run(generator_module, make_generator, workdir, monkeypatch):
+    with monkeypatch.context() as patch:
+        interrupted_at(generator_module, patch, 25)
+        with pytest.raises(KeyboardInterrupt):
+            make_generator().generate_to_file(40, str(workdir / 'run.jsonl'))
+    with pytest.raises(ValueError, match='num_examples'):
+        make_generator().generate_to_file(50, str(workdir / 'run.jsonl'), resume=True)
+
+
+def test_resume_of_a_one_block_multi_worker_run_continues_it(generator_module, make_generator, workdir, monkeypatch):
+    config_path = make_generator().config_path
+    argv = ['generate', '--config', config_path, '--seed', '7', '--num-examples', '60', '--workers', '3',
+            '--checkpoint-every', '10', '--reference-time', '2026-01-01T00:00:00']
+    monkeypatch.setattr('sys.argv', argv + ['--output', str(workdir / 'uninterrupted.jsonl')])
+    assert generator_module.main() == 0
+    with monkeypatch.context() as patch:
+        interrupted_at(generator_module, patch, 35)
+        patch.setattr('sys.argv', argv + ['--output', str(workdir / 'resumed.jsonl')])
+        with pytest.raises(KeyboardInterrupt):
+            generator_module.main()
+
+    monkeypatch.setattr('sys.argv', ['generate', '--config', config_path, '--resume',
+                                     '--output', str(workdir / 'resumed.jsonl')])
+    assert generator_module.main() == 0
+    assert (workdir / 'resumed.jsonl').read_bytes() == (workdir / 'uninterrupted.jsonl').read_bytes()
+    assert not list(workdir.glob('*.part*'))
+
+
+def test_leftover_shards_block_resume_and_go_with_a_fresh_run(generator_module, make_generator, workdir,
+                                                              small_seed_blocks, monkeypatch):
+    output_path = str(workdir / 'run.jsonl')
+    with monkeypatch.context() as patch:
+        interrupted_at(generator_module, patch, small_seed_blocks + 5)
+        generator = make_generator()
+        generator.checkpoint_every = 10
+        with pytest.raises(BaseException):
+            generator.generate_dataset_sharded(2 * small_seed_blocks, 2, output_path)
+    assert generator_module.shard_files(output_path)
+
+    generator = make_generator()
+    generator.checkpoint_every = 10
+    with pytest.raises(ValueError, match='sharded run'):
+        generator.generate_to_file(2 * small_seed_blocks, output_path, resume=True)
+    make_generator().generate_to_file(2 * small_seed_blocks, output_path)
+    assert not generator_module.shard_files(output_path)
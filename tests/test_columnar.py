@@ -0,0 +1,21 @@
+import contextlib
+import io
+
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def word_lists(make_generator, columnar, size=1000):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pools = make_generator('airline_logistics_shipping.yaml', seed=5, columnar=columnar).build_entity_pools(size)
+    return [record['handling_codes'] for record in pools['AirCargoShipment']]
+
+
+def test_columnar_word_lists_draw_fresh_words_like_the_scalar_path(make_generator):
+    scalar, columnar = (word_lists(make_generator, mode) for mode in (False, True))
+    scalar_words = {word for words in scalar for word in words}
+    columnar_words = {word for words in columnar for word in words}
+    assert max(map(len, columnar)) <= 20
+    # A vocabulary fixed per run would cap this at a few hundred words
+    assert len(columnar_words) > 0.8 * len(scalar_words)
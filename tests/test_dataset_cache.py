@@ -0,0 +1,40 @@
+import os
+
+from workflow_utils.dataset_cache import DatasetCache
+
+
+def cached_dataset(tmp_path):
+    dataset = tmp_path / 'dataset.jsonl'
+    dataset.write_text('{"dialog": []}\n', encoding='utf-8')
+    cache = DatasetCache(str(tmp_path))
+    cache.register('key', str(dataset), [str(dataset)], {'seed': 1, 'num_examples': 1})
+    return cache, dataset
+
+
+def test_unchanged_dataset_is_a_hit(tmp_path):
+    cache, dataset = cached_dataset(tmp_path)
+    assert DatasetCache(str(tmp_path)).lookup('key')['dataset_path'] == str(dataset)
+
+
+def test_grown_dataset_is_a_miss(tmp_path):
+    cache, dataset = cached_dataset(tmp_path)
+    with open(dataset, 'a', encoding='utf-8') as f:
+        f.write('{"dialog": []}\n')
+    assert cache.lookup('key') is None
+    assert 'key' not in DatasetCache(str(tmp_path)).entries
+
+
+def test_dataset_edited_in_place_is_a_miss(tmp_path):
+    cache, dataset = cached_dataset(tmp_path)
+    dataset.write_text('{"dialog": {}}\n', encoding='utf-8')
+    stat = os.stat(dataset)
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.lookup('key') is None
+
+
+def test_invalidate_drops_entries_holding_the_file(tmp_path):
+    cache, dataset = cached_dataset(tmp_path)
+    assert cache.invalidate(str(tmp_path / 'other.jsonl')) == 0
+    assert cache.invalidate(str(dataset)) == 1
+    assert DatasetCache(str(tmp_path)).lookup('key') is None
+    assert dataset.exists()
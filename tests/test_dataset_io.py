@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from workflow_utils import dataset_io
+from workflow_utils.dataset_io import JsonlWriter, get_serializer
+
+RECORDS = [
+    {'dialog': [{'role': 'user', 'content': 'Héllo, "world": 日本'}], 'metadata': {'id': 'C00000001'}},
+    {'score': 1e-05, 'big': 1e16, 'count': 3, 'ok': True, 'missing': None},
+]
+
+
+def legacy_line(record):
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def test_default_serializer_keeps_legacy_format(tmp_path):
+    path = tmp_path / 'out.jsonl'
+    with JsonlWriter(str(path)) as writer:
+        for record in RECORDS:
+            writer.write(record)
+    assert path.read_text(encoding='utf-8') == ''.join(legacy_line(record) for record in RECORDS)
+
+
+def test_auto_prefers_orjson(monkeypatch):
+    expected = 'json' if dataset_io.orjson is None else 'orjson'
+    assert get_serializer('auto')[0] == expected
+    monkeypatch.setattr(dataset_io, 'orjson', None)
+    assert get_serializer('auto')[0] == 'json'
+
+
+def test_orjson_without_the_package_is_an_error(monkeypatch):
+    monkeypatch.setattr(dataset_io, 'orjson', None)
+    with pytest.raises(ValueError):
+        get_serializer('orjson')
+
+
+MIXED_RECORDS = RECORDS + [
+    {'text': 'quote " backslash \\ slash / tab \t newline \n nul \x00 bell \x07 del \x7f',
+     'unicode': 'café — 日本語 🎉 \u2028 \u2029 \ud7ff', 'empty': '', 'colon, comma': 'a: b, c'},
+    {'floats': [0.1, -0.0, 1.5, 1e22, 1e-07, 123456789.125, 2.5e-300, 1.7976931348623157e308, -3.0]},
+    {'ints': [0, -1, 2 ** 63 - 1, -2 ** 63], 'nested': {'list': [[], {}, [None, False]]}, 'bool': False},
+    {'special': [float('nan'), float('inf'), -float('inf')]},
+    {'big': 2 ** 64, 'keys': {1: 'a', 2.5: 'b', None: 'c'}},
+    ['top-level', '  indented', ' , : '], 'plain string', 42, 0.00001, None,
+]
+
+
+def test_orjson_writes_the_same_bytes_as_the_standard_library():
+    pytest.importorskip('orjson')
+    name, dumps = get_serializer('orjson')
+    assert name == 'orjson'
+    for record in MIXED_RECORDS:
+        assert dumps(record) == legacy_line(record)[:-1].encode('utf-8')
+    expected = ''.join(map(legacy_line, MIXED_RECORDS)).encode('utf-8')
+    assert dataset_io.encode_batch(MIXED_RECORDS, dumps) == expected
+
+
+@pytest.mark.parametrize('serializer', ['orjson', 'auto'])
+def test_writer_output_does_not_depend_on_the_serializer(tmp_path, serializer):
+    paths = {}
+    for name in ('json', serializer):
+        paths[name] = tmp_path / f'{name}.jsonl'
+        with JsonlWriter(str(paths[name]), chunk_size=3, serializer=name) as writer:
+            for record in MIXED_RECORDS * 5:
+                writer.write(record)
+    assert paths[serializer].read_bytes() == paths['json'].read_bytes()
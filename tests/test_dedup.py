@@ -0,0 +1,70 @@
+import random
+import time
+
+from workflow_utils import dedup
+from workflow_utils.dedup import Deduplicator
+
+
+def example(words, system='You are a helpful assistant.'):
+    return {'dialog': [{'role': 'system', 'content': system}, {'role': 'user', 'content': ' '.join(words)}]}
+
+
+def test_exact_duplicates_include_the_system_prompt():
+    words = ['care', 'plan', 'for', 'the', 'patient']
+    with Deduplicator(store_path=':memory:') as deduplicator:
+        assert not deduplicator.is_duplicate(example(words))
+        assert deduplicator.is_duplicate(example(words))
+        assert deduplicator.is_duplicate(example(words, system='Another prompt.'))
+        assert (deduplicator.exact_duplicates, deduplicator.near_duplicates) == (1, 1)
+
+
+def test_near_duplicate_found_behind_many_older_candidates():
+    rng = random.Random(5)
+    base = [f"w{rng.randrange(10 ** 6)}" for _ in range(200)]
+    # Older rows that share LSH buckets with base but stay below the threshold
+    decoys = []
+    for decoy in range(40):
+        words = list(base)
+        for position in rng.sample(range(len(words)), 10):
+            words[position] = f"d{decoy}_{position}"
+        decoys.append(words)
+    near_copy = list(base)
+    near_copy[100] = 'changed'
+
+    with Deduplicator(threshold=0.9, store_path=':memory:') as deduplicator:
+        assert not any(deduplicator.is_duplicate(example(words)) for words in decoys)
+        assert not deduplicator.is_duplicate(example(base))
+        assert deduplicator.is_duplicate(example(near_copy))
+        assert deduplicator.near_duplicates == 1
+
+
+def templated_examples(count):
+    """Dialogs that differ only in a short user turn and share one long assistant reply."""
+    rng = random.Random(3)
+    reply = ' '.join(f"step{i}" for i in range(120))
+    for index in range(count):
+        yield {'dialog': [{'role': 'user', 'content': f"Plan {index} for code {rng.randrange(10 ** 6)}"},
+                          {'role': 'assistant', 'content': reply}]}
+
+
+def test_templated_rows_keep_buckets_bounded():
+    with Deduplicator(store_path=':memory:') as deduplicator:
+        kept = sum(1 for _ in deduplicator.filter(templated_examples(1500)))
+        (largest,) = deduplicator._db.execute(
+            "SELECT MAX(size) FROM (SELECT COUNT(*) AS size FROM bands GROUP BY band, bucket)").fetchone()
+    assert kept > dedup._MAX_BUCKET_ROWS
+    assert largest == dedup._MAX_BUCKET_ROWS
+
+
+def test_cost_per_row_stays_flat_on_templated_rows():
+    block = 800
+    timings = []
+    with Deduplicator(store_path=':memory:') as deduplicator:
+        examples = templated_examples(3 * block)
+        for _ in range(3):
+            start = time.perf_counter()
+            for _, example in zip(range(block), examples):
+                deduplicator.is_duplicate(example)
+            timings.append(time.perf_counter() - start)
+    # With unbounded buckets the last block is almost four times slower than the first
+    assert timings[2] < 2.5 * timings[0]
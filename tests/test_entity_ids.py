@@ -0,0 +1,69 @@
+import os
+import random
+import uuid
+from datetime import datetime
+
+import pytest
+import yaml
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG = os.path.join(ROOT, 'data_gen_configs', 'patient_care_plan.yaml')
+
+
+def config_with_strategy(tmp_path, strategy):
+    with open(CONFIG, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    for entity in config['entities']:
+        for attribute in entity['attributes']:
+            if attribute['type'] == 'id':
+                attribute['id_strategy'] = strategy
+    path = tmp_path / f"{strategy}.yaml"
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return str(path)
+
+
+def shard_ids(module, make_generator, config_path, shard_index, lazy=False):
+    """Entity IDs as a shard worker sees them, keyed by entity."""
+    generator = make_generator(config_path, seed=11, lazy_entities=lazy)
+    pools = generator.build_entity_pools(50)
+    generator.reseed(module.derive_seed(11, 'examples', shard_index))
+    # Lazy pools are sampled in a different order by each shard
+    order = list(range(50)) if shard_index % 2 == 0 else list(reversed(range(50)))
+    ids = {}
+    for entity in generator.config['entities']:
+        id_field = generator.primary_id_field(entity)
+        pool = pools[entity['name']]
+        ids[entity['name']] = {index: pool[index][id_field] for index in order}
+    return ids
+
+
+@pytest.mark.parametrize('strategy', ['random', 'counter', 'feistel', 'uuid7'])
+@pytest.mark.parametrize('lazy', [False, True])
+def test_ids_agree_and_stay_unique_across_shards(generator_module, make_generator, tmp_path, strategy, lazy):
+    config_path = config_with_strategy(tmp_path, strategy)
+    first, second = (shard_ids(generator_module, make_generator, config_path, shard, lazy) for shard in (0, 1))
+    assert first == second
+    for ids in first.values():
+        assert len(set(ids.values())) == len(ids)
+
+
+def test_shards_report_the_same_id_digest(make_generator, tmp_path):
+    config_path = config_with_strategy(tmp_path, 'feistel')
+    digests = set()
+    for shard_index in range(2):
+        generator = make_generator(config_path, seed=11)
+        digests.add(generator.entity_ids_digest(generator.build_entity_pools(50)))
+    assert len(digests) == 1
+
+
+@pytest.mark.parametrize('prefix', ['', 'P'])
+def test_indexed_random_ids_keep_the_random_shape_and_never_repeat(generator_module, prefix):
+    sequence = generator_module.IdSequence('random', random.Random(0), datetime(2026, 1, 1), prefix, key=7)
+    ids = [sequence.next_id() for _ in range(20000)]
+    assert len(set(ids)) == len(ids)
+    sequence.seek(123)
+    assert sequence.next_id() == ids[123]
+    if prefix:
+        assert all(len(value) == len(prefix) + 8 and value.startswith(prefix) for value in ids)
+    else:
+        assert all(uuid.UUID(value).version == 4 for value in ids)
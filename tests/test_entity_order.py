@@ -0,0 +1,44 @@
+import pytest
+
+SHOP_CONFIG = """
+domain_name: shop
+entities:
+  - name: Order
+    attributes:
+      - {name: order_id, type: id, prefix: O}
+      - {name: customer_id, type: string}
+  - name: Customer
+    attributes:
+      - {name: customer_id, type: id, prefix: C}
+      - {name: first_name, type: first_name}
+fine_tuning_task:
+  user_template: 'Order {order_id} for {first_name}'
+relationships:
+"""
+
+
+def shop_config(tmp_path, relationships):
+    path = tmp_path / 'shop.yaml'
+    path.write_text(SHOP_CONFIG + relationships, encoding='utf-8')
+    return path
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_parents_are_generated_first_and_children_reference_them(make_generator, tmp_path, columnar):
+    if columnar:
+        pytest.importorskip('numpy')
+    generator = make_generator(shop_config(tmp_path, "  - {from: Customer, to: Order}\n"), columnar=columnar)
+    assert [entity['name'] for entity in generator.entity_generation_order()] == ['Customer', 'Order']
+
+    pools = generator.generate_related_entities(100)
+    customer_ids = {customer['customer_id'] for customer in pools['Customer']}
+    assert list(pools) == ['Order', 'Customer']
+    assert all(order['customer_id'] in customer_ids for order in pools['Order'])
+
+
+def test_relationship_cycles_fall_back_to_yaml_order(make_generator, tmp_path):
+    generator = make_generator(shop_config(tmp_path, "  - {from: Customer, to: Order}\n"
+                                                     "  - {from: Order, to: Customer}\n"))
+    assert [entity['name'] for entity in generator.entity_generation_order()] == ['Order', 'Customer']
+    pools = generator.generate_related_entities(20)
+    assert len(pools['Order']) == len(pools['Customer']) == 20
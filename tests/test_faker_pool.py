@@ -0,0 +1,65 @@
+import random
+
+from faker import Faker
+
+
+def make_name(fake):
+    return fake.name()
+
+
+def test_pool_is_cached_on_disk_and_reloaded(generator_module, tmp_path):
+    first = generator_module.FakerValuePool(50, seed=3, cache_dir=str(tmp_path))
+    values = list(first.get_pool('full_name', make_name))
+    second = generator_module.FakerValuePool(50, seed=3, cache_dir=str(tmp_path))
+
+    assert second.get_pool('full_name', make_name) == values
+    assert (first.cache_misses, second.cache_hits) == (1, 1)
+    assert generator_module.FakerValuePool(50, seed=4, cache_dir=None).get_pool('full_name', make_name) != values
+
+
+def test_full_reuse_only_draws_pooled_values(generator_module):
+    pool = generator_module.FakerValuePool(20, reuse_ratio=1.0, seed=3, cache_dir=None)
+    sample = pool.sampler('full_name', make_name, Faker(), random.Random(0))
+    pooled = set(pool.pools['full_name'])
+    assert {sample({}) for _ in range(500)} <= pooled
+
+
+def test_fresh_values_replace_the_least_recently_used(generator_module):
+    pool = generator_module.FakerValuePool(20, reuse_ratio=0.0, seed=3, cache_dir=None)
+    original = list(pool.get_pool('full_name', make_name))
+    sample = pool.sampler('full_name', make_name, Faker(), random.Random(0))
+    fresh = [sample({}) for _ in range(5)]
+
+    assert pool.pools['full_name'][:5] == fresh
+    assert pool.pools['full_name'][5:] == original[5:]
+
+
+def test_generator_draws_names_from_the_pool(make_generator, tmp_path):
+    config = tmp_path / 'people.yaml'
+    config.write_text(
+        "domain_name: people\n"
+        "entities:\n"
+        "  - name: Person\n"
+        "    attributes:\n"
+        "      - {name: person_id, type: id, prefix: P}\n"
+        "      - {name: full_name, type: full_name}\n"
+        "fine_tuning_task:\n"
+        "  user_template: 'Who is {full_name}?'\n",
+        encoding='utf-8')
+    generator = make_generator(config, faker_pool_size=10)
+    people = generator.generate_related_entities(200)['Person']
+    pooled = set(generator.field_generator.value_pool.pools['full_name'])
+    assert {person['full_name'] for person in people} <= pooled
+
+
+def test_lazy_records_do_not_depend_on_access_order(make_generator):
+    options = {'lazy_entities': True, 'entity_cache_size': 3, 'faker_pool_size': 5, 'faker_reuse_ratio': 0.5}
+    in_order = make_generator(**options).build_entity_pools(40)
+    expected = {name: [pool[index] for index in range(len(pool))] for name, pool in in_order.items()}
+
+    shuffled = make_generator(**options).build_entity_pools(40)
+    order = list(range(40)) * 2
+    random.Random(5).shuffle(order)
+    for name, pool in shuffled.items():
+        assert [pool[index] for index in order] == [expected[name][index] for index in order]
+    assert any(pool.materialized > 40 for pool in shuffled.values())
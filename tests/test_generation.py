@@ -0,0 +1,56 @@
+from datetime import datetime
+
+import pytest
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_preview_builds_the_pools_a_real_run_would(generator_module, make_generator, monkeypatch, capsys, lazy):
+    calls = []
+    original = generator_module.EnhancedDataGenerator.generate_lazy_entities
+
+    def spy(self, num_records):
+        calls.append(num_records)
+        return original(self, num_records)
+
+    monkeypatch.setattr(generator_module.EnhancedDataGenerator, 'generate_lazy_entities', spy)
+    argv = ['generate', '--config', make_generator().config_path, '--preview', '--seed', '1']
+    monkeypatch.setattr('sys.argv', argv + (['--lazy-entities'] if lazy else []))
+
+    assert generator_module.main() == 0
+    assert bool(calls) == lazy
+    assert '"dialog"' in capsys.readouterr().out
+
+
+def test_compiled_plans_match_per_field_generation(generator_module, make_generator):
+    compiled = generator_module.AdvancedFieldGenerator(3, reference_time=datetime(2026, 1, 1))
+    reference = generator_module.AdvancedFieldGenerator(3, reference_time=datetime(2026, 1, 1))
+    for entity in make_generator().config['entities']:
+        plan = compiled.compile_attributes(entity['attributes'])
+        for _ in range(20):
+            expected = {attribute['name']: reference.generate_field_value(attribute, {})
+                        for attribute in entity['attributes']}
+            assert {name: generate({}) for name, generate in plan} == expected
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_sharded_output_matches_a_single_worker(make_generator, workdir, small_seed_blocks, workers):
+    num_examples = 2 * small_seed_blocks + 25
+    single = make_generator().generate_to_file(num_examples, str(workdir / 'single.jsonl'))
+    sharded = make_generator().generate_dataset_sharded(num_examples, workers, str(workdir / 'sharded.jsonl'))
+    assert open(sharded, 'rb').read() == open(single, 'rb').read()
+    assert not list(workdir.glob('*.part*'))
+
+
+def test_shard_outputs_concatenate_in_order(generator_module, make_generator, workdir, small_seed_blocks):
+    num_examples = small_seed_blocks + 25
+    generator = make_generator()
+    shard_bytes = []
+    for shard_index, (start, count) in enumerate([(0, small_seed_blocks), (small_seed_blocks, 25)]):
+        shard_path = str(workdir / f"shard{shard_index}.jsonl")
+        _, stats = generator_module._generate_shard(generator.config_path, shard_index, start, count, 7,
+                                                    max(num_examples // 2, 10), shard_path,
+                                                    generator.generator_options())
+        assert stats['total_records'] == count
+        shard_bytes.append(open(shard_path, 'rb').read())
+    merged = make_generator().generate_dataset_sharded(num_examples, 2, str(workdir / 'merged.jsonl'))
+    assert open(merged, 'rb').read() == b''.join(shard_bytes)
@@ -0,0 +1,54 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import generation_benchmark  # noqa: E402
+
+OPTIONS = {'seed': 1, 'columnar': False, 'lazy_entities': False, 'faker_pool_size': 0, 'serializer': 'json'}
+
+
+@pytest.fixture(autouse=True)
+def keep_generator_module(monkeypatch):
+    # run_case loads its own copy of the generator; put back the copy other tests registered
+    monkeypatch.delitem(sys.modules, 'generate_synthetic_data', raising=False)
+
+
+def case(examples_per_sec, peak_rss_mb, config='a.yaml', size=100):
+    return {'config': config, 'size': size, 'examples_per_sec': examples_per_sec, 'peak_rss_mb': peak_rss_mb}
+
+
+def test_run_case_reports_throughput_and_phases():
+    config_path = os.path.join(ROOT, 'data_gen_configs', 'patient_care_plan.yaml')
+    result = generation_benchmark.run_case(config_path, 30, OPTIONS)
+
+    assert (result['config'], result['size'], result['examples']) == ('patient_care_plan.yaml', 30, 30)
+    assert set(result['phases']) == {'setup', 'entity_generation', 'example_assembly', 'serialization'}
+    assert result['examples_per_sec'] > 0 and result['bytes'] > 0 and result['peak_rss_mb'] > 0
+
+
+def test_baseline_comparison_flags_only_regressions_past_the_threshold():
+    baseline = {'results': [case(100.0, 200.0), case(100.0, 200.0, size=1000)]}
+    results = {'results': [case(90.0, 220.0), case(80.0, 240.0, size=1000), case(1.0, 1.0, config='new.yaml')]}
+
+    regressions = generation_benchmark.compare_with_baseline(results, baseline, 0.15)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith('a.yaml @ 1000') for regression in regressions)
+
+
+def test_main_fails_against_a_faster_baseline(tmp_path, monkeypatch):
+    output = tmp_path / 'bench.json'
+    argv = ['generation_benchmark.py', '--sizes', '20', '--configs', 'patient_care_plan.yaml', '--output', str(output)]
+    monkeypatch.setattr('sys.argv', argv)
+    assert generation_benchmark.main() == 0
+
+    baseline = json.loads(output.read_text(encoding='utf-8'))
+    baseline['results'][0]['examples_per_sec'] *= 100
+    (tmp_path / 'baseline.json').write_text(json.dumps(baseline), encoding='utf-8')
+    monkeypatch.setattr('sys.argv', argv + ['--baseline', str(tmp_path / 'baseline.json')])
+    assert generation_benchmark.main() == 1
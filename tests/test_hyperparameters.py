@@ -0,0 +1,141 @@
+import pytest
+
+from workflow_utils import hyperparameters
+from workflow_utils.hyperparameters import coerce, jumpstart_hyperparameters, load_overrides, resolve_hyperparameters
+
+
+def test_defaults_when_nothing_is_configured():
+    values, sources = resolve_hyperparameters({})
+    assert values == {name: spec[1] for name, spec in hyperparameters.HYPERPARAMETER_SPECS.items()}
+    assert set(sources.values()) == {'default'}
+
+
+def test_later_layers_win_and_record_their_source():
+    config = {'epochs': 5, 'learning_rate': '2e-5', 'batch_size': 4, 'lora_r': 8, 'validation_split': ''}
+    preset = {'per_device_train_batch_size': 8, 'enable_fsdp': True}
+    overrides = {'lora_r': 32, 'enable_fsdp': 'false'}
+    values, sources = resolve_hyperparameters(config, overrides, 'finetune_configs/demo.yaml', preset, 'preset:demo')
+
+    assert values['epoch'] == 5 and sources['epoch'] == 'config.yaml:epochs'
+    assert values['learning_rate'] == 2e-5
+    assert values['per_device_train_batch_size'] == 8 and sources['per_device_train_batch_size'] == 'preset:demo'
+    assert values['enable_fsdp'] is False and sources['enable_fsdp'] == 'finetune_configs/demo.yaml'
+    assert values['lora_r'] == 32 and sources['lora_r'] == 'finetune_configs/demo.yaml'
+    # Empty config settings keep the default
+    assert values['validation_split_ratio'] == 0.2 and sources['validation_split_ratio'] == 'default'
+
+
+def test_overrides_accept_config_names():
+    values, sources = resolve_hyperparameters({}, {'epochs': '2'}, 'overrides.yaml')
+    assert values['epoch'] == 2 and sources['epoch'] == 'overrides.yaml'
+
+
+@pytest.mark.parametrize('name, value, expected', [
+    ('epoch', '3', 3),
+    ('learning_rate', '1e-4', 1e-4),
+    ('enable_fsdp', 'True', True),
+    ('target_modules', ' q_proj,v_proj ', 'q_proj,v_proj'),
+])
+def test_coerce_converts_dashboard_strings(name, value, expected):
+    assert coerce(name, value) == expected
+
+
+@pytest.mark.parametrize('name, value', [
+    ('epoch', 0),
+    ('epoch', 2.5),
+    ('epoch', True),
+    ('learning_rate', 'fast'),
+    ('enable_fsdp', 'yes'),
+    ('lora_dropout', 1.0),
+    ('validation_split_ratio', 0),
+    ('target_modules', ''),
+])
+def test_coerce_rejects_bad_values(name, value):
+    with pytest.raises(ValueError, match=name):
+        coerce(name, value)
+
+
+def test_every_error_is_reported_at_once():
+    with pytest.raises(ValueError) as error:
+        resolve_hyperparameters({'epochs': -1}, {'lora_alfa': 8}, 'overrides.yaml')
+    message = str(error.value)
+    assert 'epoch: must be positive' in message and '(from config.yaml:epochs)' in message
+    assert 'lora_alfa: unknown hyperparameter (from overrides.yaml)' in message
+
+
+def test_load_overrides(tmp_path):
+    assert load_overrides(str(tmp_path / 'missing.yaml')) == {}
+    path = tmp_path / 'demo.yaml'
+    path.write_text('lora_r: 32\nepochs: 2\n', encoding='utf-8')
+    assert load_overrides(str(path)) == {'lora_r': 32, 'epochs': 2}
+    path.write_text('- lora_r\n', encoding='utf-8')
+    with pytest.raises(ValueError, match='mapping'):
+        load_overrides(str(path))
+
+
+def test_jumpstart_values_are_strings():
+    values, _ = resolve_hyperparameters({})
+    jumpstart = jumpstart_hyperparameters('meta-textgeneration-llama-3-1-8b', values)
+    assert jumpstart['model_name'] == 'meta-textgeneration-llama-3-1-8b'
+    assert jumpstart['enable_fsdp'] == 'False' and jumpstart['learning_rate'] == '1e-05'
+    assert all(isinstance(value, str) for value in jumpstart.values())
+
+
+TOKEN_LENGTHS = {'p50': 400, 'p95': 700, 'p99': 900, 'max': 1500}
+
+
+def test_preset_without_a_token_report_keeps_the_context_length():
+    values, instance_type = hyperparameters.preset_settings('fast-iterate')
+    assert instance_type == 'ml.g5.2xlarge'
+    assert values == {
+        'per_device_train_batch_size': 4,
+        'gradient_accumulation_steps': 2,
+        'enable_fsdp': False,
+        'preprocessing_num_workers': 4,
+        'num_workers_dataloader': 2,
+        'target_modules': 'q_proj,v_proj',
+        'max_input_length': 2048,
+    }
+
+
+@pytest.mark.parametrize('name, max_input_length, batch_size, accumulation', [
+    ('fast-iterate', 704, 8, 1),
+    ('memory-lean', 960, 2, 4),
+])
+def test_preset_sizes_the_context_from_its_length_percentile(name, max_input_length, batch_size, accumulation):
+    values, _ = hyperparameters.preset_settings(name, token_lengths=TOKEN_LENGTHS)
+    assert values['max_input_length'] == max_input_length
+    assert max_input_length % hyperparameters.LENGTH_ALIGNMENT == 0
+    assert values['per_device_train_batch_size'] == batch_size
+    assert values['gradient_accumulation_steps'] == accumulation
+
+
+@pytest.mark.parametrize('limit', [2048, 4096])
+def test_preset_context_stays_within_the_callers_limit(limit):
+    token_lengths = {**TOKEN_LENGTHS, 'max': 100000}
+    values, _ = hyperparameters.preset_settings('max-throughput', token_lengths=token_lengths, max_input_length=limit)
+    assert values['max_input_length'] == limit
+    assert values['per_device_train_batch_size'] == 16384 // limit
+
+
+def test_preset_keeps_enough_steps_on_small_datasets():
+    values, instance_type = hyperparameters.preset_settings('max-throughput', 200, TOKEN_LENGTHS)
+    assert instance_type == 'ml.g5.12xlarge'
+    assert values['max_input_length'] == 1536 and values['enable_fsdp'] is True
+    effective_batch_size = values['per_device_train_batch_size'] * values['gradient_accumulation_steps'] * 4
+    assert 200 // effective_batch_size >= hyperparameters.MIN_STEPS_PER_EPOCH
+    assert values['preprocessing_num_workers'] == 2
+
+
+@pytest.mark.parametrize('name', list(hyperparameters.PRESETS))
+@pytest.mark.parametrize('dataset_rows', [None, 5, 50000])
+def test_every_preset_resolves_to_valid_hyperparameters(name, dataset_rows):
+    preset, _ = hyperparameters.preset_settings(name, dataset_rows, TOKEN_LENGTHS)
+    values, sources = resolve_hyperparameters({'batch_size': 2}, preset=preset, preset_source=f"preset:{name}")
+    assert values['per_device_train_batch_size'] == preset['per_device_train_batch_size']
+    assert sources['per_device_train_batch_size'] == f"preset:{name}"
+
+
+def test_unknown_preset_is_an_error():
+    with pytest.raises(ValueError, match='Unknown preset'):
+        hyperparameters.preset_settings('turbo')
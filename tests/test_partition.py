@@ -0,0 +1,76 @@
+import pytest
+
+from workflow_utils import dataset_io
+
+
+def write_rows(path, count):
+    lines = [b'{"row": %d}\n' % i for i in range(count)]
+    path.write_bytes(b''.join(lines))
+    return lines
+
+
+@pytest.mark.parametrize('compression', ['none', 'gzip', 'zstd'])
+def test_partition_splits_rows_and_reads_back_in_order(tmp_path, compression):
+    if not dataset_io.compression_available(compression):
+        pytest.skip(f'{compression} is not installed')
+    lines = write_rows(tmp_path / 'data.jsonl', 25)
+    manifest_path = dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'out'), 10, compression)
+
+    manifest = dataset_io.load_manifest(manifest_path)
+    assert manifest['compression'] == compression
+    assert manifest['total_rows'] == 25
+    assert [part['rows'] for part in manifest['parts']] == [10, 10, 5]
+    assert manifest['parts'][0]['path'] == 'out-00000.jsonl' + dataset_io.COMPRESSION_SUFFIXES[compression]
+    assert dataset_io.verify_manifest(manifest_path) == []
+    assert list(dataset_io.iter_jsonl_lines(manifest_path)) == lines
+
+
+def test_partition_is_reproducible(tmp_path):
+    write_rows(tmp_path / 'data.jsonl', 12)
+    (tmp_path / 'a').mkdir()
+    (tmp_path / 'b').mkdir()
+    first = dataset_io.load_manifest(dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'a' / 'out'), 5, 'gzip'))
+    second = dataset_io.load_manifest(dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'b' / 'out'), 5, 'gzip'))
+    assert [part['sha256'] for part in first['parts']] == [part['sha256'] for part in second['parts']]
+
+
+def test_single_part_when_rows_per_part_is_zero(tmp_path):
+    lines = write_rows(tmp_path / 'data.jsonl', 7)
+    manifest_path = dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'out'))
+    assert [part['rows'] for part in dataset_io.load_manifest(manifest_path)['parts']] == [7]
+    assert (tmp_path / 'out-00000.jsonl').read_bytes() == b''.join(lines)
+
+
+def test_verify_manifest_reports_missing_and_corrupt_parts(tmp_path):
+    write_rows(tmp_path / 'data.jsonl', 9)
+    manifest_path = dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'out'), 3)
+    (tmp_path / 'out-00000.jsonl').unlink()
+    with open(tmp_path / 'out-00002.jsonl', 'ab') as f:
+        f.write(b'{"row": 99}\n')
+    assert dataset_io.verify_manifest(manifest_path) == [
+        'missing part out-00000.jsonl',
+        'checksum mismatch for out-00002.jsonl',
+    ]
+
+
+def test_decompress_file_restores_the_original_bytes(tmp_path):
+    lines = write_rows(tmp_path / 'data.jsonl', 4)
+    manifest_path = dataset_io.partition_jsonl(str(tmp_path / 'data.jsonl'), str(tmp_path / 'out'), 0, 'gzip')
+    part_path = dataset_io.manifest_part_paths(manifest_path)[0]
+    digest = dataset_io.decompress_file(part_path, str(tmp_path / 'restored.jsonl'))
+    assert (tmp_path / 'restored.jsonl').read_bytes() == b''.join(lines)
+    assert digest == dataset_io.file_sha256(str(tmp_path / 'data.jsonl'))
+
+
+def test_packaged_output_replaces_the_jsonl_with_parts_and_a_manifest(make_generator, workdir):
+    plain = make_generator().generate_to_file(30, str(workdir / 'plain.jsonl'))
+    generator = make_generator()
+    generator.partition_rows, generator.compression = 12, 'gzip'
+    generator.generate_to_file(30, str(workdir / 'packaged.jsonl'))
+
+    manifest_path = generator.manifest_path
+    assert manifest_path == str(workdir / 'packaged.manifest.json')
+    assert not (workdir / 'packaged.jsonl').exists()
+    assert [part['rows'] for part in dataset_io.load_manifest(manifest_path)['parts']] == [12, 12, 6]
+    assert dataset_io.verify_manifest(manifest_path) == []
+    assert b''.join(dataset_io.iter_jsonl_lines(manifest_path)) == open(plain, 'rb').read()
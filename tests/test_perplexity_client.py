@@ -0,0 +1,96 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+httpx = pytest.importorskip('httpx')
+
+from data_generator_utils import perplexity_generates_data_config as perplexity
+
+RETRY_AFTER_SECONDS = 0.2
+
+
+class StubPerplexity(BaseHTTPRequestHandler):
+    """Answers 'flaky' prompts with one 429, 'down' prompts with 503, and everything else with a response."""
+
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = body['messages'][1]['content']
+        self.requests.append((time.monotonic(), prompt))
+        attempts = sum(1 for _, seen in self.requests if seen == prompt)
+        if prompt == 'down':
+            return self.reply(503, {'error': 'unavailable'})
+        if prompt == 'flaky' and attempts == 1:
+            return self.reply(429, {'error': 'rate limited'}, {'Retry-After': str(RETRY_AFTER_SECONDS)})
+        self.reply(200, {'choices': [{'message': {'content': f"answer to {prompt}"}}],
+                         'citations': ['https://example.org']})
+
+    def reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stub_url():
+    StubPerplexity.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPerplexity)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/chat/completions"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generator(stub_url, tmp_path, monkeypatch):
+    monkeypatch.setattr(perplexity, 'load_config', lambda: {'perplexity_api_key': 'test-key'})
+    return perplexity.EnhancedUseCaseGenerator(api_url=stub_url,
+                                               response_cache=perplexity.ResponseCache(str(tmp_path / 'cache')))
+
+
+def call(generator, prompt, **options):
+    async def run():
+        async with httpx.AsyncClient(timeout=10) as client:
+            return await generator.call_perplexity_api_async(client, prompt, 'healthcare',
+                                                             perplexity.TokenBucket(100, 10),
+                                                             backoff_base=0.01, backoff_cap=0.05, **options)
+    return asyncio.run(run())
+
+
+def test_rate_limited_request_is_retried_after_retry_after(generator):
+    content, citations = call(generator, 'flaky')
+
+    assert content == 'answer to flaky'
+    assert citations == ['https://example.org']
+    (first, _), (second, _) = StubPerplexity.requests
+    assert second - first >= RETRY_AFTER_SECONDS
+
+
+def test_persistent_server_errors_give_up_after_max_attempts(generator):
+    with pytest.raises(Exception, match='HTTP 503 after 3 attempts'):
+        call(generator, 'down', max_attempts=3)
+    assert len(StubPerplexity.requests) == 3
+
+
+def test_cached_response_skips_the_network(generator):
+    assert call(generator, 'stable')[0] == 'answer to stable'
+    assert call(generator, 'stable')[0] == 'answer to stable'
+    assert len(StubPerplexity.requests) == 1
+
+    # A retry after a rejected response bypasses the cache
+    call(generator, 'stable', use_cache=False)
+    assert len(StubPerplexity.requests) == 2
@@ -0,0 +1,84 @@
+import json
+import os
+
+from workflow_utils.preprocess import (REPORT_NAME, TRAIN_SPLIT, VALIDATION_SPLIT, StubTokenizer,
+                                       apply_llama31_chat_template, preprocess_jsonl, split_for,
+                                       training_dataset_path)
+from workflow_utils.token_stats import token_report_path
+
+MAX_LENGTH = 120
+
+
+def dialog(index, words=5):
+    return {'dialog': [
+        {'role': 'user', 'content': f"Question {index}: " + ' '.join(['plan'] * words)},
+        {'role': 'assistant', 'content': f"Answer {index}."},
+    ]}
+
+
+def write_dataset(path, examples):
+    path.write_text(''.join(json.dumps(example, ensure_ascii=False) + '\n' for example in examples), encoding='utf-8')
+
+
+def read_rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_stub_tokenizer_counts_each_non_ascii_character():
+    tokenizer = StubTokenizer()
+    assert len(tokenizer.encode('日本語のテキスト')) == 8
+    assert len(tokenizer.encode('plan')) == 1
+    assert len(tokenizer.encode('<|eot_id|>')) == 1
+
+
+def test_preprocess_splits_and_drops_over_length_rows(tmp_path):
+    examples = [dialog(i) for i in range(40)]
+    # Rows 11 and 31 (1-based) go over the limit, one in ASCII and one in CJK text
+    examples[10] = dialog(10, words=200)
+    examples[30] = {'dialog': [{'role': 'user', 'content': '長い質問' * 40}]}
+    input_path = tmp_path / 'dataset.jsonl'
+    write_dataset(input_path, examples)
+
+    tokenizer = StubTokenizer()
+    report = preprocess_jsonl(str(input_path), str(tmp_path / 'out'), tokenizer, MAX_LENGTH, validation_ratio=0.25)
+
+    kept = [example for example in examples
+            if len(tokenizer.encode(apply_llama31_chat_template(example['dialog']))) <= MAX_LENGTH]
+    expected_validation = [example for example in kept if split_for(example, 0.25) == VALIDATION_SPLIT]
+    train_rows = read_rows(report['files'][TRAIN_SPLIT])
+    validation_rows = read_rows(report['files'][VALIDATION_SPLIT])
+
+    assert report['input_rows'] == 40
+    assert report['over_length_rows'] == 2
+    assert [example['row'] for example in report['over_length_examples']] == [11, 31]
+    assert report['kept_rows'] == len(kept) == 38
+    assert validation_rows == expected_validation
+    assert len(train_rows) == report['train_rows'] == 38 - len(expected_validation)
+    assert report['validation_rows'] == len(expected_validation) > 0
+    assert examples[10] not in train_rows + validation_rows
+    assert json.loads((tmp_path / 'out' / REPORT_NAME).read_text(encoding='utf-8'))['kept_rows'] == 38
+
+
+def test_preprocess_can_keep_over_length_rows(tmp_path):
+    examples = [dialog(i) for i in range(10)] + [dialog(10, words=200)]
+    input_path = tmp_path / 'dataset.jsonl'
+    write_dataset(input_path, examples)
+
+    report = preprocess_jsonl(str(input_path), str(tmp_path / 'out'), StubTokenizer(), MAX_LENGTH,
+                              drop_over_length=False)
+
+    assert report['over_length_rows'] == 1
+    assert report['kept_rows'] == report['train_rows'] + report['validation_rows'] == 11
+
+
+def test_preprocessed_directory_resolves_to_its_train_split(tmp_path):
+    input_path = tmp_path / 'dataset.jsonl'
+    write_dataset(input_path, [dialog(i) for i in range(10)])
+    output_dir = tmp_path / 'dataset_preprocessed'
+    report = preprocess_jsonl(str(input_path), str(output_dir), StubTokenizer(), MAX_LENGTH)
+
+    assert training_dataset_path(str(output_dir)) == report['files'][TRAIN_SPLIT]
+    assert training_dataset_path(str(input_path)) == str(input_path)
+    assert token_report_path(training_dataset_path(str(output_dir))).endswith(
+        os.path.join('train', 'train_token_lengths.json'))
@@ -0,0 +1,36 @@
+import json
+
+
+def test_profile_records_a_timing_breakdown_without_changing_output(make_generator, workdir):
+    plain = make_generator().generate_to_file(30, str(workdir / 'plain.jsonl'))
+    generator = make_generator(profile=True)
+    profiled = generator.generate_to_file(30, str(workdir / 'profiled.jsonl'))
+    assert open(profiled, 'rb').read() == open(plain, 'rb').read()
+
+    profile = json.loads((workdir / 'profiled_metadata.json').read_text(encoding='utf-8'))['profile']
+    pool_size = 15
+    entities = generator.config['entities']
+    for entity in entities:
+        assert profile['entities'][entity['name']]['records'] == pool_size
+    for attribute_type, timing in profile['attribute_types'].items():
+        declared = sum(attribute['type'] == attribute_type for entity in entities for attribute in entity['attributes'])
+        assert timing['calls'] == declared * pool_size
+    assert profile['example_assembly']['examples'] == 30
+    assert profile['serialization']['seconds'] > 0
+    assert json.loads((workdir / 'plain_metadata.json').read_text(encoding='utf-8'))['profile'] is None
+
+
+def test_shard_timings_add_up(generator_module):
+    totals = generator_module.GenerationStats()
+    for seconds in (0.5, 0.25):
+        shard = generator_module.GenerationStats()
+        shard.add_attribute_time('email', seconds, 10)
+        shard.add_entity_time('Patient', seconds, 10)
+        shard.example_seconds, shard.examples_timed, shard.serialization_seconds = seconds, 5, seconds
+        totals.merge_timings(shard.timing_totals())
+
+    breakdown = totals.profile_breakdown()
+    assert breakdown['attribute_types']['email'] == {'seconds': 0.75, 'calls': 20, 'microseconds_per_call': 37500.0}
+    assert breakdown['entities']['Patient']['records'] == 20
+    assert breakdown['example_assembly']['examples'] == 10
+    assert breakdown['serialization']['seconds'] == 0.75
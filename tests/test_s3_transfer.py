@@ -0,0 +1,126 @@
+import hashlib
+import os
+
+import pytest
+
+boto3 = pytest.importorskip('boto3')
+moto = pytest.importorskip('moto')
+
+from workflow_utils.dataset_io import JsonlWriter, partition_jsonl
+from workflow_utils.s3_transfer import CHECKSUM_METADATA_KEY, MIN_PART_SIZE, S3MultipartWriter, S3Uploader
+
+BUCKET = 'dataset-bucket'
+
+
+@pytest.fixture
+def s3_client():
+    with moto.mock_aws():
+        client = boto3.client('s3', region_name='us-east-1')
+        client.create_bucket(Bucket=BUCKET)
+        yield client
+
+
+@pytest.mark.parametrize('size', [1000, 2 * MIN_PART_SIZE + 123])
+def test_streamed_object_carries_its_checksum(s3_client, size):
+    data = os.urandom(size)
+    with S3MultipartWriter(s3_client, BUCKET, 'streamed.jsonl', part_size=MIN_PART_SIZE) as sink:
+        sink.write(data)
+
+    head = s3_client.head_object(Bucket=BUCKET, Key='streamed.jsonl')
+    assert head['ContentLength'] == size
+    assert head['Metadata'][CHECKSUM_METADATA_KEY] == hashlib.sha256(data).hexdigest()
+
+
+def test_failed_generation_leaves_no_object(s3_client):
+    written = []
+
+    class RecordingWriter(S3MultipartWriter):
+        def write(self, data):
+            written.append(data)
+            return super().write(data)
+
+    with pytest.raises(RuntimeError):
+        with RecordingWriter(s3_client, BUCKET, 'partial.jsonl') as sink:
+            with JsonlWriter(sink.key, fileobj=sink) as writer:
+                writer.write({'dialog': []})
+                raise RuntimeError("generation failed")
+
+    assert written == []
+    assert 'Contents' not in s3_client.list_objects_v2(Bucket=BUCKET)
+
+
+def test_unchanged_file_is_skipped_and_changed_file_reuploaded(s3_client, tmp_path):
+    path = tmp_path / 'dataset.jsonl'
+    path.write_bytes(b'{"dialog": []}\n')
+
+    first = S3Uploader(s3_client, BUCKET)
+    assert first.upload_file(str(path), 'use_case/dataset.jsonl')
+
+    unchanged = S3Uploader(s3_client, BUCKET)
+    assert not unchanged.upload_file(str(path), 'use_case/dataset.jsonl')
+    assert unchanged.skipped == ['use_case/dataset.jsonl']
+
+    # Same size, different content: only the checksum tells them apart
+    path.write_bytes(b'{"dialog": {}}\n')
+    changed = S3Uploader(s3_client, BUCKET)
+    assert changed.upload_file(str(path), 'use_case/dataset.jsonl')
+    assert changed.uploaded == ['use_case/dataset.jsonl']
+    assert s3_client.get_object(Bucket=BUCKET, Key='use_case/dataset.jsonl')['Body'].read() == b'{"dialog": {}}\n'
+
+    forced = S3Uploader(s3_client, BUCKET, force=True)
+    assert forced.upload_file(str(path), 'use_case/dataset.jsonl')
+
+
+def test_compressed_manifest_parts_are_uploaded_as_plain_jsonl(s3_client, tmp_path):
+    source = tmp_path / 'dataset.jsonl'
+    source.write_bytes(b''.join(b'{"row": %d}\n' % row for row in range(25)))
+    manifest_path = partition_jsonl(str(source), str(tmp_path / 'dataset'), rows_per_part=10, compression='gzip')
+
+    keys = S3Uploader(s3_client, BUCKET).upload_manifest(manifest_path, 'use_case/data', 'use_case/dataset.manifest.json')
+
+    assert keys == [f"use_case/data/dataset-0000{part}.jsonl" for part in range(3)]
+    uploaded = b''.join(s3_client.get_object(Bucket=BUCKET, Key=key)['Body'].read() for key in keys)
+    assert uploaded == source.read_bytes()
+    again = S3Uploader(s3_client, BUCKET)
+    again.upload_manifest(manifest_path, 'use_case/data', 'use_case/dataset.manifest.json')
+    assert again.uploaded == []
+
+
+def keys_under(client, prefix):
+    return sorted(item['Key'] for item in client.list_objects_v2(Bucket=BUCKET, Prefix=prefix).get('Contents', []))
+
+
+def test_stale_objects_from_an_earlier_upload_are_deleted(s3_client, tmp_path):
+    for key in ('use_case/data/old_domain-00000.jsonl', 'use_case/data/train/train.jsonl',
+                'use_case/data/preprocess_report.json', 'use_case/data-archive/keep.jsonl', 'use_case/use_case.jsonl'):
+        s3_client.put_object(Bucket=BUCKET, Key=key, Body=b'{}\n')
+    source = tmp_path / 'dataset.jsonl'
+    source.write_bytes(b''.join(b'{"row": %d}\n' % row for row in range(25)))
+    manifest_path = partition_jsonl(str(source), str(tmp_path / 'dataset'), rows_per_part=10)
+
+    uploader = S3Uploader(s3_client, BUCKET)
+    keys = uploader.upload_manifest(manifest_path, 'use_case/data', 'use_case/dataset.manifest.json')
+    deleted = uploader.delete_stale_objects('use_case/data', keys)
+
+    assert sorted(deleted) == ['use_case/data/old_domain-00000.jsonl', 'use_case/data/preprocess_report.json',
+                               'use_case/data/train/train.jsonl']
+    assert keys_under(s3_client, 'use_case/data/') == sorted(keys)
+    assert keys_under(s3_client, 'use_case/') == sorted(keys + ['use_case/data-archive/keep.jsonl',
+                                                                'use_case/dataset.manifest.json',
+                                                                'use_case/use_case.jsonl'])
+    assert '3 stale deleted' in uploader.summary()
+
+
+def test_directory_upload_replaces_earlier_manifest_parts(s3_client, tmp_path):
+    s3_client.put_object(Bucket=BUCKET, Key='use_case/data/dataset-00000.jsonl', Body=b'{"row": 0}\n')
+    s3_client.put_object(Bucket=BUCKET, Key='use_case/data/train/stale.jsonl', Body=b'{"row": 1}\n')
+    for split in ('train', 'validation'):
+        (tmp_path / 'preprocessed' / split).mkdir(parents=True)
+        (tmp_path / 'preprocessed' / split / f"{split}.jsonl").write_bytes(b'{"dialog": []}\n')
+
+    uploader = S3Uploader(s3_client, BUCKET)
+    keys = uploader.upload_directory(str(tmp_path / 'preprocessed'), 'use_case/data')
+    uploader.delete_stale_objects('use_case/data', keys)
+
+    assert keys_under(s3_client, 'use_case/data/') == ['use_case/data/train/train.jsonl',
+                                                       'use_case/data/validation/validation.jsonl']
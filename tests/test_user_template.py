@@ -0,0 +1,40 @@
+import pytest
+
+TEMPLATE_CONFIG = """
+domain_name: shop
+entities:
+  - name: Customer
+    attributes:
+      - {name: name, type: full_name}
+      - {name: tags, type: list}
+  - name: Order
+    attributes:
+      - {name: name, type: string}
+      - {name: note, type: string}
+metadata_fields: [name, customer_tags]
+fine_tuning_task:
+  system_prompt: 'You help shops.'
+  user_template: %s
+"""
+RECORDS = {
+    'Customer': [{'name': 'Ada Lovelace', 'tags': ['vip', 'eu']}],
+    'Order': [{'name': 'Order 7', 'note': None}],
+}
+
+
+@pytest.mark.parametrize('template, expected', [
+    ("'{customer_name} ({customer_tags}) placed {name}; note: {note}, {unknown}'",
+     "Ada Lovelace (vip, eu) placed Order 7; note: Not specified, Not specified"),
+    ("'{customer_name:>14}|{order_name!r}|{missing}'", "  Ada Lovelace|'Order 7'|Not specified"),
+])
+def test_compiled_template_renders_flattened_fields(make_generator, tmp_path, template, expected):
+    config = tmp_path / 'template.yaml'
+    config.write_text(TEMPLATE_CONFIG % template, encoding='utf-8')
+    generator = make_generator(config)
+    example = generator.create_training_example(RECORDS)
+
+    assert example['dialog'][0] == {'role': 'system', 'content': 'You help shops.'}
+    assert example['dialog'][1] == {'role': 'user', 'content': expected}
+    # Bare names resolve to the last entity that declares them
+    assert example['metadata'] == {'name': 'Order 7', 'customer_tags': ['vip', 'eu']}
+    assert generator.missing_template_fields in (['unknown'], ['missing'])
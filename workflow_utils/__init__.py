@@ -5,5 +5,12 @@ This package contains utility functions for managing the LLM fine-tuning workflo
 """
 
 from workflow_utils.config_reset import reset_workflow_config
+from workflow_utils.dataset_cache import DatasetCache
+from workflow_utils.dataset_io import JsonlWriter
+from workflow_utils.dedup import Deduplicator, dedup_jsonl
+from workflow_utils.preprocess import preprocess_jsonl
+from workflow_utils.s3_transfer import S3Uploader
+from workflow_utils.token_stats import TokenLengthStats
 
-__all__ = ['reset_workflow_config']
+__all__ = ['reset_workflow_config', 'DatasetCache', 'JsonlWriter', 'Deduplicator', 'dedup_jsonl', 'preprocess_jsonl',
+           'S3Uploader', 'TokenLengthStats']
@@ -36,12 +36,14 @@ def reset_workflow_config(config_path='config.yaml'):
         fields_to_reset = [
             'use_case',
             'uri_for_uploaded_s3_input_data',
+            'uri_for_uploaded_s3_validation_data',
             'model_tar_s3_file_path',
             'output_model_files_s3_bucket',
             'model_name',
             'model_files_s3_bucket',
             'input_data_s3_file_path',
             'endpoint_name',
+            'last_training_run',
             'data_config_file'
         ]
         
@@ -0,0 +1,194 @@
+"""
+Dataset Cache Utilities
+
+This module provides a content-addressed cache of generated datasets, so asking for
+the same dataset twice (same data config, seed, example count and generator version)
+reuses the files already on disk instead of regenerating them.
+
+The cache is a JSON index kept next to the datasets (usecase_data/ by default). Each
+entry records the dataset path, every file belonging to it and their total size, plus
+each file's size and modification time: a dataset changed on disk since it was cached
+(grown with --append or edited in place) is no longer served. When the cached datasets
+grow past the size limit, the least recently used ones are deleted.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import yaml
+
+CACHE_INDEX_NAME = '.dataset_cache.json'
+
+# Default size limit for all cached datasets together
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+
+def normalized_config_digest(config_path):
+    """
+    SHA-256 of a data config's content, independent of formatting.
+
+    The YAML is parsed and re-serialized with sorted keys, so comments, key order and
+    whitespace do not change the digest.
+    """
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    canonical = json.dumps(config, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def dataset_cache_key(config_path, seed, num_examples, generator_version, options=None):
+    """
+    Cache key of a dataset.
+
+    Args:
+        config_path (str): Data generation YAML.
+        seed (int): Generator seed.
+        num_examples (int): Number of examples requested.
+        generator_version (str): Version of the generator that writes the dataset.
+        options (dict): Any other settings that change the output (worker count,
+            dedup, packaging, ...). Defaults to none.
+
+    Returns:
+        str: Hex digest identifying the dataset.
+    """
+    key = {
+        'config': normalized_config_digest(config_path),
+        'seed': seed,
+        'num_examples': num_examples,
+        'generator_version': generator_version,
+        'options': options or {},
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True, separators=(',', ':')).encode('utf-8')).hexdigest()
+
+
+def file_fingerprint(path):
+    """Size and modification time of a file, enough to notice it was rewritten or grown."""
+    stat = os.stat(path)
+    return {'bytes': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+class DatasetCache:
+    """
+    Index of generated datasets keyed by dataset_cache_key().
+
+    Args:
+        cache_dir (str): Directory holding the index file. Defaults to 'usecase_data'.
+        max_bytes (int): Total size of cached datasets before the least recently used
+            are evicted. Defaults to 5 GiB.
+    """
+
+    def __init__(self, cache_dir='usecase_data', max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, CACHE_INDEX_NAME)
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('entries', {})
+        except (OSError, ValueError):
+            # A damaged index only costs a regeneration
+            return {}
+
+    def _save_index(self):
+        """Atomically replace the index file."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries}, f, indent=2)
+        os.replace(temp_path, self.index_path)
+
+    def lookup(self, key):
+        """
+        Return the cached entry for a key, or None on a miss.
+
+        An entry whose files are no longer all on disk, or have changed since they were
+        registered, is dropped and counts as a miss. A hit refreshes the entry's last-used
+        time.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        fingerprints = entry.get('fingerprints', {})
+        if not all(os.path.exists(path) and fingerprints.get(path) == file_fingerprint(path)
+                   for path in entry['files']):
+            del self.entries[key]
+            self._save_index()
+            return None
+        entry['last_used'] = time.time()
+        self._save_index()
+        return entry
+
+    def register(self, key, dataset_path, files, details=None):
+        """
+        Record a freshly generated dataset, then evict old datasets if over the size limit.
+
+        Args:
+            key (str): Key from dataset_cache_key().
+            dataset_path (str): Path that names the dataset (JSONL file or manifest).
+            files (list): Every file belonging to the dataset, deleted together on eviction.
+            details (dict): Extra fields stored with the entry (seed, count, ...).
+
+        Returns:
+            list: Dataset paths evicted to make room.
+        """
+        files = [path for path in files if os.path.exists(path)]
+        now = time.time()
+        self.entries[key] = {
+            **(details or {}),
+            'dataset_path': dataset_path,
+            'files': files,
+            'bytes': sum(os.path.getsize(path) for path in files),
+            'fingerprints': {path: file_fingerprint(path) for path in files},
+            'created': now,
+            'last_used': now,
+        }
+        evicted = self.evict(keep=key)
+        self._save_index()
+        return evicted
+
+    def invalidate(self, path):
+        """
+        Drop every entry that includes a file, e.g. a dataset about to be appended to.
+
+        The files themselves are left alone. Returns the number of entries dropped.
+        """
+        path = os.path.abspath(path)
+        stale = [key for key, entry in self.entries.items()
+                 if path in (os.path.abspath(file_path) for file_path in entry['files'])]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._save_index()
+        return len(stale)
+
+    def total_bytes(self):
+        """Combined size of every cached dataset."""
+        return sum(entry['bytes'] for entry in self.entries.values())
+
+    def evict(self, keep=None):
+        """
+        Delete least recently used datasets until the cache fits in max_bytes.
+
+        Args:
+            keep (str): Key that is never evicted (the dataset just generated).
+
+        Returns:
+            list: Dataset paths that were evicted.
+        """
+        evicted = []
+        candidates = sorted((entry['last_used'], key) for key, entry in self.entries.items() if key != keep)
+        for _, key in candidates:
+            if self.total_bytes() <= self.max_bytes:
+                break
+            entry = self.entries.pop(key)
+            for path in entry['files']:
+                if os.path.exists(path):
+                    os.remove(path)
+            evicted.append(entry['dataset_path'])
+        return evicted
@@ -0,0 +1,370 @@
+"""
+Dataset I/O Utilities
+
+This module provides streaming writers for the JSONL datasets produced by the
+synthetic data generator, so large datasets never need to be held in memory,
+and helpers to package a finished JSONL file as compressed, fixed-size parts
+described by a manifest (and to read any of those layouts back).
+
+Records are serialized by a pluggable backend. 'json' (the default) is the standard
+library json module with the generator's original format (', ' and ': ' separators,
+non-ASCII characters unescaped). 'orjson' encodes with orjson and rewrites its compact
+output into exactly the same bytes, so the two backends are interchangeable for resume,
+append and the dataset cache. 'auto' picks orjson when it is installed.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Write buffer for dataset files; records are already grouped into chunks before writing
+_WRITE_BUFFER_BYTES = 1 << 20
+
+# File suffix for each supported compression
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+MANIFEST_SUFFIX = '.manifest.json'
+
+# Types orjson would serialize but the standard library rejects are passed through,
+# so both backends raise on them alike
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+                   | orjson.OPT_PASSTHROUGH_SUBCLASS) if orjson is not None else 0
+
+# Indented, orjson writes ': ' between keys and values and puts every item on its own
+# line; raw newlines never occur inside strings, which escape them
+_ORJSON_INDENTED = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if orjson is not None else 0)
+
+# Scalars end the line they are on, so the end of each line (as long as the longest float
+# orjson writes, plus its comma) holds every null and float in the record
+_LINE_TAIL = 26
+_DIGITS_TO_ZERO = bytes.maketrans(b'123456789', b'000000000')
+
+
+def _stdlib_dumps(record):
+    """Serialize one record as the generator always has: json.dumps defaults, UTF-8."""
+    return json.dumps(record, ensure_ascii=False).encode('utf-8')
+
+
+def _orjson_dumps(record):
+    """
+    Serialize one record with orjson, in exactly the bytes _stdlib_dumps writes.
+
+    orjson escapes strings as json.dumps(ensure_ascii=False) does; its indented output is
+    folded onto one line by giving each trailing ',' a space and stripping the
+    indentation. Records orjson would write differently go to the standard library:
+    those it rejects (integers beyond 64 bits, non-string keys), those with a null (which
+    may be a NaN or infinity, written as NaN by json.dumps) and those with floats repr()
+    spells with an exponent (orjson writes 0.00001 for 1e-05 and 1e16 for 1e+16). Text
+    at the end of a line can look like either; that only costs the fast path.
+    """
+    try:
+        lines = orjson.dumps(record, option=_ORJSON_INDENTED).replace(b',\n', b', \n').split(b'\n')
+    except TypeError:
+        return _stdlib_dumps(record)
+    tails = b'\n'.join([line[-_LINE_TAIL:] for line in lines])
+    if b'null' in tails or b'0.0000' in tails or b'0e' in tails.translate(_DIGITS_TO_ZERO):
+        return _stdlib_dumps(record)
+    return b''.join(map(bytes.lstrip, lines))
+
+
+def get_serializer(name='json'):
+    """
+    Resolve a serializer backend.
+
+    Args:
+        name (str): 'json' (the default, the original ', ' / ': ' format), 'orjson'
+            (faster, same bytes) or 'auto' (orjson when installed, json otherwise).
+
+    Returns:
+        tuple: (backend_name, dumps) where dumps maps a record to UTF-8 bytes.
+
+    Raises:
+        ValueError: If the name is unknown, or 'orjson' is requested but not installed.
+    """
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name == 'json':
+        return 'json', _stdlib_dumps
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError("The orjson serializer requires the 'orjson' package")
+        return 'orjson', _orjson_dumps
+    raise ValueError(f"Unknown serializer '{name}' (expected 'json', 'orjson' or 'auto')")
+
+
+def encode_batch(records, dumps):
+    """Encode a batch of records into one JSONL chunk (each line newline-terminated)."""
+    if not records:
+        return b''
+    return b'\n'.join(map(dumps, records)) + b'\n'
+
+
+class JsonlWriter:
+    """
+    Buffered JSONL writer that collects records and serializes and writes them in chunks.
+
+    Records are encoded when the buffer is flushed, so a record must not be modified
+    after it has been passed to write().
+
+    Args:
+        path (str): Path of the JSONL file to write (only used for messages with fileobj).
+        chunk_size (int): Number of records buffered before they are encoded and written.
+        mode (str): File mode, 'w' to truncate or 'a' to append. Defaults to 'w'.
+        serializer (str): Serializer backend: 'json', 'orjson' or 'auto'. Defaults to 'json'.
+        fileobj: Binary file-like object to write to instead of opening path; the caller
+            keeps ownership and closes it. Defaults to None.
+    """
+
+    def __init__(self, path, chunk_size=1000, mode='w', serializer='json', fileobj=None):
+        self.path = path
+        self.chunk_size = max(1, chunk_size)
+        self.serializer, self._dumps = get_serializer(serializer)
+        self.records_written = 0
+        self.bytes_written = 0
+        self.flush_seconds = 0.0
+        self._buffer = []
+        self._owns_file = fileobj is None
+        self._file = open(path, mode + 'b', buffering=_WRITE_BUFFER_BYTES) if fileobj is None else fileobj
+        self._closed = False
+
+    def write(self, record):
+        """Queue one record, flushing the buffer once it reaches chunk_size."""
+        self._buffer.append(record)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, records):
+        """Write every record from an iterable and return the number written."""
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
+
+    def flush(self):
+        """Encode and write any buffered records, adding the time taken to flush_seconds."""
+        if not self._buffer:
+            return
+        start = time.perf_counter()
+        data = encode_batch(self._buffer, self._dumps)
+        self._file.write(data)
+        self.flush_seconds += time.perf_counter() - start
+        self.records_written += len(self._buffer)
+        self.bytes_written += len(data)
+        self._buffer = []
+
+    def sync(self):
+        """Flush buffered records and force them to disk, so bytes_written is durable."""
+        self.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self, discard=False):
+        """
+        Flush remaining records and close the file (a caller-supplied fileobj is left open).
+
+        With discard=True the buffered records are dropped instead of written, as when the
+        with block is left on an exception: the output is being abandoned (e.g. an S3 upload
+        about to be aborted), so nothing more is encoded or sent.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if discard:
+            self._buffer = []
+        else:
+            self.flush()
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close(discard=exc_type is not None)
+        return False
+
+
+def detect_compression(path):
+    """Infer a dataset file's compression from its suffix."""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return 'none'
+
+
+def compression_available(compression):
+    """Whether the package a compression needs is installed (zstd needs zstandard)."""
+    return compression != 'zstd' or zstandard is not None
+
+
+def open_compressed(path, mode, compression=None):
+    """
+    Open a dataset file for binary reading ('rb') or writing ('wb'), compressed or not.
+
+    Gzip output records a zero timestamp, so the same rows always produce the same
+    bytes (and the same checksum).
+    """
+    compression = compression or detect_compression(path)
+    if compression == 'none':
+        return open(path, mode, buffering=_WRITE_BUFFER_BYTES)
+    if compression == 'gzip':
+        return gzip.GzipFile(path, mode, mtime=0)
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        raw = open(path, mode)
+        if 'w' in mode:
+            return zstandard.ZstdCompressor(level=3).stream_writer(raw, closefd=True)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    raise ValueError(f"Unknown compression '{compression}' (expected one of {', '.join(COMPRESSION_SUFFIXES)})")
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_WRITE_BUFFER_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def decompress_file(source_path, output_path):
+    """
+    Write the decompressed content of a dataset file to output_path.
+
+    Returns:
+        str: SHA-256 hex digest of the decompressed bytes.
+    """
+    digest = hashlib.sha256()
+    with open_compressed(source_path, 'rb') as source, open(output_path, 'wb') as destination:
+        for block in iter(lambda: source.read(_WRITE_BUFFER_BYTES), b''):
+            digest.update(block)
+            destination.write(block)
+    return digest.hexdigest()
+
+
+def is_manifest(path):
+    """Whether a dataset path points at a partition manifest rather than a JSONL file."""
+    return path.endswith(MANIFEST_SUFFIX)
+
+
+def load_manifest(manifest_path):
+    """Load a partition manifest."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def manifest_part_paths(manifest_path, manifest=None):
+    """Local paths of a manifest's parts, in order (part paths are relative to the manifest)."""
+    manifest = manifest or load_manifest(manifest_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    return [os.path.join(base_dir, part['path']) for part in manifest['parts']]
+
+
+def verify_manifest(manifest_path):
+    """
+    Check every part of a manifest exists and matches its recorded checksum.
+
+    Returns:
+        list: Human-readable problems; empty when the dataset is intact.
+    """
+    manifest = load_manifest(manifest_path)
+    problems = []
+    for part, part_path in zip(manifest['parts'], manifest_part_paths(manifest_path, manifest)):
+        if not os.path.exists(part_path):
+            problems.append(f"missing part {part['path']}")
+        elif file_sha256(part_path) != part['sha256']:
+            problems.append(f"checksum mismatch for {part['path']}")
+    return problems
+
+
+def partition_jsonl(source_path, output_prefix, rows_per_part=0, compression='none'):
+    """
+    Split a JSONL file into fixed-row parts, optionally compressed, and write a manifest.
+
+    Parts are named <output_prefix>-00000.jsonl[.gz|.zst]; the manifest is written to
+    <output_prefix>.manifest.json and lists every part with its row count, size and
+    SHA-256 checksum. Lines are copied byte-for-byte.
+
+    Args:
+        source_path (str): JSONL file to package.
+        output_prefix (str): Path prefix for the parts and the manifest.
+        rows_per_part (int): Rows per part; 0 puts every row in a single part.
+        compression (str): 'none', 'gzip' or 'zstd'.
+
+    Returns:
+        str: Path of the manifest.
+    """
+    suffix = '.jsonl' + COMPRESSION_SUFFIXES[compression]
+    parts = []
+
+    def close_part(part_file, part_path, rows):
+        part_file.close()
+        parts.append({
+            'path': os.path.basename(part_path),
+            'rows': rows,
+            'bytes': os.path.getsize(part_path),
+            'sha256': file_sha256(part_path),
+        })
+
+    part_file, part_path, rows, pending = None, None, 0, []
+    with open(source_path, 'rb') as source:
+        for line in source:
+            if part_file is None:
+                part_path = f"{output_prefix}-{len(parts):05d}{suffix}"
+                part_file = open_compressed(part_path, 'wb', compression)
+                rows = 0
+            # Hand the compressor large blocks rather than single lines
+            pending.append(line)
+            rows += 1
+            if len(pending) >= 1000:
+                part_file.write(b''.join(pending))
+                pending = []
+            if rows_per_part and rows >= rows_per_part:
+                part_file.write(b''.join(pending))
+                pending = []
+                close_part(part_file, part_path, rows)
+                part_file = None
+    if part_file is not None:
+        part_file.write(b''.join(pending))
+        close_part(part_file, part_path, rows)
+
+    manifest = {
+        'format': 'jsonl',
+        'compression': compression,
+        'rows_per_part': rows_per_part,
+        'total_rows': sum(part['rows'] for part in parts),
+        'parts': parts,
+    }
+    manifest_path = output_prefix + MANIFEST_SUFFIX
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
+
+
+def iter_jsonl_lines(path):
+    """
+    Yield the raw lines (bytes) of a dataset: a plain, gzip or zstd JSONL file, or every
+    part of a manifest in order.
+    """
+    paths = manifest_part_paths(path) if is_manifest(path) else [path]
+    for part_path in paths:
+        with open_compressed(part_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
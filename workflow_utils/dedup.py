@@ -0,0 +1,261 @@
+"""
+Dataset Deduplication Utilities
+
+This module removes exact and near-duplicate training dialogs from generated JSONL
+datasets. Exact duplicates are found by hashing the full dialog; near duplicates by
+MinHash signatures over word shingles, bucketed with locality-sensitive hashing (LSH)
+and confirmed by their estimated Jaccard similarity.
+
+All index state lives in SQLite (a temporary file by default), so memory use stays
+bounded no matter how many rows are processed. LSH buckets are capped at
+_MAX_BUCKET_ROWS rows, so the work per row stays bounded too.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import zlib
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is optional, the pure-Python path gives identical signatures
+    np = None
+
+# Universal hashing modulus for MinHash permutations (Mersenne prime 2**61 - 1)
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Multiplier combining consecutive word hashes into a shingle hash (32-bit FNV prime)
+_SHINGLE_MULTIPLIER = 0x01000193
+
+# Candidates compared per row before it is accepted as unique, taken in order of the number
+# of LSH bands they share with it (the likeliest near duplicates first)
+_MAX_CANDIDATES = 32
+
+# Rows indexed per LSH bucket. On templated data (the same reply in every dialog) some
+# buckets would otherwise grow with every row kept and make the pass quadratic; a full
+# bucket already holds plenty of rows to compare against, so later rows are not added to it
+_MAX_BUCKET_ROWS = 64
+
+
+def dialog_text(example, include_system=True):
+    """Join the message contents of a training example's dialog into one string."""
+    return '\n'.join(
+        str(message.get('content', ''))
+        for message in example.get('dialog', [])
+        if include_system or message.get('role') != 'system'
+    )
+
+
+class Deduplicator:
+    """
+    Streaming exact and near-duplicate filter for training examples.
+
+    Args:
+        threshold (float): Estimated Jaccard similarity at or above which two dialogs are
+            near duplicates. Defaults to 0.9.
+        num_perm (int): Number of MinHash permutations. Defaults to 64.
+        bands (int): Number of LSH bands; must divide num_perm. Defaults to 16.
+        shingle_size (int): Words per shingle. Defaults to 3.
+        store_path (str): SQLite file holding the index. Defaults to a temporary file that
+            is removed on close; ':memory:' keeps it in memory.
+        seed (int): Seed for the MinHash permutations. Defaults to 1.
+    """
+
+    def __init__(self, threshold=0.9, num_perm=64, bands=16, shingle_size=3, store_path=None, seed=1):
+        if num_perm % bands:
+            raise ValueError(f"bands ({bands}) must divide num_perm ({num_perm})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, 1 << 32) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, 1 << 32) for _ in range(num_perm)]
+        if np is not None:
+            self._np_a = np.array(self._a, dtype=np.uint64)[:, None]
+            self._np_b = np.array(self._b, dtype=np.uint64)[:, None]
+
+        self.rows_seen = 0
+        self.exact_duplicates = 0
+        self.near_duplicates = 0
+
+        self._temp_path = None
+        if store_path is None:
+            handle, store_path = tempfile.mkstemp(suffix='.sqlite', prefix='dedup_')
+            os.close(handle)
+            self._temp_path = store_path
+        self._db = sqlite3.connect(store_path)
+        self._db.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE IF NOT EXISTS exact (digest BLOB PRIMARY KEY) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS signatures (row INTEGER PRIMARY KEY, signature BLOB);
+            CREATE TABLE IF NOT EXISTS bands (band INTEGER, bucket BLOB, row INTEGER);
+            CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+        """)
+        self._next_row = self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM signatures").fetchone()[0]
+
+    @property
+    def duplicates(self):
+        """Total number of rows rejected so far."""
+        return self.exact_duplicates + self.near_duplicates
+
+    def shingle_hashes(self, text):
+        """32-bit hashes of the word shingles of a text.
+
+        Each word is hashed once with CRC32 and the hashes of shingle_size consecutive
+        words are combined arithmetically, which avoids building every shingle string.
+        """
+        word_hashes = list(map(zlib.crc32, text.lower().encode('utf-8').split())) or [0]
+        count = max(len(word_hashes) - self.shingle_size + 1, 1)
+        if np is not None:
+            words = np.array(word_hashes, dtype=np.uint64)
+            hashes = words[:count].copy()
+            for offset in range(1, min(self.shingle_size, len(word_hashes))):
+                hashes = (hashes * np.uint64(_SHINGLE_MULTIPLIER) + words[offset:offset + count]) & np.uint64(_MAX_HASH)
+            return hashes
+        hashes = word_hashes[:count]
+        for offset in range(1, min(self.shingle_size, len(word_hashes))):
+            hashes = [(value * _SHINGLE_MULTIPLIER + word) & _MAX_HASH
+                      for value, word in zip(hashes, word_hashes[offset:offset + count])]
+        return hashes
+
+    def signature(self, text):
+        """MinHash signature of a text, packed as num_perm native uint32 values."""
+        hashes = self.shingle_hashes(text)
+        if np is not None:
+            minimums = ((self._np_a * hashes[None, :] + self._np_b) % np.uint64(_MERSENNE_PRIME)) & np.uint64(_MAX_HASH)
+            return minimums.min(axis=1).astype(np.uint32).tobytes()
+        return array('I', [
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in zip(self._a, self._b)
+        ]).tobytes()
+
+    def similarity(self, signature, other):
+        """Estimated Jaccard similarity of two packed signatures."""
+        if np is not None:
+            return float(np.mean(np.frombuffer(signature, dtype=np.uint32) == np.frombuffer(other, dtype=np.uint32)))
+        left, right = array('I'), array('I')
+        left.frombytes(signature)
+        right.frombytes(other)
+        return sum(1 for x, y in zip(left, right) if x == y) / self.num_perm
+
+    def band_buckets(self, signature):
+        """LSH bucket keys of a packed signature, one per band."""
+        width = self.rows_per_band * 4
+        return [signature[band * width:(band + 1) * width] for band in range(self.bands)]
+
+    def is_duplicate(self, example):
+        """Check an example against everything kept so far, and index it if it is unique."""
+        self.rows_seen += 1
+        db = self._db
+
+        # Exact matches compare the whole dialog, system prompt included; the similarity
+        # check only looks at the conversation itself
+        text = dialog_text(example, include_system=False)
+        hasher = hashlib.blake2b(text.encode('utf-8'), digest_size=16)
+        for message in example.get('dialog', []):
+            if message.get('role') == 'system':
+                hasher.update(b'\x00' + str(message.get('content', '')).encode('utf-8'))
+        digest = hasher.digest()
+        if db.execute("SELECT 1 FROM exact WHERE digest = ?", (digest,)).fetchone():
+            self.exact_duplicates += 1
+            return True
+
+        signature = self.signature(text)
+        buckets = self.band_buckets(signature)
+        shared_bands = Counter()
+        open_bands = []
+        for band, bucket in enumerate(buckets):
+            rows = db.execute("SELECT row FROM bands WHERE band = ? AND bucket = ? LIMIT ?",
+                              (band, bucket, _MAX_BUCKET_ROWS)).fetchall()
+            shared_bands.update(row for (row,) in rows)
+            if len(rows) < _MAX_BUCKET_ROWS:
+                open_bands.append((band, bucket))
+        ranked = sorted(shared_bands, key=lambda row: (-shared_bands[row], row))
+        for row in ranked[:_MAX_CANDIDATES]:
+            (other,) = db.execute("SELECT signature FROM signatures WHERE row = ?", (row,)).fetchone()
+            if self.similarity(signature, other) >= self.threshold:
+                self.near_duplicates += 1
+                return True
+
+        row = self._next_row
+        self._next_row += 1
+        db.execute("INSERT INTO exact (digest) VALUES (?)", (digest,))
+        db.execute("INSERT INTO signatures (row, signature) VALUES (?, ?)", (row, signature))
+        db.executemany("INSERT INTO bands (band, bucket, row) VALUES (?, ?, ?)",
+                       [(band, bucket, row) for band, bucket in open_bands])
+        return False
+
+    def filter(self, examples):
+        """Yield only the examples that are not duplicates of an earlier one."""
+        for example in examples:
+            if not self.is_duplicate(example):
+                yield example
+
+    def report(self):
+        """Deduplication statistics, suitable for dataset metadata."""
+        return {
+            'input_records': self.rows_seen,
+            'kept_records': self.rows_seen - self.duplicates,
+            'exact_duplicates': self.exact_duplicates,
+            'near_duplicates': self.near_duplicates,
+            'duplicate_rate': self.duplicates / self.rows_seen if self.rows_seen else 0.0,
+            'threshold': self.threshold,
+            'num_perm': self.num_perm,
+            'bands': self.bands,
+            'shingle_size': self.shingle_size,
+        }
+
+    def close(self):
+        """Close the index, removing it if it was a temporary file."""
+        self._db.commit()
+        self._db.close()
+        if self._temp_path and os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def dedup_jsonl(input_path, output_path, chunk_size=1000, **options):
+    """
+    Stream a JSONL dataset through a Deduplicator, writing the kept rows to output_path.
+
+    Kept lines are copied byte-for-byte, so the output matches what the generator wrote.
+
+    Args:
+        input_path (str): JSONL dataset to deduplicate.
+        output_path (str): Destination for the kept rows; must differ from input_path.
+        chunk_size (int): Number of kept lines buffered before they are written.
+        **options: Keyword arguments for Deduplicator.
+
+    Returns:
+        dict: The Deduplicator report.
+    """
+    with Deduplicator(**options) as deduplicator, \
+            open(input_path, 'rb') as source, open(output_path, 'wb') as destination:
+        buffer = []
+        for line in source:
+            if not line.strip():
+                continue
+            if deduplicator.is_duplicate(json.loads(line)):
+                continue
+            buffer.append(line if line.endswith(b'\n') else line + b'\n')
+            if len(buffer) >= chunk_size:
+                destination.writelines(buffer)
+                buffer = []
+        destination.writelines(buffer)
+        return deduplicator.report()
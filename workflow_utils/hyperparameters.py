@@ -0,0 +1,281 @@
+"""
+Fine-tuning Hyperparameter Utilities
+
+This module resolves the JumpStart hyperparameters used by the fine-tune step. Values
+come from four layers, later layers winning:
+
+1. Defaults (the values the fine-tune step has always used).
+2. Workflow settings in config.yaml (epochs, learning_rate, batch_size, ...), mapped
+   onto their JumpStart names.
+3. An optional performance preset ('fast-iterate', 'max-throughput', 'memory-lean'),
+   which sets the batch shape, FSDP, worker counts, LoRA target modules, context length
+   and instance type together, sized from the dataset's row count and token lengths.
+4. An optional per-use-case override file, finetune_configs/<use_case>.yaml, holding
+   JumpStart names (or the config.yaml names) and values.
+
+Every value is checked against its expected type and range before a job is started,
+and the resolved set records where each value came from.
+"""
+
+import math
+import os
+
+import yaml
+
+from workflow_utils.token_stats import LENGTH_ALIGNMENT
+
+OVERRIDES_DIR = 'finetune_configs'
+
+
+def _positive(value):
+    return value > 0
+
+
+def _non_negative(value):
+    return value >= 0
+
+
+def _fraction(value):
+    return 0 <= value < 1
+
+
+# JumpStart name -> (type, default, check, requirement shown when the check fails)
+HYPERPARAMETER_SPECS = {
+    'instruction_tuned': (bool, False, None, None),
+    'chat_dataset': (bool, True, None, None),
+    'use_default_template': (bool, False, None, None),
+    'chat_template': (str, 'Llama3.1', None, None),
+    'epoch': (int, 3, _positive, 'must be positive'),
+    'enable_fsdp': (bool, False, None, None),
+    'learning_rate': (float, 1e-5, _positive, 'must be positive'),
+    'per_device_train_batch_size': (int, 2, _positive, 'must be positive'),
+    'gradient_accumulation_steps': (int, 4, _positive, 'must be positive'),
+    'lora_r': (int, 16, _positive, 'must be positive'),
+    'lora_alpha': (int, 64, _positive, 'must be positive'),
+    'lora_dropout': (float, 0.05, _fraction, 'must be in [0, 1)'),
+    'target_modules': (str, 'q_proj,k_proj,v_proj,o_proj', bool, 'must not be empty'),
+    'preprocessing_num_workers': (int, 4, _positive, 'must be positive'),
+    'num_workers_dataloader': (int, 4, _non_negative, 'must not be negative'),
+    'max_input_length': (int, 2048, _positive, 'must be positive'),
+    # The train_file should reference the relative path that will be accessible in the container
+    'train_file': (str, '/opt/ml/input/data/training/patient_care_plan.jsonl', None, None),
+    'validation_split_ratio': (float, 0.2, lambda value: 0 < value < 1, 'must be between 0 and 1'),
+}
+
+# Performance presets. Batch sizes follow from a per-device token budget divided by the
+# context length; gradient accumulation then reaches the effective batch size across all
+# of the instance's GPUs.
+PRESETS = {
+    # Short context and a small adapter for quick turnaround on a single GPU
+    'fast-iterate': {
+        'instance_type': 'ml.g5.2xlarge',
+        'gpus': 1,
+        'enable_fsdp': False,
+        'target_modules': 'q_proj,v_proj',
+        'preprocessing_num_workers': 4,
+        'num_workers_dataloader': 2,
+        'length_percentile': 'p95',
+        'tokens_per_device': 8192,
+        'effective_batch_size': 8,
+    },
+    # Multi-GPU instance sharded with FSDP, full context, large batches and many loader workers
+    'max-throughput': {
+        'instance_type': 'ml.g5.12xlarge',
+        'gpus': 4,
+        'enable_fsdp': True,
+        'target_modules': 'q_proj,k_proj,v_proj,o_proj',
+        'preprocessing_num_workers': 16,
+        'num_workers_dataloader': 8,
+        'length_percentile': 'max',
+        'tokens_per_device': 16384,
+        'effective_batch_size': 32,
+    },
+    # Smallest GPU instance: few tokens per step, few workers, small adapter
+    'memory-lean': {
+        'instance_type': 'ml.g5.xlarge',
+        'gpus': 1,
+        'enable_fsdp': False,
+        'target_modules': 'q_proj,v_proj',
+        'preprocessing_num_workers': 2,
+        'num_workers_dataloader': 1,
+        'length_percentile': 'p99',
+        'tokens_per_device': 2048,
+        'effective_batch_size': 8,
+    },
+}
+
+# Presets keep at least this many optimizer steps per epoch on small datasets
+MIN_STEPS_PER_EPOCH = 20
+
+# Below this many rows, tokenization is quick and extra preprocessing workers only cost startup
+SMALL_DATASET_ROWS = 10000
+
+# config.yaml key -> JumpStart name
+CONFIG_KEYS = {
+    'epochs': 'epoch',
+    'learning_rate': 'learning_rate',
+    'batch_size': 'per_device_train_batch_size',
+    'lora_r': 'lora_r',
+    'lora_alpha': 'lora_alpha',
+    'max_input_length': 'max_input_length',
+    'validation_split': 'validation_split_ratio',
+    'chat_dataset': 'chat_dataset',
+    'chat_template': 'chat_template',
+}
+
+
+def coerce(name, value):
+    """
+    Convert a value to the type of hyperparameter name.
+
+    Strings such as '1e-5' or 'true' (as the dashboard saves them) are accepted; anything
+    that does not convert cleanly, or fails the range check, raises ValueError.
+    """
+    value_type, _, check, requirement = HYPERPARAMETER_SPECS[name]
+    if value_type is bool:
+        if isinstance(value, str) and value.strip().lower() in ('true', 'false'):
+            value = value.strip().lower() == 'true'
+        elif not isinstance(value, bool):
+            raise ValueError(f"{name}: expected true or false, got {value!r}")
+    elif value_type is int:
+        if isinstance(value, bool) or not isinstance(value, (int, str)) or not str(value).strip().lstrip('-').isdigit():
+            raise ValueError(f"{name}: expected an integer, got {value!r}")
+        value = int(value)
+    elif value_type is float:
+        try:
+            if isinstance(value, bool):
+                raise TypeError
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"{name}: expected a number, got {value!r}")
+    else:
+        value = str(value).strip()
+    if check is not None and not check(value):
+        raise ValueError(f"{name}: {requirement}, got {value!r}")
+    return value
+
+
+def format_value(value):
+    """JumpStart takes every hyperparameter as a string ('True'/'False' for booleans)."""
+    return str(value)
+
+
+def overrides_path_for(use_case):
+    """Default override file of a use case (it does not have to exist)."""
+    return os.path.join(OVERRIDES_DIR, f"{use_case}.yaml")
+
+
+def load_overrides(path):
+    """Read an override file; a missing file means no overrides."""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        overrides = yaml.safe_load(f) or {}
+    if not isinstance(overrides, dict):
+        raise ValueError(f"{path}: expected a mapping of hyperparameter names to values")
+    return overrides
+
+
+def preset_settings(name, dataset_rows=None, token_lengths=None, max_input_length=2048):
+    """
+    Hyperparameters and instance type of a preset, sized for a dataset.
+
+    Args:
+        name (str): Preset name (a key of PRESETS).
+        dataset_rows (int): Training rows; caps the effective batch size so small datasets
+            still get MIN_STEPS_PER_EPOCH steps, and trims workers. Unknown when None.
+        token_lengths (dict): Whole-dialog length summary ('p95', 'p99', 'max', ...) from
+            the token-length report; the preset's percentile sets max_input_length.
+        max_input_length (int): Context length used when there are no token lengths, and
+            the most the percentile may set (the configured or model context limit).
+
+    Returns:
+        tuple: (hyperparameters keyed by JumpStart name, instance type)
+    """
+    if name not in PRESETS:
+        raise ValueError(f"Unknown preset '{name}' (choose from {', '.join(PRESETS)})")
+    preset = PRESETS[name]
+    if token_lengths:
+        # A few very long dialogs must not push the context past what the model takes
+        percentile_length = int(math.ceil(token_lengths[preset['length_percentile']] / LENGTH_ALIGNMENT) * LENGTH_ALIGNMENT)
+        max_input_length = min(percentile_length, max_input_length)
+
+    batch_size = 2 ** int(math.log2(max(1, preset['tokens_per_device'] // max_input_length)))
+    effective_batch_size = preset['effective_batch_size']
+    preprocessing_workers = preset['preprocessing_num_workers']
+    if dataset_rows:
+        effective_batch_size = max(1, min(effective_batch_size, dataset_rows // MIN_STEPS_PER_EPOCH))
+        if dataset_rows < SMALL_DATASET_ROWS:
+            preprocessing_workers = min(preprocessing_workers, 2)
+    batch_size = min(batch_size, max(1, effective_batch_size // preset['gpus']))
+
+    values = {
+        'per_device_train_batch_size': batch_size,
+        'gradient_accumulation_steps': max(1, effective_batch_size // (batch_size * preset['gpus'])),
+        'enable_fsdp': preset['enable_fsdp'],
+        'preprocessing_num_workers': preprocessing_workers,
+        'num_workers_dataloader': preset['num_workers_dataloader'],
+        'target_modules': preset['target_modules'],
+        'max_input_length': max_input_length,
+    }
+    return values, preset['instance_type']
+
+
+def resolve_hyperparameters(config, overrides=None, overrides_source='overrides', preset=None, preset_source='preset'):
+    """
+    Resolve and validate the fine-tuning hyperparameters.
+
+    Args:
+        config (dict): Workflow configuration (config.yaml).
+        overrides (dict): Per-use-case values keyed by JumpStart or config.yaml name.
+        overrides_source (str): Name of the overrides (e.g. their file) for the sources.
+        preset (dict): Hyperparameters from preset_settings(), applied over config.yaml.
+        preset_source (str): Name of the preset for the sources.
+
+    Returns:
+        tuple: (values, sources) - typed values keyed by JumpStart name, and where each
+        value came from ('default', 'config.yaml:<key>' or overrides_source).
+
+    Raises:
+        ValueError: Listing every invalid or unknown setting.
+    """
+    values = {name: spec[1] for name, spec in HYPERPARAMETER_SPECS.items()}
+    sources = dict.fromkeys(values, 'default')
+    errors = []
+
+    def apply(name, value, source):
+        try:
+            values[name] = coerce(name, value)
+            sources[name] = source
+        except ValueError as e:
+            errors.append(f"{e} (from {source})")
+
+    for key, name in CONFIG_KEYS.items():
+        # Empty settings (e.g. after a config reset) keep the default
+        if config.get(key) not in (None, ''):
+            apply(name, config[key], f"config.yaml:{key}")
+    for name, value in (preset or {}).items():
+        apply(name, value, preset_source)
+    for key, value in (overrides or {}).items():
+        name = CONFIG_KEYS.get(key, key)
+        if name not in HYPERPARAMETER_SPECS:
+            errors.append(f"{key}: unknown hyperparameter (from {overrides_source})")
+            continue
+        apply(name, value, overrides_source)
+
+    if errors:
+        raise ValueError("Invalid hyperparameters:\n  " + "\n  ".join(errors))
+    return values, sources
+
+
+def jumpstart_hyperparameters(model_id, values):
+    """The string-valued dict passed to JumpStartEstimator."""
+    return {'model_name': model_id, **{name: format_value(value) for name, value in values.items()}}
+
+
+def print_hyperparameters(hyperparameters, sources):
+    """Print the effective hyperparameters with the source of each value."""
+    width = max(len(name) for name in hyperparameters)
+    print("Effective hyperparameters:")
+    for name, value in hyperparameters.items():
+        print(f"  {name:<{width}}  {value:<32}  ({sources.get(name, 'model')})")
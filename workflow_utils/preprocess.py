@@ -0,0 +1,183 @@
+"""
+Dataset Preprocessing Utilities
+
+This module prepares a generated JSONL dataset for fine-tuning before it is uploaded.
+Each dialog is assigned to the train or validation split by a hash of its content, so
+the split is stable across runs and row orders (and identical dialogs always land in
+the same split). Every dialog is rendered with the Llama 3.1 chat template and
+tokenized to measure its length; dialogs longer than max_input_length are dropped
+(or kept and reported), so over-length and skewed-length data are caught locally
+instead of inside a paid training job.
+
+Any tokenizer with an encode(text) method returning a token sequence can be used. The
+stub tokenizer needs no downloads and slightly over-counts compared to Llama's BPE
+vocabulary, so lengths it accepts are safe.
+"""
+
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+
+try:
+    from transformers import AutoTokenizer
+except ImportError:  # transformers is only needed for real (non-stub) tokenizers
+    AutoTokenizer = None
+
+from workflow_utils.dataset_io import iter_jsonl_lines
+from workflow_utils.token_stats import apply_llama31_chat_template, counter_summary
+
+# Split files, written under output_dir/<split>/<split>.jsonl so each is its own S3 channel
+TRAIN_SPLIT = 'train'
+VALIDATION_SPLIT = 'validation'
+REPORT_NAME = 'preprocess_report.json'
+
+# Over-length examples listed by row number in the report
+_MAX_REPORTED_ROWS = 20
+
+# Stub tokenizer: special tokens, one token per non-ASCII character (CJK text runs at
+# about one token per character), ASCII word pieces of at most 4 characters, single
+# symbols and runs of newlines (other whitespace is folded into the following word, as in BPE)
+_STUB_TOKEN_PATTERN = re.compile(r'<\|[a-z_]+\|>|[^\x00-\x7f]|[A-Za-z0-9_]{1,4}|[^\w\s]|\n+')
+
+
+def split_for(example, validation_ratio, salt=''):
+    """
+    Split ('train' or 'validation') of an example, from a hash of its dialog.
+
+    The hash is taken over the canonical JSON of the dialog only, so metadata, key order
+    and row position do not move an example between splits.
+    """
+    canonical = json.dumps(example.get('dialog', []), sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    digest = hashlib.sha256((salt + canonical).encode('utf-8')).digest()
+    return VALIDATION_SPLIT if int.from_bytes(digest[:8], 'big') / 2 ** 64 < validation_ratio else TRAIN_SPLIT
+
+
+class StubTokenizer:
+    """Dependency-free tokenizer approximating Llama's token counts from above."""
+
+    name = 'stub'
+
+    def encode(self, text):
+        return _STUB_TOKEN_PATTERN.findall(text)
+
+
+class HuggingFaceTokenizer:
+    """Adapter giving a transformers tokenizer the encode(text) interface used here."""
+
+    def __init__(self, name, token=None):
+        if AutoTokenizer is None:
+            raise ImportError(f"Tokenizer '{name}' requires the 'transformers' package (or use 'stub')")
+        self.name = name
+        self._tokenizer = AutoTokenizer.from_pretrained(name, token=token)
+
+    def encode(self, text):
+        # The chat template already contains <|begin_of_text|>
+        return self._tokenizer.encode(text, add_special_tokens=False)
+
+
+def load_tokenizer(name='stub', token=None):
+    """Return the stub tokenizer for 'stub', otherwise the Hugging Face tokenizer of that name."""
+    return StubTokenizer() if name == 'stub' else HuggingFaceTokenizer(name, token=token)
+
+
+def split_paths(output_dir):
+    """Paths of the train and validation files written by preprocess_jsonl()."""
+    return {split: os.path.join(output_dir, split, f"{split}.jsonl") for split in (TRAIN_SPLIT, VALIDATION_SPLIT)}
+
+
+def training_dataset_path(dataset_path):
+    """
+    File the training job reads for a dataset path.
+
+    After preprocess_dataset.py, local_input_data_path names the output directory; that
+    resolves to its train split. Any other path is returned unchanged.
+    """
+    if os.path.isdir(dataset_path):
+        return split_paths(dataset_path)[TRAIN_SPLIT]
+    return dataset_path
+
+
+def preprocess_jsonl(input_path, output_dir, tokenizer, max_length, validation_ratio=0.2, salt='',
+                     drop_over_length=True, chunk_size=1000):
+    """
+    Split a dataset into train and validation files and report its token lengths.
+
+    Rows are copied byte-for-byte (the training container applies the chat template
+    itself); the template is only rendered here to measure lengths.
+
+    Args:
+        input_path (str): JSONL dataset (plain, compressed or a partition manifest).
+        output_dir (str): Directory receiving train/train.jsonl, validation/validation.jsonl
+            and the report.
+        tokenizer: Object with encode(text), e.g. from load_tokenizer().
+        max_length (int): Token limit of the training job (max_input_length).
+        validation_ratio (float): Expected fraction of rows in the validation split.
+        salt (str): Mixed into the split hash; change it to draw a different split.
+        drop_over_length (bool): Leave over-length rows out of both splits (otherwise they
+            are kept and only reported). Defaults to True.
+        chunk_size (int): Rows buffered per split before they are written.
+
+    Returns:
+        dict: The report, also written to output_dir/preprocess_report.json.
+    """
+    paths = split_paths(output_dir)
+    lengths = {TRAIN_SPLIT: Counter(), VALIDATION_SPLIT: Counter()}
+    over_length_rows = []
+    input_rows = 0
+    for path in paths.values():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(paths[TRAIN_SPLIT], 'wb') as train_file, open(paths[VALIDATION_SPLIT], 'wb') as validation_file:
+        files = {TRAIN_SPLIT: train_file, VALIDATION_SPLIT: validation_file}
+        buffers = {TRAIN_SPLIT: [], VALIDATION_SPLIT: []}
+        for line in iter_jsonl_lines(input_path):
+            input_rows += 1
+            example = json.loads(line)
+            length = len(tokenizer.encode(apply_llama31_chat_template(example.get('dialog', []))))
+            if length > max_length:
+                over_length_rows.append((input_rows, length))
+                if drop_over_length:
+                    continue
+            split = split_for(example, validation_ratio, salt)
+            lengths[split][length] += 1
+            buffers[split].append(line if line.endswith(b'\n') else line + b'\n')
+            if len(buffers[split]) >= chunk_size:
+                files[split].writelines(buffers[split])
+                buffers[split] = []
+        for split, buffer in buffers.items():
+            files[split].writelines(buffer)
+
+    train_rows, validation_rows = sum(lengths[TRAIN_SPLIT].values()), sum(lengths[VALIDATION_SPLIT].values())
+    kept_rows = train_rows + validation_rows
+    train_summary = counter_summary(lengths[TRAIN_SPLIT])
+    validation_summary = counter_summary(lengths[VALIDATION_SPLIT])
+    report = {
+        'input_path': input_path,
+        'tokenizer': tokenizer.name,
+        'chat_template': 'Llama3.1',
+        'max_length': max_length,
+        'validation_ratio': validation_ratio,
+        'salt': salt,
+        'input_rows': input_rows,
+        'kept_rows': kept_rows,
+        'train_rows': train_rows,
+        'validation_rows': validation_rows,
+        'actual_validation_ratio': round(validation_rows / kept_rows, 4) if kept_rows else None,
+        'over_length_rows': len(over_length_rows),
+        'over_length_dropped': drop_over_length,
+        'over_length_examples': [{'row': row, 'tokens': length} for row, length in over_length_rows[:_MAX_REPORTED_ROWS]],
+        'lengths': {
+            'all': counter_summary(lengths[TRAIN_SPLIT] + lengths[VALIDATION_SPLIT]),
+            TRAIN_SPLIT: train_summary,
+            VALIDATION_SPLIT: validation_summary,
+        },
+        # Mean validation length over mean train length; far from 1.0 means the splits differ
+        'length_skew': round(validation_summary['mean'] / train_summary['mean'], 3)
+        if train_summary and validation_summary else None,
+        'files': paths,
+    }
+    with open(os.path.join(output_dir, REPORT_NAME), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
@@ -0,0 +1,420 @@
+"""
+S3 Transfer Utilities
+
+This module uploads datasets to S3 with tuned multipart transfers. Every uploaded object
+carries the SHA-256 of its content in its metadata, and a re-upload is skipped when the
+remote object already has the same checksum (or, for objects uploaded without one, the
+same ETag). Single files, whole directories and partition manifests (with all their
+parts) can be uploaded, with progress reported as bytes are sent, and objects a new
+upload no longer contains can be removed from its prefix. Compressed manifest
+parts are decompressed on the way up by default, since the training job reads plain JSONL.
+
+S3MultipartWriter streams data that is still being produced (e.g. generator output)
+straight into a multipart upload, without a local copy.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # boto3 is only needed when uploading
+    TransferConfig = None
+    ClientError = None
+
+from workflow_utils.dataset_io import (COMPRESSION_SUFFIXES, decompress_file, file_sha256, load_manifest,
+                                       manifest_part_paths, verify_manifest)
+
+DEFAULT_PART_SIZE = 64 * 1024 * 1024
+DEFAULT_MAX_CONCURRENCY = 8
+
+# User metadata key holding the object's SHA-256 (stored by S3 as x-amz-meta-sha256)
+CHECKSUM_METADATA_KEY = 'sha256'
+
+# Progress is printed every this many percent of a file
+_PROGRESS_STEP = 10
+
+# S3 rejects multipart parts (other than the last) smaller than this
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+def parse_s3_uri(uri):
+    """Split 's3://bucket/key' into (bucket, key)."""
+    if not uri.startswith('s3://') or '/' not in uri[5:]:
+        raise ValueError(f"Not an S3 object URI: {uri}")
+    bucket, key = uri[5:].split('/', 1)
+    return bucket, key
+
+
+def make_transfer_config(part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+    """
+    Build a TransferConfig that switches to multipart at part_size and sends parts in parallel.
+
+    Args:
+        part_size (int): Multipart threshold and part size in bytes (S3 minimum is 5 MiB).
+        max_concurrency (int): Parts uploaded at the same time.
+
+    Returns:
+        TransferConfig: Settings for boto3 upload_file.
+    """
+    if TransferConfig is None:
+        raise ImportError("S3 uploads require the 'boto3' package")
+    return TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size,
+                          max_concurrency=max_concurrency, use_threads=max_concurrency > 1)
+
+
+def s3_etag(path, part_size=DEFAULT_PART_SIZE):
+    """
+    ETag S3 reports for a file uploaded with the given part size.
+
+    Files below part_size are uploaded in one request and get the MD5 of their content;
+    larger files get the MD5 of the concatenated part MD5s, suffixed with the part count.
+    """
+    part_digests = []
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(part_size), b''):
+            part_digests.append(hashlib.md5(block, usedforsecurity=False).digest())
+    if os.path.getsize(path) < part_size:
+        return part_digests[0].hex() if part_digests else hashlib.md5(b'', usedforsecurity=False).hexdigest()
+    return f"{hashlib.md5(b''.join(part_digests), usedforsecurity=False).hexdigest()}-{len(part_digests)}"
+
+
+class ProgressReporter:
+    """Thread-safe boto3 transfer callback printing progress every 10% of a file."""
+
+    def __init__(self, label, total_bytes):
+        self.label = label
+        self.total_bytes = total_bytes
+        self.sent_bytes = 0
+        self.next_report = _PROGRESS_STEP
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount):
+        with self._lock:
+            self.sent_bytes += bytes_amount
+            percent = 100 * self.sent_bytes // self.total_bytes if self.total_bytes else 100
+            if percent >= self.next_report:
+                print(f"  {self.label}: {percent}% ({self.sent_bytes / 1024 ** 2:.1f}/{self.total_bytes / 1024 ** 2:.1f} MiB)")
+                self.next_report = (percent // _PROGRESS_STEP + 1) * _PROGRESS_STEP
+
+
+class S3Uploader:
+    """
+    Checksum-aware uploader for one bucket.
+
+    Args:
+        client: boto3 S3 client.
+        bucket (str): Destination bucket.
+        part_size (int): Multipart threshold and part size in bytes. Defaults to 64 MiB.
+        max_concurrency (int): Parts uploaded at the same time. Defaults to 8.
+        force (bool): Upload even when the remote object is unchanged. Defaults to False.
+    """
+
+    def __init__(self, client, bucket, part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 force=False):
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+        self.transfer_config = make_transfer_config(part_size, max_concurrency)
+        self.force = force
+        self.uploaded = []
+        self.skipped = []
+        self.deleted = []
+        self.bytes_uploaded = 0
+
+    def remote_object(self, key):
+        """HEAD an object, returning its response or None when it does not exist."""
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def is_unchanged(self, path, key, sha256):
+        """Whether the object at key already holds exactly this file."""
+        remote = self.remote_object(key)
+        if remote is None or remote.get('ContentLength') != os.path.getsize(path):
+            return False
+        remote_sha256 = remote.get('Metadata', {}).get(CHECKSUM_METADATA_KEY)
+        if remote_sha256 is not None:
+            return remote_sha256 == sha256
+        # Uploaded without a checksum (e.g. by an older script): fall back to the ETag
+        return remote.get('ETag', '').strip('"') == s3_etag(path, self.part_size)
+
+    def upload_file(self, path, key, sha256=None):
+        """
+        Upload one file unless the remote object is unchanged.
+
+        Args:
+            path (str): Local file.
+            key (str): Destination key.
+            sha256 (str): Known SHA-256 of the file (computed when omitted).
+
+        Returns:
+            bool: True if the file was uploaded, False if it was skipped.
+        """
+        sha256 = sha256 or file_sha256(path)
+        uri = f"s3://{self.bucket}/{key}"
+        if not self.force and self.is_unchanged(path, key, sha256):
+            print(f"Skipping {path}: {uri} is unchanged")
+            self.skipped.append(key)
+            return False
+
+        size = os.path.getsize(path)
+        print(f"Uploading {path} to {uri} ({size / 1024 ** 2:.1f} MiB)")
+        self.client.upload_file(path, self.bucket, key,
+                                ExtraArgs={'Metadata': {CHECKSUM_METADATA_KEY: sha256}},
+                                Config=self.transfer_config,
+                                Callback=ProgressReporter(os.path.basename(path), size))
+        self.uploaded.append(key)
+        self.bytes_uploaded += size
+        return True
+
+    def upload_directory(self, local_dir, prefix):
+        """
+        Upload every file under a directory, keeping relative paths below prefix.
+
+        Returns:
+            list: Keys of the files found, in upload order.
+        """
+        keys = []
+        for root, dirs, files in os.walk(local_dir):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                relative = os.path.relpath(path, local_dir).replace(os.sep, '/')
+                key = f"{prefix.rstrip('/')}/{relative}"
+                self.upload_file(path, key)
+                keys.append(key)
+        return keys
+
+    def upload_manifest(self, manifest_path, data_prefix, manifest_key, decompress=True):
+        """
+        Upload a partitioned dataset: every part under data_prefix, then the manifest itself.
+
+        The parts are checked against the manifest first, and their recorded checksums are
+        reused for the skip-if-unchanged comparison.
+
+        Args:
+            manifest_path (str): Local manifest.
+            data_prefix (str): Key prefix for the parts.
+            manifest_key (str): Destination key of the manifest.
+            decompress (bool): Upload gzip/zstd parts as plain .jsonl (through a scratch
+                directory), with a manifest rewritten to describe the uploaded objects.
+                When False the compressed parts are uploaded as they are, which only suits
+                archiving: the training job cannot read them.
+
+        Returns:
+            list: Keys of the parts.
+        """
+        problems = verify_manifest(manifest_path)
+        if problems:
+            raise ValueError(f"Refusing to upload {manifest_path}: {'; '.join(problems)}")
+        manifest = load_manifest(manifest_path)
+        compression = manifest.get('compression', 'none')
+        part_paths = manifest_part_paths(manifest_path, manifest)
+        data_prefix = data_prefix.rstrip('/')
+
+        if not decompress or compression == 'none':
+            keys = []
+            for part, part_path in zip(manifest['parts'], part_paths):
+                key = f"{data_prefix}/{part['path']}"
+                self.upload_file(part_path, key, sha256=part['sha256'])
+                keys.append(key)
+            self.upload_file(manifest_path, manifest_key)
+            return keys
+
+        keys, parts = [], []
+        suffix = COMPRESSION_SUFFIXES[compression]
+        with tempfile.TemporaryDirectory() as scratch:
+            for part, part_path in zip(manifest['parts'], part_paths):
+                name = part['path'][:-len(suffix)]
+                plain_path = os.path.join(scratch, name)
+                sha256 = decompress_file(part_path, plain_path)
+                key = f"{data_prefix}/{name}"
+                self.upload_file(plain_path, key, sha256=sha256)
+                parts.append({'path': name, 'rows': part['rows'], 'bytes': os.path.getsize(plain_path), 'sha256': sha256})
+                keys.append(key)
+                os.remove(plain_path)
+            uploaded_manifest_path = os.path.join(scratch, os.path.basename(manifest_path))
+            with open(uploaded_manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({**manifest, 'compression': 'none', 'parts': parts}, f, indent=2)
+            self.upload_file(uploaded_manifest_path, manifest_key)
+        return keys
+
+    def delete_stale_objects(self, prefix, keep_keys):
+        """
+        Delete every object under prefix that is not in keep_keys.
+
+        A training channel pointed at a prefix reads everything below it, so objects left
+        there by an earlier upload (older parts, splits or reports) would silently be
+        trained on together with the current dataset.
+
+        Returns:
+            list: Keys of the deleted objects.
+        """
+        keep_keys = set(keep_keys)
+        stale = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{prefix.rstrip('/')}/"):
+            stale.extend(item['Key'] for item in page.get('Contents', []) if item['Key'] not in keep_keys)
+        # delete_objects takes at most 1000 keys per request
+        for start in range(0, len(stale), 1000):
+            batch = stale[start:start + 1000]
+            print(f"Deleting {len(batch)} stale object(s) under s3://{self.bucket}/{prefix.rstrip('/')}/")
+            self.client.delete_objects(Bucket=self.bucket,
+                                       Delete={'Objects': [{'Key': key} for key in batch], 'Quiet': True})
+        self.deleted.extend(stale)
+        return stale
+
+    def summary(self):
+        """One-line description of what was uploaded, skipped and deleted."""
+        return (f"{len(self.uploaded)} uploaded ({self.bytes_uploaded / 1024 ** 2:.1f} MiB), "
+                f"{len(self.skipped)} unchanged and skipped, {len(self.deleted)} stale deleted")
+
+
+class S3MultipartWriter:
+    """
+    Write-only binary file object that streams into an S3 multipart upload.
+
+    Written bytes are buffered into parts of part_size; each full part is uploaded by a
+    background thread while the caller keeps writing. At most max_concurrency parts are in
+    flight, so memory stays around (max_concurrency + 1) * part_size. close() uploads the
+    last part and completes the upload; abort() (or leaving a with block on an exception)
+    discards it. Output smaller than one part is sent with a single put_object instead.
+    Either way the object ends up with its SHA-256 in its metadata, like upload_file().
+
+    Args:
+        client: boto3 S3 client.
+        bucket (str): Destination bucket.
+        key (str): Destination key.
+        part_size (int): Part size in bytes (at least 5 MiB). Defaults to 64 MiB.
+        max_concurrency (int): Parts uploaded at the same time. Defaults to 8.
+    """
+
+    def __init__(self, client, bucket, key, part_size=DEFAULT_PART_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.client = client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.max_concurrency = max(1, max_concurrency)
+        self.bytes_written = 0
+        self.closed = False
+        self._sha256 = hashlib.sha256()
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._executor = None
+        self._pending = []
+        self._parts = []
+
+    @property
+    def uri(self):
+        return f"s3://{self.bucket}/{self.key}"
+
+    def sha256(self):
+        """SHA-256 of everything written so far."""
+        return self._sha256.hexdigest()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """Buffer bytes, handing every full part to a background upload."""
+        if self.closed:
+            raise ValueError(f"write to closed S3 upload {self.uri}")
+        self._buffer += data
+        self._sha256.update(data)
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+    def flush(self):
+        """Parts are sent as they fill; there is nothing to flush before close()."""
+
+    def _submit_part(self, data):
+        if self._upload_id is None:
+            self._upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key)['UploadId']
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='s3-part')
+        # Bound memory: wait for the oldest part before queueing more than max_concurrency
+        while len(self._pending) >= self.max_concurrency:
+            self._parts.append(self._pending.pop(0).result())
+        part_number = len(self._parts) + len(self._pending) + 1
+        self._pending.append(self._executor.submit(self._upload_part, part_number, data))
+
+    def _upload_part(self, part_number, data):
+        response = self.client.upload_part(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                           PartNumber=part_number, Body=data)
+        print(f"  Uploaded part {part_number} of {self.uri} ({len(data) / 1024 ** 2:.1f} MiB)")
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+
+    def close(self):
+        """Upload the remaining bytes and complete the upload."""
+        if self.closed:
+            return
+        if self._upload_id is None:
+            self.closed = True
+            self.client.put_object(Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer),
+                                   Metadata={CHECKSUM_METADATA_KEY: self.sha256()})
+            return
+        try:
+            if self._buffer:
+                self._submit_part(bytes(self._buffer))
+                self._buffer = bytearray()
+            self._parts.extend(future.result() for future in self._pending)
+            self._pending = []
+            self.client.complete_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id,
+                                                  MultipartUpload={'Parts': sorted(self._parts, key=lambda part: part['PartNumber'])})
+        except BaseException:
+            self.abort()
+            raise
+        self.closed = True
+        self._executor.shutdown()
+        self._store_checksum()
+
+    def _store_checksum(self):
+        """
+        Add the SHA-256 to a completed multipart object's metadata.
+
+        The checksum is only known once every byte has been written, long after
+        create_multipart_upload, so the object is copied onto itself with the new metadata.
+        The copy runs inside S3 (the managed copy also handles objects over 5 GiB).
+        """
+        try:
+            self.client.copy({'Bucket': self.bucket, 'Key': self.key}, self.bucket, self.key,
+                             ExtraArgs={'Metadata': {CHECKSUM_METADATA_KEY: self.sha256()},
+                                        'MetadataDirective': 'REPLACE'},
+                             Config=make_transfer_config(self.part_size, self.max_concurrency))
+        except ClientError as e:
+            # The data is complete; without the checksum, change detection falls back to the ETag
+            print(f"WARNING: could not store the checksum of {self.uri}: {e}")
+
+    def abort(self):
+        """Discard the upload and any parts already sent."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._executor is not None:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=True)
+        if self._upload_id is not None:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self._upload_id)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,253 @@
+"""
+Token Length Analytics
+
+This module measures the token length distribution of a training dataset in one
+streaming pass: whole dialogs rendered with the Llama 3.1 chat template, and each
+message role on its own. Lengths are kept as exact histograms (one counter entry per
+distinct length), so percentiles are exact, plus one 4-byte total per row for the
+batch-order estimates and bucketed copies.
+
+From the distribution it estimates padding waste (the share of padded tokens in each
+batch) for a batch size, both in dataset order and with length-grouped batches, and
+recommends max_input_length and batch settings. A dataset can also be rewritten
+grouped into length buckets or sorted by length.
+"""
+
+import json
+import math
+import os
+from array import array
+from collections import Counter
+
+from workflow_utils.dataset_io import MANIFEST_SUFFIX, iter_jsonl_lines
+
+LLAMA31_BEGIN_OF_TEXT = '<|begin_of_text|>'
+LLAMA31_HEADER = '<|start_header_id|>{role}<|end_header_id|>\n\n'
+LLAMA31_END_OF_TURN = '<|eot_id|>'
+
+# Percentiles reported for every distribution
+PERCENTILES = (50, 90, 95, 99)
+
+# Recommended max_input_length values are rounded up to a multiple of this
+LENGTH_ALIGNMENT = 64
+
+
+def apply_llama31_chat_template(dialog):
+    """Render a dialog (list of role/content messages) as Llama 3.1 chat-template text."""
+    return LLAMA31_BEGIN_OF_TEXT + ''.join(
+        LLAMA31_HEADER.format(role=message.get('role', 'user')) + str(message.get('content', '')) + LLAMA31_END_OF_TURN
+        for message in dialog
+    )
+
+
+def counter_percentile(counter, total, p):
+    """The p-th percentile (nearest rank) of a length histogram holding total values."""
+    rank = max(1, math.ceil(p / 100 * total))
+    seen = 0
+    for length in sorted(counter):
+        seen += counter[length]
+        if seen >= rank:
+            return length
+    return None
+
+
+def counter_summary(counter):
+    """Count, mean, extremes and percentiles of a length histogram (None when empty)."""
+    total = sum(counter.values())
+    if not total:
+        return None
+    summary = {
+        'count': total,
+        'min': min(counter),
+        'mean': round(sum(length * count for length, count in counter.items()) / total, 1),
+        'max': max(counter),
+    }
+    summary.update({f"p{p}": counter_percentile(counter, total, p) for p in PERCENTILES})
+    return summary
+
+
+def counter_histogram(counter, width):
+    """Bucket a length histogram into ranges of width tokens: [{'from', 'to', 'count'}]."""
+    buckets = Counter()
+    for length, count in counter.items():
+        buckets[length // width] += count
+    return [{'from': bucket * width, 'to': (bucket + 1) * width - 1, 'count': buckets[bucket]}
+            for bucket in sorted(buckets)]
+
+
+def padding_waste(batches):
+    """Fraction of padded tokens when every sequence is padded to its batch's longest."""
+    real = padded = 0
+    for batch in batches:
+        real += sum(batch)
+        padded += max(batch) * len(batch)
+    return round(1 - real / padded, 4) if padded else 0.0
+
+
+def chunk(lengths, batch_size):
+    """Split an iterable of lengths into consecutive batches."""
+    batch = []
+    for length in lengths:
+        batch.append(length)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def round_up(value, multiple):
+    return int(math.ceil(value / multiple) * multiple)
+
+
+class TokenLengthStats:
+    """
+    Streaming token-length statistics for chat examples.
+
+    Args:
+        tokenizer: Object with encode(text), e.g. from preprocess.load_tokenizer().
+        max_input_length (int): Length sequences are truncated to in training.
+    """
+
+    def __init__(self, tokenizer, max_input_length):
+        self.tokenizer = tokenizer
+        self.max_input_length = max_input_length
+        self.totals = Counter()
+        self.roles = {}
+        self.lengths = array('I')
+        self.truncated = 0
+
+    def add(self, example):
+        """Measure one example; returns its total length in tokens."""
+        total = len(self.tokenizer.encode(LLAMA31_BEGIN_OF_TEXT))
+        for message in example.get('dialog', []):
+            role = message.get('role', 'user')
+            text = LLAMA31_HEADER.format(role=role) + str(message.get('content', '')) + LLAMA31_END_OF_TURN
+            length = len(self.tokenizer.encode(text))
+            self.roles.setdefault(role, Counter())[length] += 1
+            total += length
+        self.totals[total] += 1
+        self.lengths.append(total)
+        if total > self.max_input_length:
+            self.truncated += 1
+        return total
+
+    def training_lengths(self):
+        """Lengths as seen by the trainer, in dataset order (truncated to max_input_length)."""
+        return (min(length, self.max_input_length) for length in self.lengths)
+
+    def padding(self, batch_size):
+        """Padding waste for batches in dataset order and for length-grouped batches."""
+        return {
+            'batch_size': batch_size,
+            'dataset_order': padding_waste(chunk(self.training_lengths(), batch_size)),
+            'length_grouped': padding_waste(chunk(sorted(self.training_lengths()), batch_size)),
+        }
+
+    def recommend(self, batch_size, gradient_accumulation_steps):
+        """
+        Suggested max_input_length and batch settings.
+
+        max_input_length covers the longest dialog when that costs at most 25% over the
+        99th percentile (otherwise the p99, truncating the rest). The batch size is scaled
+        so a batch holds about as many tokens as before, and gradient accumulation keeps
+        the effective batch size unchanged.
+        """
+        summary = counter_summary(self.totals)
+        if summary is None:
+            return None
+        target = summary['max'] if summary['max'] <= 1.25 * summary['p99'] else summary['p99']
+        max_input_length = round_up(target, LENGTH_ALIGNMENT)
+        token_budget = batch_size * self.max_input_length
+        recommended_batch = max(1, 2 ** int(math.log2(max(1, token_budget // max_input_length))))
+        effective_batch = batch_size * gradient_accumulation_steps
+        return {
+            'max_input_length': max_input_length,
+            'truncated_rows': sum(count for length, count in self.totals.items() if length > max_input_length),
+            'per_device_train_batch_size': recommended_batch,
+            'gradient_accumulation_steps': max(1, effective_batch // recommended_batch),
+            'padding_waste': padding_waste(chunk((min(length, max_input_length) for length in self.lengths),
+                                                 recommended_batch)),
+        }
+
+    def report(self, batch_size, gradient_accumulation_steps=1, bucket_width=128):
+        """Everything measured, as a JSON-serializable dict."""
+        return {
+            'tokenizer': self.tokenizer.name,
+            'chat_template': 'Llama3.1',
+            'rows': len(self.lengths),
+            'max_input_length': self.max_input_length,
+            'over_max_input_length': self.truncated,
+            'total': counter_summary(self.totals),
+            'roles': {role: counter_summary(counter) for role, counter in sorted(self.roles.items())},
+            'histogram': counter_histogram(self.totals, bucket_width),
+            'role_histograms': {role: counter_histogram(counter, bucket_width)
+                                for role, counter in sorted(self.roles.items())},
+            'padding': self.padding(batch_size),
+            'recommendation': self.recommend(batch_size, gradient_accumulation_steps),
+        }
+
+
+def token_report_path(dataset_path):
+    """Default report path of a dataset: <dataset>_token_lengths.json beside it."""
+    stem = dataset_path[:-len(MANIFEST_SUFFIX)] if dataset_path.endswith(MANIFEST_SUFFIX) else os.path.splitext(dataset_path)[0]
+    return f"{stem.rstrip(os.sep)}_token_lengths.json"
+
+
+def analyze_jsonl(path, tokenizer, max_input_length):
+    """Stream a dataset (plain, compressed or manifest) through TokenLengthStats."""
+    stats = TokenLengthStats(tokenizer, max_input_length)
+    for line in iter_jsonl_lines(path):
+        stats.add(json.loads(line))
+    return stats
+
+
+def bucket_name(bucket, width):
+    return f"tokens_{bucket * width:05d}-{(bucket + 1) * width - 1:05d}.jsonl"
+
+
+def write_length_buckets(path, lengths, output_dir, width):
+    """
+    Copy a dataset into one JSONL file per length bucket of width tokens.
+
+    Rows keep their original bytes and relative order. lengths are the total lengths in
+    dataset order, as collected by TokenLengthStats.
+
+    Returns:
+        list: Bucket file paths, shortest bucket first.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    files = {}
+    try:
+        for line, length in zip(iter_jsonl_lines(path), lengths):
+            bucket = length // width
+            if bucket not in files:
+                files[bucket] = open(os.path.join(output_dir, bucket_name(bucket, width)), 'wb')
+            files[bucket].write(line if line.endswith(b'\n') else line + b'\n')
+    finally:
+        for f in files.values():
+            f.close()
+    return [os.path.join(output_dir, bucket_name(bucket, width)) for bucket in sorted(files)]
+
+
+def write_length_sorted(path, lengths, output_path, width):
+    """
+    Copy a dataset sorted by total length (ties keep their original order).
+
+    Rows are first spread over length buckets next to output_path, then each bucket is
+    sorted in memory and appended, so only one bucket is held at a time.
+    """
+    bucket_dir = f"{output_path}.buckets"
+    bucket_paths = write_length_buckets(path, lengths, bucket_dir, width)
+    # Bucket files hold rows in dataset order, so their lengths follow the same order
+    ordered = {}
+    for length in lengths:
+        ordered.setdefault(length // width, []).append(length)
+    with open(output_path, 'wb') as destination:
+        for bucket_path, bucket in zip(bucket_paths, sorted(ordered)):
+            with open(bucket_path, 'rb') as source:
+                rows = sorted(zip(ordered[bucket], source), key=lambda row: row[0])
+            destination.writelines(line for _, line in rows)
+            os.remove(bucket_path)
+    os.rmdir(bucket_dir)
+    return output_path